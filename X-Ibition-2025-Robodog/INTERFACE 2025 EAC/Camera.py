@@ -1,5 +1,8 @@
 import cv2 as cv
 import time
+import threading
+from collections import deque
+import numpy as np
 
 # phone's camera IP stream
 ip = '10.24.20.222'
@@ -67,6 +70,220 @@ def CloseCamera(camera):
 
 
 
+class CameraSource:
+    """ Camera read by a background thread: reconnects with exponential backoff, keeps only the latest frame
+
+    source: camera index, -1 for the phone IP stream (url), or any OpenCV URL/path.
+    latest() never blocks; read() waits for a frame newer than the last one seen.
+    """
+
+    def __init__(self, source=0, read_timeout=5.0, backoff_min=0.5, backoff_max=8.0, fps_window=30):
+        self.source = url if source == -1 else source
+        self.read_timeout = read_timeout  # seconds without a frame before the stream is reopened
+        self.backoff_min, self.backoff_max = backoff_min, backoff_max
+        self.backoff = backoff_min
+        self.state = "stopped"  # stopped / connecting / streaming / stalled / stopping
+        self.frame, self.frame_id, self.frame_time = None, 0, 0.0
+        self.frames, self.reconnects, self.open_failures, self.read_failures = 0, 0, 0, 0
+        self._times = deque(maxlen=fps_window)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._camera = None
+
+    def start(self, timeout=None):
+        """ Start the grab thread. A previous thread still releasing the camera (stop(timeout=0)) is joined for at most
+        `timeout` seconds (None: no limit); if it is not done, nothing starts and state stays "stopping": retry later """
+        if self._thread is not None and self._stop.is_set():
+            self._thread.join(timeout)
+            if self._thread.is_alive(): return self  # stuck in a blocking read, don't open the camera twice
+            self._thread = None
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="camera-source", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        with self._cond: self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive(): self._thread = None  # else joined by the next start()
+        self.state = "stopped" if self._thread is None else "stopping"
+
+    def latest(self, RGB=False):
+        """ (frame_id, frame) of the most recent frame, (0, None) if none yet. Never blocks. """
+        with self._cond:
+            frame_id, frame = self.frame_id, self.frame
+        if frame is not None and RGB: frame = cv.cvtColor(frame, cv.COLOR_BGR2RGB)
+        return frame_id, frame
+
+    def read(self, last_id=0, timeout=0.5, RGB=False):
+        """ Wait up to `timeout` for a frame newer than `last_id`; (last_id, None) on timeout """
+        with self._cond:
+            self._cond.wait_for(lambda: self.frame_id != last_id or self._stop.is_set(), timeout)
+            if self.frame_id == last_id: return last_id, None
+        return self.latest(RGB)
+
+    @property
+    def fps(self):
+        if len(self._times) < 2: return 0.0
+        return (len(self._times) - 1) / max(self._times[-1] - self._times[0], 1e-9)
+
+    def stats(self):
+        return {
+            "state": self.state, "fps": self.fps, "frames": self.frames,
+            "frame_age": time.monotonic() - self.frame_time if self.frame_id else None,
+            "reconnects": self.reconnects, "open_failures": self.open_failures,
+            "read_failures": self.read_failures, "backoff": self.backoff,
+        }
+
+    def _open(self):
+        self.state = "connecting"
+        if isinstance(self.source, str):
+            # Network stream: bound the time OpenCV (FFmpeg) may block in open() and read()
+            timeout_ms = int(1000 * self.read_timeout)
+            camera = cv.VideoCapture(self.source, cv.CAP_FFMPEG, [cv.CAP_PROP_OPEN_TIMEOUT_MSEC, timeout_ms,
+                                                                  cv.CAP_PROP_READ_TIMEOUT_MSEC, timeout_ms])
+        else:
+            camera = cv.VideoCapture(self.source)
+        if camera.isOpened():
+            camera.set(cv.CAP_PROP_BUFFERSIZE, 1)
+            return camera
+        camera.release()
+        return None
+
+    def _wait_backoff(self):
+        """ Sleep before the next attempt (interrupted by stop), then double the delay """
+        self._stop.wait(self.backoff)
+        self.backoff = min(self.backoff_max, self.backoff * 2)
+
+    def _run(self):
+        first = True
+        while not self._stop.is_set():
+            if self._camera is None:
+                self._camera = self._open()
+                if self._camera is None:
+                    self.open_failures += 1
+                    self.state = "stalled"
+                    self._wait_backoff()
+                    continue
+                if not first: self.reconnects += 1
+                first = False
+                last_success = time.monotonic()
+            success, frame = self._camera.read()
+            now = time.monotonic()
+            if success:
+                self.backoff = self.backoff_min
+                self.state = "streaming"
+                last_success = now
+                self._times.append(now)
+                with self._cond:
+                    self.frame, self.frame_time = frame, now
+                    self.frame_id += 1
+                    self.frames += 1
+                    self._cond.notify_all()
+                continue
+            self.read_failures += 1
+            if now - last_success > self.read_timeout:
+                # Stream dropped (Wi-Fi, USB): reopen after a growing delay instead of spinning
+                print("Camera Timed Out. Reconnecting.")
+                self._camera.release()
+                self._camera = None
+                self.state = "stalled"
+                self._wait_backoff()
+            else:
+                self._stop.wait(0.01)
+        if self._camera is not None:
+            self._camera.release()
+            self._camera = None
+        self.state = "stopped"
+
+
+
+class DisplaySink:
+    """ Latest frame from any thread, shown by the Tk thread in one persistent PhotoImage
+
+    Intentional copy of "mars rover/display_sink.py" (same API and behaviour): the two projects ship standalone,
+    see the note at the top of that file before changing either one.
+    submit() never blocks and replaces a frame the UI has not shown yet (counted as dropped).
+    poll() must run on the Tk thread: copy (same size) or cv.resize into a preallocated buffer, then paste in place.
+    """
+
+    def __init__(self, label, size=(480, 360), rgb=False, poll_ms=15, interpolation=None):
+        from PIL import Image, ImageTk
+        self.label, self.size, self.rgb = label, size, rgb  # rgb: frames already RGB (else OpenCV BGR)
+        self.interpolation = interpolation  # None: chosen from the reduction factor
+        self.poll_ms = poll_ms
+        self._buffer = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self._image = Image.new("RGB", size)  # reloaded in place from the buffer
+        self.photo = ImageTk.PhotoImage(image=self._image)
+        self._pending = None
+        self._lock = threading.Lock()
+        self.attach()
+        self._after_id = None
+        self.submitted, self.shown, self.dropped = 0, 0, 0
+        self.ui_times = deque(maxlen=200)
+
+    def attach(self):
+        """ (Re)display the persistent image in the label, e.g. after a placeholder (Tk thread).
+        A frame submitted before (by a stopped camera) is dropped, not shown. """
+        with self._lock: self._pending = None
+        self.label.configure(image=self.photo, text="")
+        self.label.image = self.photo
+
+    def submit(self, frame):
+        with self._lock:
+            if self._pending is not None: self.dropped += 1  # UI is behind: keep the newest
+            self._pending = frame
+            self.submitted += 1
+
+    def poll(self):
+        """ Show the pending frame if there is one (Tk thread) """
+        with self._lock:
+            frame, self._pending = self._pending, None
+        if frame is None: return False
+        start = time.perf_counter()
+        if frame.shape[1::-1] == self.size:
+            np.copyto(self._buffer, frame)
+        else:
+            # INTER_AREA only pays off for large reductions; 640x480 -> 480x360 is ~4x faster with INTER_LINEAR
+            interpolation = self.interpolation
+            if interpolation is None:
+                interpolation = cv.INTER_AREA if self.size[0] / frame.shape[1] <= 0.5 else cv.INTER_LINEAR
+            cv.resize(frame, self.size, dst=self._buffer, interpolation=interpolation)
+        if not self.rgb: cv.cvtColor(self._buffer, cv.COLOR_BGR2RGB, dst=self._buffer)
+        self._image.frombytes(self._buffer)
+        self.photo.paste(self._image)
+        self.ui_times.append(time.perf_counter() - start)
+        self.shown += 1
+        return True
+
+    def start(self):
+        """ Periodic poll() with after (not needed when the caller already calls poll) """
+        def tick():
+            self.poll()
+            self._after_id = self.label.after(self.poll_ms, tick)
+        if self._after_id is None: self._after_id = self.label.after(self.poll_ms, tick)
+        return self
+
+    def stop(self):
+        if self._after_id is not None:
+            try: self.label.after_cancel(self._after_id)
+            except Exception: pass  # widget already destroyed
+            self._after_id = None
+
+    def stats(self):
+        times = list(self.ui_times)
+        return {
+            "submitted": self.submitted, "shown": self.shown, "dropped": self.dropped,
+            "ui_ms_mean": 1000 * sum(times) / len(times) if times else 0.0,
+            "ui_ms_max": 1000 * max(times) if times else 0.0,
+        }
+
+
+
 
 
 
@@ -0,0 +1,194 @@
+"""
+Record hand landmarks once, then replay them offline through the gesture pipeline of the GUI.
+
+Session file (.npz, compressed):
+    t          (N,) seconds since the start of the recording
+    landmarks  (N, 21, 3) float32 MediaPipe landmarks, NaN when no hand was found
+    labels     (N,) expected gesture typed during the recording ("" = not labelled)
+    flipped    image mirrored before detection (False for the Robodog GUI)
+
+Replay (no camera, no MediaPipe) runs Hand_Detection.classify_batch on the whole session at once for the raw
+gestures, then GestureEngine.update (smoothing + vote) and GestureCommander (Open = stop, hold time, one command
+per change) frame by frame, exactly like process_camera_frame. It reports accuracy, time to a stable gesture and
+the commands the robot would have received.
+
+    python GestureReplay.py record session.npz --labels Open Peace Closed Left Right
+    python GestureReplay.py replay session.npz other.npz --smoothing ema
+    python GestureReplay.py demo
+
+Counterpart of "mars rover/gesture_replay.py": only the session format (save/load/record) and time_to_stable are
+shared; gestures, smoothing and commands come from each GUI (Hand_Detection here). The projects ship standalone,
+so each keeps its own copy of those few functions; a change to the .npz format must be made in both.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import Hand_Detection as hd
+
+LABELS = ["Open", "Peace", "Closed", "Left", "Right", "Up", "Down", "Nice", "Pinky"]
+
+
+def save_session(path, t, landmarks, labels=None, flipped=False):
+    t = np.asarray(t, dtype=np.float64)
+    labels = np.full(len(t), "") if labels is None else np.asarray(labels, dtype=str)
+    np.savez_compressed(path, t=t, landmarks=np.asarray(landmarks, dtype=np.float32), labels=labels, flipped=flipped)
+
+
+def load_session(path):
+    with np.load(path) as data:
+        session = {key: data[key] for key in data.files}
+    session.setdefault("labels", np.full(len(session["t"]), ""))
+    return session
+
+
+def record(path, labels=LABELS, camera=0, flip=False, max_seconds=None):
+    """ Record from the camera. Keys: 1..9 = expected gesture (labels), 0 = none, q = stop """
+    import cv2 as cv
+    import mediapipe as mp
+
+    cap = cv.VideoCapture(camera)
+    times, points, expected, current = [], [], [], ""
+    no_hand = np.full((21, 3), np.nan, dtype=np.float32)
+    start = time.monotonic()
+    with mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5) as hands:
+        while cap.isOpened():
+            ok, frame = cap.read()
+            if not ok: continue
+            now = time.monotonic() - start
+            if flip: frame = cv.flip(frame, 1)
+            results = hands.process(cv.cvtColor(frame, cv.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                points.append(hd.landmarks_to_array(results.multi_hand_landmarks[0].landmark).astype(np.float32))
+            else:
+                points.append(no_hand)
+            times.append(now)
+            expected.append(current)
+
+            cv.putText(frame, f"{len(times)} frames  expected: {current or '-'}", (10, 30),
+                       cv.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            cv.imshow("Gesture recording", frame)
+            key = cv.waitKey(1) & 0xFF
+            if key == ord("q") or (max_seconds is not None and now >= max_seconds): break
+            if key == ord("0"): current = ""
+            elif ord("1") <= key <= ord("9") and key - ord("1") < len(labels): current = labels[key - ord("1")]
+    cap.release()
+    cv.destroyAllWindows()
+    save_session(path, times, points, expected, flipped=flip)
+    return len(times)
+
+
+def replay(session, smoothing="one_euro", vote_window=5, min_votes=3, stop_hold_time=0.5):
+    """ Raw gestures, stable gestures and (time, action) commands for a whole session """
+    t, landmarks = session["t"], session["landmarks"].astype(np.float64)
+    present = ~np.isnan(landmarks).any(axis=(1, 2))
+    raw = np.full(len(t), None, dtype=object)
+    if present.any(): raw[present] = hd.classify_batch(landmarks[present])
+
+    engine = hd.GestureEngine(smoothing=smoothing, vote_window=vote_window, min_votes=min_votes)
+    commander = hd.GestureCommander(stop_hold_time)
+    stable = np.full(len(t), None, dtype=object)
+    commands = []
+    for i in range(len(t)):
+        stable[i] = engine.update(landmarks[i] if present[i] else None, t[i])
+        overlay, action = commander.update(stable[i], t[i])
+        if action: commands.append((float(t[i]), action))
+    return raw, stable, commands
+
+
+def time_to_stable(t, labels, stable):
+    """ Per labelled segment: seconds until the stable gesture matches the label (None = never) """
+    delays = []
+    bounds = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1], True])
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        if not labels[begin]: continue
+        hits = np.flatnonzero(stable[begin:end] == labels[begin])
+        delays.append(float(t[begin + hits[0]] - t[begin]) if len(hits) else None)
+    return delays
+
+
+def evaluate(session, **options):
+    t, labels = session["t"], session["labels"].astype(object)
+    raw, stable, commands = replay(session, **options)
+    labelled = labels != ""
+    delays = time_to_stable(t, labels, stable)
+    reached = [d for d in delays if d is not None]
+    return {
+        "frames": len(t), "duration": float(t[-1] - t[0]) if len(t) else 0.0, "labelled": int(labelled.sum()),
+        "raw_accuracy": float((raw[labelled] == labels[labelled]).mean()) if labelled.any() else None,
+        "stable_accuracy": float((stable[labelled] == labels[labelled]).mean()) if labelled.any() else None,
+        "segments": len(delays), "segments_reached": len(reached),
+        "time_to_stable_mean": float(np.mean(reached)) if reached else None,
+        "time_to_stable_max": float(np.max(reached)) if reached else None,
+        "commands": commands,
+    }
+
+
+def synthetic_session(seconds=60.0, fps=30.0, seed=0):
+    """ Fake session: each gesture held 2 s, jitter on the landmarks, a few frames without a hand """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    t = np.arange(n) / fps
+    names = ["Open", "Peace", "Closed", "Left", "Right"]
+    labels = np.array(names)[(t // 2).astype(int) % len(names)]
+    landmarks = np.zeros((n, 21, 3))
+    landmarks[:, :, 0] = 0.5
+    landmarks[:, :, 1] = np.linspace(0.8, 0.3, 21)  # wrist -> tips going up: every finger open
+    closed = {"Open": (), "Peace": (16, 20), "Closed": (8, 12, 16, 20),
+              "Left": (12, 16, 20), "Right": (12, 16, 20)}
+    for name, tips in closed.items():
+        rows = labels == name
+        for tip in tips: landmarks[rows, tip, 1] = landmarks[rows, tip - 2, 1] + 0.05
+    landmarks[labels == "Left", 8, 0] = 0.7  # index pointing sideways
+    landmarks[labels == "Right", 8, 0] = 0.3
+    landmarks += rng.normal(0, 0.008, landmarks.shape)
+    landmarks[rng.random(n) < 0.03] = np.nan
+    return {"t": t, "landmarks": landmarks.astype(np.float32), "labels": labels}
+
+
+def report(name, session, **options):
+    start = time.perf_counter()
+    result = evaluate(session, **options)
+    elapsed = time.perf_counter() - start
+    pct = lambda v: "-" if v is None else f"{100 * v:.1f} %"
+    sec = lambda v: "-" if v is None else f"{v:.2f} s"
+    commands = result["commands"]
+    print(f"{name}: {result['frames']} frames, {result['duration']:.1f} s, {result['labelled']} labelled")
+    print(f"  accuracy raw {pct(result['raw_accuracy'])}, stable {pct(result['stable_accuracy'])}")
+    print(f"  time to stable gesture: mean {sec(result['time_to_stable_mean'])}, max {sec(result['time_to_stable_max'])}"
+          f" ({result['segments_reached']}/{result['segments']} segments)")
+    print(f"  {len(commands)} commands: " + ", ".join(f"{t:.1f}s {a}" for t, a in commands[:12])
+          + (" ..." if len(commands) > 12 else ""))
+    speed = result["duration"] / elapsed if elapsed > 0 else float("inf")
+    print(f"  replayed in {1000 * elapsed:.1f} ms (x{speed:.0f} real time)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record / replay hand gesture sessions offline")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("output")
+    rec.add_argument("--labels", nargs="*", default=LABELS, help="gestures for keys 1..9")
+    rec.add_argument("--camera", type=int, default=0)
+    rec.add_argument("--flip", action="store_true")
+    rec.add_argument("--seconds", type=float, default=None)
+    for name in ("replay", "demo"):
+        p = sub.add_parser(name)
+        if name == "replay": p.add_argument("sessions", nargs="+")
+        else: p.add_argument("--seconds", type=float, default=600.0)
+        p.add_argument("--smoothing", default="one_euro", choices=["one_euro", "ema", "none"])
+        p.add_argument("--vote-window", type=int, default=5)
+        p.add_argument("--min-votes", type=int, default=3)
+        p.add_argument("--stop-hold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        print(f"{record(args.output, args.labels, args.camera, args.flip, args.seconds)} frames -> {args.output}")
+    else:
+        options = dict(smoothing=None if args.smoothing == "none" else args.smoothing, vote_window=args.vote_window,
+                       min_votes=args.min_votes, stop_hold_time=args.stop_hold)
+        if args.mode == "replay":
+            for path in args.sessions: report(path, load_session(path), **options)
+        else:
+            report("synthetic", synthetic_session(args.seconds), **options)
@@ -1,10 +1,9 @@
 import cv2 as cv
 import tkinter as tk
 import time
+from collections import Counter, deque
 
-import mediapipe as mp
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.7)
+import numpy as np
 
 
 
@@ -15,43 +14,259 @@ def detect_direction(x_tip, y_tip, x_base, y_base):
         else:
             return "Down" if y_tip>y_base else "Up"
 
+
+# Finger tips / lower joints used to decide if a finger is open (tip above the joint)
+FINGERS = ("index", "middle", "ring", "pinky")
+TIPS, JOINTS = np.array([8, 12, 16, 20]), np.array([6, 10, 14, 18])
+DIRECTION = "Direction"  # index only: Left/Right/Up/Down from the index tip vs its base
+
+# Gesture table: open fingers (thumb ignored: d'après nos tests il est toujours détecté ouvert) -> label
+GESTURES = [
+    (("index", "middle", "ring", "pinky"), "Open"),
+    ((), "Closed"),
+    (("index",), DIRECTION),
+    (("middle", "ring", "pinky"), "Nice"),
+    (("index", "middle"), "Peace"),
+    (("pinky",), "Pinky"),
+]
+
+
+def _build_table():
+    table = np.full(1 << len(FINGERS), "UNKNOWN", dtype=object)
+    for fingers, label in GESTURES:
+        table[sum(1 << FINGERS.index(f) for f in fingers)] = label
+    return table
+
+GESTURE_TABLE = _build_table()
+
+
+def finger_mask(points):
+    """ (..., 21, 3) landmarks -> bitmask of open fingers (index=1, middle=2, ring=4, pinky=8) """
+    is_open = points[..., TIPS, 1] < points[..., JOINTS, 1]
+    return is_open @ (1 << np.arange(len(FINGERS)))
+
+
+def classify_batch(points):
+    """ Gestures of (N, 21, 3) landmarks in one call -> (N,) array of labels """
+    points = np.asarray(points, dtype=np.float64)
+    labels = GESTURE_TABLE[finger_mask(points)]
+    dx = points[:, 8, 0] - points[:, 5, 0]
+    dy = points[:, 8, 1] - points[:, 5, 1]
+    direction = np.where(np.abs(dx) > np.abs(dy), np.where(dx > 0, "Left", "Right"), np.where(dy > 0, "Down", "Up"))
+    return np.where(labels == DIRECTION, direction, labels)
+
+
 def interpret_landmarks(landmarks):
-    thumb_is_open = landmarks[4].y < landmarks[3].y < landmarks[2].y
-    index_is_open = landmarks[8].y < landmarks[6].y
-    middle_is_open = landmarks[12].y < landmarks[10].y
-    ring_is_open = landmarks[16].y < landmarks[14].y
-    pinky_is_open = landmarks[20].y < landmarks[18].y
-
-    fingers = { "thumb":thumb_is_open, "index":index_is_open, "middle":middle_is_open, "ring":ring_is_open, "pinky":pinky_is_open }
-    OpenFingers = [name for name,value in fingers.items() if value]
-    ClosedFingers = [name for name,value in fingers.items() if not value]
-
-    #print(f"Open ({OpenFingers})  Closed({ClosedFingers})")
-    
-    # D'après nos tests, thumb n'est pas détecté correctement: il est toujours ouvert.
-    if all([index_is_open, middle_is_open, ring_is_open, pinky_is_open]):
-        return "Open"
-    elif not any([middle_is_open, index_is_open, pinky_is_open, ring_is_open]):
-        return "Closed"
-    elif index_is_open and not any([middle_is_open, ring_is_open, pinky_is_open]):
-        direction = detect_direction(landmarks[8].x, landmarks[8].y, landmarks[5].x, landmarks[5].y)
-        return f"{direction}"
-    elif all([middle_is_open, ring_is_open, pinky_is_open]) and not index_is_open:
-        return "Nice"
-    elif all([middle_is_open, index_is_open]) and not any([pinky_is_open, ring_is_open]):
-        return "Peace"
-    elif pinky_is_open and not any([middle_is_open, index_is_open, ring_is_open]):
-        return "Pinky"
-    else: return "UNKNOWN"
+    """ Gesture of one hand: MediaPipe landmark list or (21, 3) array """
+    points = landmarks if isinstance(landmarks, np.ndarray) else landmarks_to_array(landmarks)
+    label = GESTURE_TABLE[int(finger_mask(points))]
+    if label == DIRECTION:
+        return detect_direction(points[8, 0], points[8, 1], points[5, 0], points[5, 1])
+    return label
+
+
+
+def landmarks_to_array(landmarks):
+    """ MediaPipe landmark list -> (21, 3) array of normalized x, y, z """
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks], dtype=np.float64)
+
+
+class OneEuroFilter:
+    """ One-Euro filter over a whole landmark array: smooths jitter, follows fast moves (Casiez et al.) """
+
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=1.0):
+        self.min_cutoff, self.beta, self.d_cutoff = min_cutoff, beta, d_cutoff
+        self.reset()
+
+    def reset(self):
+        self.value, self.derivative, self.time = None, None, None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, value, t):
+        if self.value is None:
+            self.value, self.derivative, self.time = value, np.zeros_like(value), t
+            return value
+        dt = max(t - self.time, 1e-3)
+        self.time = t
+        derivative = (value - self.value) / dt
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.derivative = a_d * derivative + (1 - a_d) * self.derivative
+        # Cutoff grows with speed: little lag on fast moves, strong smoothing at rest
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        a = self._alpha(cutoff, dt)
+        self.value = a * value + (1 - a) * self.value
+        return self.value
+
+
+class EMAFilter:
+    """ Exponential moving average over a landmark array """
+
+    def __init__(self, alpha=0.5):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, value, t):
+        self.value = value if self.value is None else self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+class GestureEngine:
+    """ Hand landmarks -> stable gesture label
+
+    - inference on a downscaled image (scale), optionally cropped around the last hand box (roi);
+    - landmarks smoothed over time (smoothing: "one_euro", "ema" or None);
+    - the label is a majority vote over the last vote_window frames (min_votes needed to change it).
+    """
+
+    def __init__(self, scale=0.5, roi=False, roi_margin=0.5, smoothing="one_euro", vote_window=5, min_votes=3,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5, min_input_side=160):
+        self.scale, self.roi, self.roi_margin, self.min_input_side = scale, roi, roi_margin, min_input_side
+        self.hands_options = dict(max_num_hands=1, min_detection_confidence=min_detection_confidence,
+                                  min_tracking_confidence=min_tracking_confidence)
+        self.hands = None  # MediaPipe, created on the first process() (update() alone does not need it)
+        if smoothing == "one_euro": self.filter = OneEuroFilter()
+        elif smoothing == "ema": self.filter = EMAFilter()
+        else: self.filter = None
+        self.votes = deque(maxlen=vote_window)
+        self.min_votes = min_votes
+        self.label = None  # current stable gesture
+        self.landmarks = None  # last smoothed (21, 3) array, full-frame normalized coordinates
+        self.box = None  # last hand box (x1, y1, x2, y2) in pixels
+        self.frames, self.raw_changes, self.label_changes = 0, 0, 0
+        self.inference_ms = 0.0  # moving average of the MediaPipe call
+        self._last_raw = None
+
+    def reset(self):
+        self.votes.clear()
+        self.label, self.landmarks, self.box, self._last_raw = None, None, None, None
+        if self.filter: self.filter.reset()
+
+    def _input(self, image):
+        """ Crop (ROI) and downscale; returns the image for MediaPipe and its (x0, y0, w, h) in the frame """
+        h, w = image.shape[:2]
+        x0, y0, x1, y1 = 0, 0, w, h
+        if self.roi and self.box is not None:
+            bx1, by1, bx2, by2 = self.box
+            mx, my = (bx2 - bx1) * self.roi_margin, (by2 - by1) * self.roi_margin
+            x0, y0 = max(0, int(bx1 - mx)), max(0, int(by1 - my))
+            x1, y1 = min(w, int(bx2 + mx)), min(h, int(by2 + my))
+            if x1 - x0 < 32 or y1 - y0 < 32: x0, y0, x1, y1 = 0, 0, w, h
+        crop = image[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+        scale = max(self.scale, min(1.0, self.min_input_side / min(cw, ch)))
+        if scale < 1.0:
+            crop = cv.resize(crop, (max(1, int(cw * scale)), max(1, int(ch * scale))), interpolation=cv.INTER_AREA)
+        return np.ascontiguousarray(crop), (x0, y0, cw, ch)
+
+    def _vote(self, raw):
+        self.votes.append(raw)
+        label, count = Counter(self.votes).most_common(1)[0]
+        if count >= self.min_votes and label != self.label:
+            self.label = label
+            self.label_changes += 1
+        return self.label
+
+    def process(self, image_in_rgb, t=None):
+        """ One RGB frame -> stable gesture label (or None when no hand) """
+        t = time.monotonic() if t is None else t
+        if self.hands is None:
+            import mediapipe as mp
+            self.hands = mp.solutions.hands.Hands(**self.hands_options)
+        image, (x0, y0, cw, ch) = self._input(image_in_rgb)
+        start = time.perf_counter()
+        results = self.hands.process(image)
+        self.inference_ms = 0.9 * self.inference_ms + 100 * (time.perf_counter() - start)
+
+        points = None
+        if results.multi_hand_landmarks:
+            h, w = image_in_rgb.shape[:2]
+            points = landmarks_to_array(results.multi_hand_landmarks[0].landmark)
+            # Crop coordinates -> full-frame normalized coordinates
+            points[:, 0] = (points[:, 0] * cw + x0) / w
+            points[:, 1] = (points[:, 1] * ch + y0) / h
+        label = self.update(points, t)
+        if points is not None:
+            xs, ys = self.landmarks[:, 0] * w, self.landmarks[:, 1] * h
+            self.box = (xs.min(), ys.min(), xs.max(), ys.max())
+        else:
+            self.box = None  # search the whole frame again
+        return label
+
+    def update(self, points, t):
+        """ Smoothing + classification + vote for one frame of (21, 3) full-frame landmarks (None: no hand).
+        Used by process() and to replay recorded landmarks without MediaPipe. """
+        self.frames += 1
+        if points is None:
+            if self.filter: self.filter.reset()
+            self.landmarks = None
+            raw = None
+        else:
+            if self.filter: points = self.filter(points, t)
+            self.landmarks = points
+            raw = interpret_landmarks(points)
+        if raw != self._last_raw: self.raw_changes += 1
+        self._last_raw = raw
+        return self._vote(raw)
+
+    def stats(self):
+        return {
+            "frames": self.frames, "inference_ms": self.inference_ms,
+            "raw_changes": self.raw_changes, "label_changes": self.label_changes,
+        }
+
+
+class GestureCommander:
+    """ Stable gesture -> robot action, with the GUI rules:
+    "Open" stops the robot until it has been gone for stop_hold_time; each action is sent once until another one is.
+
+    update() returns (overlay, action): overlay in Stop/Left/Right/Backward/Forward (None: nothing to draw),
+    action in stand/left/right/backward/forward (None: nothing to send).
+    """
+
+    MOVES = {"Left": ("Left", "left"), "Right": ("Right", "right"), "Closed": ("Backward", "backward"),
+             "Peace": ("Forward", "forward")}
+
+    def __init__(self, stop_hold_time=0.5):
+        self.stop_hold_time = stop_hold_time
+        self.moving = True
+        self.stop_time = None
+        self.sent = None  # last action sent
+
+    def reset(self):
+        """ Forget the previous camera session: the next stable gesture is sent again """
+        self.moving, self.stop_time, self.sent = True, None, None
+
+    def update(self, gesture, t):
+        if gesture == "Open":
+            self.stop_time = t
+            self.moving = False
+        elif not self.moving and t - self.stop_time > self.stop_hold_time:
+            self.stop_time = None
+            self.moving = True
+
+        if not self.moving:
+            overlay, action = "Stop", "stand"
+        elif gesture in self.MOVES:
+            overlay, action = self.MOVES[gesture]
+        else:
+            return None, None
+        if action == self.sent: return overlay, None
+        self.sent = action
+        return overlay, action
+
 
+engine = None
 
 
 # Fonction de mise à jour des gestes
 def detect_gesture(image_in_rgb):
-    results = hands.process(image_in_rgb)
-    if results.multi_hand_landmarks:
-        for hand_landmarks in results.multi_hand_landmarks:
-            landmarks = hand_landmarks.landmark
-            gesture = interpret_landmarks(landmarks)
-            return gesture
-    return None
\ No newline at end of file
+    global engine
+    if engine is None: engine = GestureEngine()
+    return engine.process(image_in_rgb)
\ No newline at end of file
@@ -12,6 +12,7 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.patches import FancyBboxPatch
 import matplotlib.patches as patches
 import threading
+import queue
 import time
 import os
 import requests
@@ -927,18 +928,52 @@ class RobotGUI:
     
     def on_camera_start(self):
         """Handle camera start button press"""
+        if self.camera_start_id is not None:
+            self.root.after_cancel(self.camera_start_id)
+            self.camera_start_id = None
+        if self.camera_source is None:
+            # Grab thread reconnects on its own (with backoff) if the camera drops
+            self.camera_source = Camera.CameraSource(0)
+        # Same source after a stop: briefly wait for the old grab thread, never block the UI on a stuck read
+        self.camera_source.start(timeout=0.05)
+        if self.camera_source.state == "stopping":
+            print("Camera still stopping, retrying")
+            self.camera_start_id = self.root.after(self.CAMERA_RESTART_MS, self.on_camera_start)
+            return
+
         print("Starting camera")
         self.Open_camera.set(True)
 
         if self.CameraFeed:
-            self.CameraFeed.configure(text="")
-        
-        self.root.after(1000, self.camera_loop)
+            self.camera_sink.attach()
+
+        self.camera_running.set()
+        if self.camera_worker is None or not self.camera_worker.is_alive():
+            self.camera_worker = threading.Thread(target=self.camera_loop, name="camera-worker", daemon=True)
+            self.camera_worker.start()
+        if self.camera_poll_id is None:
+            self.camera_poll_id = self.root.after(self.CAMERA_POLL_MS, self.poll_camera_queue)
     
     def on_camera_stop(self):
         """Handle camera stop button press"""
         print("Stopping camera")
+        if self.camera_start_id is not None:
+            self.root.after_cancel(self.camera_start_id)  # pending restart
+            self.camera_start_id = None
         self.Open_camera.set(False)
+        self.camera_running.clear()
+        self.camera_session += 1  # frames and commands still in flight belong to the stopped session
+        while True:  # commands queued but not run yet must not fire on the next start
+            try: self.camera_actions.get_nowait()
+            except queue.Empty: break
+        if self.gesture_commander is not None:
+            self.gesture_commander.reset()
+        display = self.camera_sink.stats()
+        print(f"Camera display: {display['shown']} frames shown, {display['dropped']} dropped, "
+              f"{display['ui_ms_mean']:.2f} ms/frame on the UI thread")
+        if self.camera_source is not None:
+            # Don't block the UI: the grab thread releases the camera on its own, start() joins it
+            self.camera_source.stop(timeout=0)
         
         # Show gray placeholder when camera is off
         if self.CameraFeed:
@@ -962,6 +997,8 @@ class RobotGUI:
             # Create camera feed label with proper aspect ratio
             self.CameraFeed = ctk.CTkLabel(self.feed_frame, text="")
             self.CameraFeed.pack(fill="both", expand=True, padx=10, pady=10)
+            # Finished frames (RGB), newest only; attached again on start, after the placeholder below
+            self.camera_sink = Camera.DisplaySink(self.CameraFeed, (480, 360), rgb=True)
 
             # Gray placeholder with correct aspect ratio
             gray_img = Image.new('RGB', (480, 360), color='#333333')  # 16:9 aspect ratio
@@ -970,16 +1007,20 @@ class RobotGUI:
             self.CameraFeed.image = img
             
             # Camera control variables
-            self.last_gesture = None
-            self.gesture_start_time = None
-            self.GESTURE_HOLD_TIME = 0.2
-            self.STOP_start_time = None
             self.STOP_HOLD_TIME = 0.5
-            self.Move = True
-            self.sentstop, self.sentright, self.sentleft, self.sentback, self.sentforward = False, False, False, False, False
+            self.gesture_commander = None  # Hand_Detection.GestureCommander, created by the camera worker
 
             # Initialize camera variables
             self.Open_camera = ctk.BooleanVar(value=False)
+            self.camera_source = None  # Camera.CameraSource, created on first start, restarted after a stop
+            self.camera_worker = None  # long-lived capture + gesture thread
+            self.camera_running = threading.Event()
+            self.camera_actions = queue.Queue()  # (session, robot command) to run on the Tk thread
+            self.camera_session = 0  # incremented on stop: older frames and commands are dropped
+            self.CAMERA_POLL_MS = 15
+            self.camera_poll_id = None
+            self.CAMERA_RESTART_MS = 200  # retry delay while the previous grab thread is still stopping
+            self.camera_start_id = None
             
             print("Camera functionality initialized")
             return True
@@ -988,104 +1029,75 @@ class RobotGUI:
             return False
     
     def camera_loop(self):
-        """Camera loop based on previous interface"""
-        import Hand_Detection, Navigation
-        def camera_thread():
-            if not self.Open_camera.get():
-                if hasattr(Camera, 'Opened') and Camera.Opened:
-                    Camera.CloseCamera(Camera.camera)
-                # Show gray placeholder when camera is off
-                gray_img = Image.new('RGB', (480, 360), color='gray')
-                img = CTkImage(light_image=gray_img, size=gray_img.size)
-                self.CameraFeed.configure(image=img)
-                self.CameraFeed.image = img
-                self.root.after(10, self.camera_loop)
-                return
+        """Camera worker: one long-lived thread that captures, detects gestures and draws overlays.
 
-            if not hasattr(Camera, 'Opened') or not Camera.Opened:
-                print("Camera Not Opened. Retrying.")
-                Camera.Opened, Camera.camera = Camera.OpenCamera(0)
-                self.root.after(10, self.camera_loop)
-                return
+        Finished frames and robot commands are handed to the Tk thread through queues
+        (see poll_camera_queue); this thread never touches a widget.
+        """
+        import Hand_Detection, Navigation
+        if self.gesture_commander is None:
+            self.gesture_commander = Hand_Detection.GestureCommander(self.STOP_HOLD_TIME)
+        session = None
+        while self.camera_running.is_set():
+            source = self.camera_source
+            if source is None:
+                break
+            if session != self.camera_session:
+                # First frame or restarted after a stop: skip older frames and gesture state
+                session = self.camera_session
+                last_id = source.frame_id
+                self.gesture_commander.reset()
+            frame_id, frame = source.read(last_id, timeout=0.5, RGB=True)
+            if frame is None:
+                continue  # camera connecting or stalled
+            last_id = frame_id
+            frame = self.process_camera_frame(frame, Hand_Detection, Navigation, session)
+            if session == self.camera_session:
+                self.camera_sink.submit(frame)  # replaces a frame the UI has not shown yet
+
+    def process_camera_frame(self, frame, Hand_Detection, Navigation, session=None):
+        """Gesture detection + overlays (camera worker thread); robot commands are queued for Tk"""
+        frame_height, frame_width, _ = frame.shape
+
+        # Free heading from YOLO obstacles (ROBODOG_OBSTACLES=1), on the frame before any overlay is drawn
+        if Navigation.OBSTACLE_OVERLAY:
+            obstacles = Navigation.detect_obstacles(frame, RGB=True)
+            heading, costs = Navigation.best_heading(obstacles, frame_width, frame_height)
+
+        # Hand Detection (from previous interface)
+        detected_gesture = Hand_Detection.detect_gesture(frame)
+        overlay, action = self.gesture_commander.update(detected_gesture, time.time())
+        if overlay == "Stop":
+            frame = Navigation.Stop(frame, frame_width, frame_height)
+        elif overlay in ["Left", "Right"]:
+            frame = Navigation.rotate_camera(frame, frame_width, frame_height, overlay)
+        elif overlay:
+            frame = Navigation.Move(frame, frame_width, frame_height, overlay)
+        if Navigation.OBSTACLE_OVERLAY:
+            frame = Navigation.Heading(frame, frame_width, frame_height, heading, costs)
+
+        # Send the command to the robot (once per change, from the Tk thread)
+        if action == "stand":
+            self.camera_actions.put((session, self.on_stand))
+        elif action:
+            self.camera_actions.put((session, lambda: self.on_movement_button(action)))
+        return frame
+
+    def poll_camera_queue(self):
+        """Tk thread: run queued robot commands and show the newest finished frame"""
+        while True:
+            try: session, action = self.camera_actions.get_nowait()
+            except queue.Empty: break
+            if session == self.camera_session: action()  # else queued by a stopped session
 
-            success, frame = Camera.GetFrame(Camera.camera, RGB=True)
-            if not success:
-                print("Failed Capturing Video Frame. Retrying.")
-                self.root.after(10, self.camera_loop)
-                return
-            
-            frame_height, frame_width, _ = frame.shape
-
-            # Hand Detection (from previous interface)
-            detected_gesture = Hand_Detection.detect_gesture(frame)
-            current_time = time.time()
-            if detected_gesture:
-                if detected_gesture == self.last_gesture:
-                    if (current_time - self.gesture_start_time) > self.GESTURE_HOLD_TIME:
-                        pass
-                else:
-                    self.last_gesture = detected_gesture
-                    self.gesture_start_time = current_time
-            else:
-                self.last_gesture = None
-                self.gesture_start_time = None
-
-            if self.last_gesture == "Open":
-                self.STOP_start_time = time.time()
-                self.Move = False
-            elif self.Move == False and time.time() - self.STOP_start_time > self.STOP_HOLD_TIME:
-                self.STOP_start_time = None
-                self.Move = True
-            
-            if self.Move == False:
-                frame = Navigation.Stop(frame, frame_width, frame_height)
-                if not self.sentstop:
-                    # Send stop command to robot
-                    self.on_stand()
-                    self.sentstop = True
-                    self.sentright, self.sentleft, self.sentback, self.sentforward = False, False, False, False
-            
-            if self.Move:
-                if self.last_gesture in ["Left", "Right"]:
-                    frame = Navigation.rotate_camera(frame, frame_width, frame_height, f"{self.last_gesture}")
-                    if self.last_gesture == "Left" and not self.sentleft:
-                        # Send left command to robot
-                        self.on_movement_button('left')
-                        self.sentleft = True
-                        self.sentright, self.sentstop, self.sentback, self.sentforward = False, False, False, False
-                    if self.last_gesture == "Right" and not self.sentright:
-                        # Send right command to robot
-                        self.on_movement_button('right')
-                        self.sentright = True
-                        self.sentleft, self.sentstop, self.sentback, self.sentforward = False, False, False, False
-                elif self.last_gesture == "Closed":
-                    frame = Navigation.Move(frame, frame_width, frame_height, "Backward")
-                    if not self.sentback:
-                        # Send backward command to robot
-                        self.on_movement_button('backward')
-                        self.sentback = True
-                        self.sentleft, self.sentstop, self.sentright, self.sentforward = False, False, False, False
-                elif self.last_gesture == "Peace":
-                    frame = Navigation.Move(frame, frame_width, frame_height, "Forward")
-                    if not self.sentforward:
-                        # Send forward command to robot
-                        self.on_movement_button('forward')
-                        self.sentforward = True
-                        self.sentleft, self.sentstop, self.sentright, self.sentback = False, False, False, False
-
-            # Convert frame to image and update label
-            pil_image = Image.fromarray(frame).resize((480, 360), Image.Resampling.LANCZOS)
-            self.current_frame_image = CTkImage(light_image=pil_image, size=pil_image.size)
-
-            if self.CameraFeed and self.Open_camera.get():
-                self.CameraFeed.configure(image=self.current_frame_image, text="")
-                self.CameraFeed.image = self.current_frame_image
-
-            if self.Open_camera.get():
-                self.root.after(10, self.camera_loop)
+        if self.Open_camera.get():
+            # Resize into a fixed buffer and update the persistent PhotoImage in place
+            self.camera_sink.poll()
 
         if self.Open_camera.get():
-            threading.Thread(target=camera_thread, daemon=True).start()
+            self.camera_poll_id = self.root.after(self.CAMERA_POLL_MS, self.poll_camera_queue)
+        else:
+            self.camera_poll_id = None
 
     def setup_serial_communication(self):
         """Serial communication setup"""
@@ -1,45 +1,179 @@
+import os
+import time
 import cv2
 import torch
 import numpy as np
 from ultralytics import YOLO
 
+from YoloBackend import BACKENDS, YoloRunner
+
+# Inference backend: "torch" (default, ultralytics), "onnxruntime" or "openvino" (YoloBackend.YoloRunner).
+# The ONNX export is done once and cached next to the .pt file; ROBODOG_YOLO_THREADS applies to every backend.
+YOLO_WEIGHTS = os.environ.get("ROBODOG_YOLO_WEIGHTS", "yolov8n.pt")
+YOLO_BACKEND = os.environ.get("ROBODOG_YOLO_BACKEND", "torch")
+YOLO_THREADS = int(os.environ.get("ROBODOG_YOLO_THREADS", "0")) or None
+YOLO_INT8 = os.environ.get("ROBODOG_YOLO_INT8", "0") == "1"
+# Inference size (multiple of 32): 320 or 416 is ~2-4x faster than 640 on CPU, enough for large obstacles
+YOLO_IMGSZ = int(os.environ.get("ROBODOG_YOLO_IMGSZ", "640"))
+
+# Obstacle detection: confidence and class filters are applied inside the model call (NMS),
+# YOLO runs every OBSTACLE_EVERY frames and boxes are propagated in between.
+OBSTACLE_CONF = 0.5
+OBSTACLE_CLASSES = None  # COCO class ids to keep, e.g. [0, 56, 57, 60] (person, chair, couch, table); None = all
+OBSTACLE_EVERY = int(os.environ.get("ROBODOG_OBSTACLE_EVERY", "1"))
+# Camera overlay of the free heading (best_heading) in the GUI; off by default, it adds YOLO to the gesture loop
+OBSTACLE_OVERLAY = os.environ.get("ROBODOG_OBSTACLES", "0") == "1"
+
+
+def load_model(weights=YOLO_WEIGHTS, backend=YOLO_BACKEND, threads=YOLO_THREADS, int8=YOLO_INT8, imgsz=YOLO_IMGSZ):
+    """ YOLO model for the given backend: ultralytics YOLO (torch) or YoloRunner (exported, fixed imgsz) """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown YOLO backend: {backend} (choose from {', '.join(BACKENDS)})")
+    if int8 and backend != "onnxruntime":
+        raise ValueError("INT8 is only available with onnxruntime")
+    if threads:
+        torch.set_num_threads(threads)  # also used by ultralytics pre/post-processing
+    if backend == "torch":
+        return YOLO(weights)
+    return YoloRunner(weights, backend=backend, threads=threads, int8=int8, imgsz=imgsz)
+
+
 # Load YOLO model
-model = YOLO("yolov8n.pt")
+model = load_model()
 
 # Define general movement direction (example: forward)
 general_direction = (0, 1)  # (dx, dy) where y=1 means moving forward
 
 
 
-def detect_obstacles(frame):
-    # NOTE: verbose has been disabled, reenable it for more info.
-    results = model(frame, verbose=False)  # Run YOLO on the frame
-    detections = []
-    
-    for result in results:
-        for box in result.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])  # Bounding box
-            confidence = float(box.conf[0])  # Confidence score
-            cls = int(box.cls[0])  # Class index
-            
-            if confidence > 0.5:  # Threshold for detection
-                detections.append((x1, y1, x2, y2, cls, confidence))
-    
-    return detections
+def box_iou(a, b):
+    """ IoU matrix between (N, 4) and (M, 4) xyxy boxes """
+    lt = np.maximum(a[:, None, :2], b[None, :, :2])
+    rb = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.prod(np.clip(rb - lt, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:4] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:4] - b[:, :2], axis=1)
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+class ObstacleDetector:
+    """ YOLO obstacle detector for the camera loop
+
+    Returns an (N, 6) float32 array of rows (x1, y1, x2, y2, cls, conf) in frame pixels.
+    - imgsz: YOLO input size (the frame is letterboxed to it); a YoloRunner keeps the size of its export;
+    - conf / classes: filtering done by the model's NMS instead of in Python;
+    - every: run YOLO on one frame out of `every`; in between, the last boxes are moved by their
+      per-frame velocity (matched by IoU between the last two YOLO runs).
+    """
+
+    def __init__(self, yolo=None, imgsz=YOLO_IMGSZ, conf=OBSTACLE_CONF, classes=OBSTACLE_CLASSES,
+                 every=OBSTACLE_EVERY, match_iou=0.3):
+        self.yolo = yolo  # None: use the module model (load_model)
+        self.imgsz, self.conf, self.classes = imgsz, conf, classes
+        self.every, self.match_iou = max(1, every), match_iou
+        self.boxes = np.zeros((0, 6), np.float32)  # last YOLO result
+        self.velocity = np.zeros((0, 4), np.float32)  # pixels per frame for each box
+        self.since = 0  # frames since the last YOLO run
+        self.frames, self.runs, self.inference_ms = 0, 0, 0.0
+
+    def detect(self, frame):
+        """ One YOLO run -> (N, 6) array (one bulk GPU/CPU -> NumPy copy) """
+        start = time.perf_counter()
+        yolo = self.yolo or model
+        if isinstance(yolo, YoloRunner):
+            boxes, scores, classes = yolo(frame, conf=self.conf, classes=self.classes)
+            data = np.column_stack([boxes, classes, scores]).astype(np.float32)
+        else:
+            result = yolo(frame, imgsz=self.imgsz, conf=self.conf, classes=self.classes, verbose=False)[0]
+            data = result.boxes.data.cpu().numpy()[:, [0, 1, 2, 3, 5, 4]].astype(np.float32)  # conf, cls -> cls, conf
+        self.inference_ms = 0.9 * self.inference_ms + 100 * (time.perf_counter() - start)
+        self.runs += 1
+        return data
+
+    def _velocity(self, new, frames):
+        """ Per-frame motion of each new box, from the best matching previous box of the same class """
+        velocity = np.zeros((len(new), 4), np.float32)
+        if len(new) and len(self.boxes):
+            iou = box_iou(new, self.boxes)
+            iou[new[:, 4, None] != self.boxes[None, :, 4]] = 0
+            best = iou.argmax(axis=1)
+            matched = iou[np.arange(len(new)), best] >= self.match_iou
+            velocity[matched] = (new[matched, :4] - self.boxes[best[matched], :4]) / frames
+        return velocity
+
+    def __call__(self, frame):
+        self.frames += 1
+        self.since += 1
+        if self.frames == 1 or self.since >= self.every:
+            new = self.detect(frame)
+            self.velocity = self._velocity(new, self.since)
+            self.boxes, self.since = new, 0
+            return new
+        boxes = self.boxes.copy()
+        boxes[:, :4] += self.velocity * self.since
+        h, w = frame.shape[:2]
+        boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+        boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+        return boxes
+
+    def reset(self):
+        self.boxes, self.velocity, self.since, self.frames = self.boxes[:0], self.velocity[:0], 0, 0
+
+    def stats(self):
+        return {"frames": self.frames, "yolo_runs": self.runs, "inference_ms": self.inference_ms}
+
+
+obstacle_detector = None
+
+
+def detect_obstacles(frame, RGB=False):
+    """ Obstacles in the frame (BGR, or RGB=True): (N, 6) array of (x1, y1, x2, y2, cls, conf) rows """
+    global obstacle_detector
+    if obstacle_detector is None: obstacle_detector = ObstacleDetector()
+    if RGB: frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    return obstacle_detector(frame)
 
 
 
+# Free-space estimate: boxes rasterised into a coarse grid, each heading scores a band of columns.
+GRID_ROWS, GRID_COLS = 12, 16
+HEADINGS = ("Left", "Forward", "Right")
+HEADING_BANDS = np.array([(0.0, 0.3), (0.3, 0.7), (0.7, 1.0)])  # image x range of each heading (fraction)
+PATH_CLEAR_COST = 0.02  # heading is free below this cost (about one occupied cell near the robot)
+
+_cell_x = (np.arange(GRID_COLS + 1) / GRID_COLS)  # cell edges, fraction of the frame
+_cell_y = (np.arange(GRID_ROWS + 1) / GRID_ROWS)
+_cell_center_x = (_cell_x[:-1] + _cell_x[1:]) / 2
+# Only the lower half matters (ground in front of the robot); closer rows weigh more
+_row_weight = np.clip(2 * (_cell_y[:-1] + _cell_y[1:]) / 2 - 1, 0, None)
+_band_mask = ((_cell_center_x >= HEADING_BANDS[:, :1]) & (_cell_center_x < HEADING_BANDS[:, 1:])).astype(np.float64)
+_band_weight = _band_mask.sum(axis=1) * _row_weight.sum()
+
+
+def occupancy_grid(detections, frame_width, frame_height):
+    """ (GRID_ROWS, GRID_COLS) grid: highest confidence of the boxes covering each cell (0 = free) """
+    boxes = np.asarray(detections, dtype=np.float64).reshape(-1, 6)
+    x1, y1 = boxes[:, 0:1] / frame_width, boxes[:, 1:2] / frame_height
+    x2, y2 = boxes[:, 2:3] / frame_width, boxes[:, 3:4] / frame_height
+    rows = (_cell_y[1:] > y1) & (_cell_y[:-1] < y2)  # (N, rows): box overlaps the cell row
+    cols = (_cell_x[1:] > x1) & (_cell_x[:-1] < x2)  # (N, cols)
+    covered = rows[:, :, None] & cols[:, None, :]
+    return (covered * boxes[:, 5, None, None]).max(axis=0, initial=0.0)
+
+
+def best_heading(detections, frame_width, frame_height):
+    """ Recommended heading ("Forward", "Left", "Right", or None when everything is blocked) and the
+    cost of each heading in HEADINGS order (weighted occupied fraction of its band, 0 = free) """
+    grid = occupancy_grid(detections, frame_width, frame_height)
+    costs = _band_mask @ (_row_weight @ grid) / _band_weight
+    if costs[1] < PATH_CLEAR_COST: return "Forward", costs  # keep going straight when possible
+    side = 0 if costs[0] <= costs[2] else 2
+    return (HEADINGS[side] if costs[side] < PATH_CLEAR_COST else None), costs
+
+
 def is_path_clear(detections, frame_width, frame_height):
     """ Check if there are obstacles in the movement direction """
-    for x1, y1, x2, y2, cls, conf in detections:
-        obj_center_x = (x1 + x2) // 2
-        obj_center_y = (y1 + y2) // 2
-
-        # Central region
-        if frame_width * 0.3 < obj_center_x < frame_width * 0.7 and obj_center_y > frame_height * 0.5:
-            return False
-    
-    return True
+    return best_heading(detections, frame_width, frame_height)[0] == "Forward"
 
 
 
@@ -78,6 +212,18 @@ def Move(frame, frame_width, frame_height, direction):
     except: print("Move Error")
     return frame
 
+def Heading(frame, frame_width, frame_height, heading, costs):
+    """ Free-path overlay: one bar per heading band at the bottom (green = free, red = blocked) + recommendation """
+    try:
+        y1, y2 = int(0.92*frame_height), frame_height - 4
+        for (left, right), cost in zip(HEADING_BANDS, costs):
+            color = (0, 255, 0) if cost < PATH_CLEAR_COST else (255, 0, 0)  # RGB camera frame
+            cv2.rectangle(frame, (int(left*frame_width) + 4, y1), (int(right*frame_width) - 4, y2), color, 4)
+        text = f"Path: {heading or 'Blocked'}"
+        cv2.putText(frame, text, (10, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+    except: print("Heading Error")
+    return frame
+
 def Stop(frame, frame_width, frame_height):
     try:
         # Circle
@@ -91,4 +237,53 @@ def Stop(frame, frame_width, frame_height):
         text_x, text_y = center_coordinates[0]-text_width//2, center_coordinates[1]+text_height//2
         cv2.putText(frame, text, (text_x, text_y), font, font_scale, text_color, thickness=4)
     except: print("Stop Error")
-    return frame
\ No newline at end of file
+    return frame
+
+
+
+if __name__ == "__main__":
+    # Backend benchmark: python Navigation.py [video] -> latency and agreement with the torch model
+    import sys
+    cap = cv2.VideoCapture(sys.argv[1] if len(sys.argv) > 1 else 0)
+    frames = []
+    while len(frames) < 50:
+        ret, frame = cap.read()
+        if not ret: break
+        frames.append(frame)
+    cap.release()
+
+    def run(detector):
+        detector(frames[0]); detector.reset()  # warm-up
+        start = time.perf_counter()
+        results = [detector(frame) for frame in frames]
+        return results, 1000 * (time.perf_counter() - start) / max(1, len(frames))
+
+    reference = None
+    for backend, int8 in (("torch", False), ("onnxruntime", False), ("onnxruntime", True), ("openvino", False)):
+        try:
+            model = load_model(backend=backend, int8=int8)
+        except ImportError as e:
+            print(f"{backend:<12}{' int8' if int8 else '':<6}unavailable ({e.name} not installed)")
+            continue
+        results, latency = run(ObstacleDetector(every=1))
+        reference = reference or results
+        same = sum(len(a) == len(b) for a, b in zip(reference, results))
+        print(f"{backend:<12}{' int8' if int8 else '':<6}{latency:7.1f} ms/frame, "
+              f"same detection count as torch on {same}/{len(frames)} frames")
+
+    # Inference size and frame skipping: latency and boxes kept vs 640 on every frame.
+    # torch only: ONNX / OpenVINO exports have a fixed input size and cannot honour imgsz.
+    model = load_model(backend="torch")
+    reference = None
+    for imgsz, every in ((640, 1), (416, 1), (320, 1), (640, 3), (320, 3)):
+        results, latency = run(ObstacleDetector(imgsz=imgsz, every=every))
+        reference = reference or results
+        expected = sum(len(a) for a in reference)
+        found = sum(int((box_iou(a[:, :4], b[:, :4]) >= 0.5).any(axis=1).sum())
+                    for a, b in zip(reference, results) if len(a) and len(b))
+        print(f"imgsz {imgsz:<4} every {every}: {latency:7.1f} ms/frame, {found}/{expected} boxes found (IoU >= 0.5)")
+
+    h, w = frames[0].shape[:2]
+    start = time.perf_counter()
+    for boxes in reference * 20: best_heading(boxes, w, h)
+    print(f"best_heading: {1e6 * (time.perf_counter() - start) / (20 * len(reference)):.0f} us/frame")
@@ -0,0 +1,125 @@
+"""
+YOLOv8 on CPU through ONNX Runtime or OpenVINO, with a configurable number of threads.
+
+Intentional copy of "mars rover/yolo_backend.py" (same backend names, same cache layout, same pre/post-processing);
+the projects ship standalone, so a change to either file must be made in both:
+the .pt model is exported once to ONNX and cached next to it (<stem>-<imgsz>.onnx, optional
+<stem>-<imgsz>-int8.onnx with dynamically quantized weights), then run by
+    - "onnxruntime": intra-op threads set on the session, INT8 available;
+    - "openvino":    the same ONNX file compiled for the CPU, INFERENCE_NUM_THREADS set.
+The export has a fixed input size (imgsz).
+"""
+import os
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+BACKENDS = ("torch", "onnxruntime", "openvino")
+DEFAULT_IMGSZ = 640
+
+
+def _is_fresh(path, source):
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def export_onnx(weights, imgsz=DEFAULT_IMGSZ):
+    """ Export weights to ONNX once; returns the cached file """
+    from ultralytics import YOLO
+
+    if not os.path.exists(weights):
+        YOLO(weights)  # downloads the official weights
+    onnx_path = f"{os.path.splitext(weights)[0]}-{imgsz}.onnx"
+    if _is_fresh(onnx_path, weights):
+        return onnx_path
+    # ultralytics writes <stem>.onnx next to the .pt: export a copy in a temporary folder instead
+    with tempfile.TemporaryDirectory() as tmp:
+        exported = YOLO(shutil.copy(weights, tmp)).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+        shutil.move(exported, onnx_path)
+    return onnx_path
+
+
+def quantize_int8(onnx_path):
+    """ INT8 version of onnx_path (dynamic quantization of the weights, no calibration data), cached """
+    int8_path = f"{os.path.splitext(onnx_path)[0]}-int8.onnx"
+    if _is_fresh(int8_path, onnx_path):
+        return int8_path
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def letterbox(image, size):
+    """ Resize keeping the aspect ratio, pad with gray (114) to size x size """
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = round(w * ratio), round(h * ratio)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+    return out, ratio, (pad_x, pad_y)
+
+
+class YoloRunner:
+    """ YOLOv8 exported to ONNX, run by ONNX Runtime or OpenVINO
+
+    runner(image_bgr, conf=None, classes=None) -> (boxes xyxy (N, 4), scores (N,), classes (N,)) in image pixels
+    """
+
+    def __init__(self, weights, backend="onnxruntime", threads=None, int8=False, imgsz=DEFAULT_IMGSZ,
+                 conf=0.5, iou=0.45):
+        if backend not in ("onnxruntime", "openvino"):
+            raise ValueError(f"Unknown YOLO backend: {backend}")
+        if int8 and backend != "onnxruntime":
+            raise ValueError("INT8 is only available with onnxruntime")
+        self.backend, self.imgsz, self.conf, self.iou = backend, imgsz, conf, iou
+        self.model_path = export_onnx(weights, imgsz)
+        if int8: self.model_path = quantize_int8(self.model_path)
+
+        if backend == "onnxruntime":
+            import onnxruntime as ort
+            options = ort.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+                options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+            name = session.get_inputs()[0].name
+            self._infer = lambda blob: session.run(None, {name: blob})
+        else:
+            import openvino as ov
+            core = ov.Core()
+            config = {"PERFORMANCE_HINT": "LATENCY"}
+            if threads: config["INFERENCE_NUM_THREADS"] = threads
+            compiled = core.compile_model(core.read_model(self.model_path), "CPU", config)
+            request, outputs = compiled.create_infer_request(), compiled.outputs
+            self._infer = lambda blob: [request.infer({0: blob})[output] for output in outputs]
+
+    def __call__(self, image_bgr, conf=None, classes=None):
+        conf = self.conf if conf is None else conf
+        padded, ratio, (pad_x, pad_y) = letterbox(image_bgr, self.imgsz)
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)  # NCHW float32 RGB
+        pred = np.asarray(self._infer(blob)[0])[0]  # (4 + nc, N)
+        class_scores = pred[4:]
+        ids = class_scores.argmax(axis=0)
+        scores = class_scores[ids, np.arange(class_scores.shape[1])]
+        keep = scores > conf
+        if classes is not None: keep &= np.isin(ids, classes)
+        if not keep.any():
+            return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+        cx, cy, w, h = pred[:4, keep]
+        scores, ids = scores[keep], ids[keep]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        # Per-class NMS (boxes shifted by class so that classes never overlap)
+        shifted = boxes + ids[:, None] * (self.imgsz + 1)
+        xywh = np.concatenate([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]], axis=1)
+        kept = np.asarray(cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, self.iou), dtype=np.int64).reshape(-1)
+
+        boxes = boxes[kept]
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / ratio).clip(0, image_bgr.shape[1])
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / ratio).clip(0, image_bgr.shape[0])
+        return boxes.astype(np.float32), scores[kept].astype(np.float32), ids[kept]
@@ -1,7 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Arrow
+import os
 import speech_recognition as sr
 import threading
 import cv2
@@ -11,13 +9,21 @@ from datetime import datetime
 from PIL import Image
 import time
 import webbrowser
-import re
 from collections import deque
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 import streamlit as st
 
+from serial_reader import SerialReader
+from telemetry_parser import format_value, parse_line
+from telemetry_store import TelemetryStore
+from robot_visualization import render_robot_png, wheel_states
+from kinematics import MecanumKinematics, active_wheels
+from command_queue import CommandQueue
+from binary_protocol import FrameDecoder
+from gesture_features import COMMANDS  # dictionnaire des gestes, partagé avec gesture_replay.py
+
 # === Configuration des constantes ===
 R = 0.05  # Rayon des roues (5 cm)
 L = 0.20  # Demi-longueur (20 cm)
@@ -25,6 +31,13 @@ l = 0.125  # Demi-largeur (12.5 cm)
 MAX_SPEED = 1.0
 SPEED_STEP = 0.1
 ACCELERATION = 0.05
+CINEMATIQUE = MecanumKinematics(R, L, l)  # Jacobienne construite une seule fois
+TELEMETRY_REFRESH_SEC = 0.25  # Période de rafraîchissement du fragment télémétrie
+DEBUG_LINES = 20  # Lignes brutes gardées pour l'affichage debug (case « Trames brutes »)
+TELEMETRY_BINARY = False  # True si le firmware envoie les trames binaires (binary_protocol.py)
+# Port de l'ESP32 ; ESP32_PORT=/dev/pts/N pour utiliser serial_simulator.py
+ESP32_PORT = os.environ.get("ESP32_PORT", "COM14")
+ESP32_BAUD = int(os.environ.get("ESP32_BAUD", "57600"))
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -39,26 +52,16 @@ if 'esp32_connected' not in st.session_state:
     st.session_state.esp32_connected = False
 if 'esp32_serial' not in st.session_state:
     st.session_state.esp32_serial = None
+if 'serial_reader' not in st.session_state:
+    st.session_state.serial_reader = None
+if 'command_queue' not in st.session_state:
+    st.session_state.command_queue = None
 if 'command_history' not in st.session_state:
     st.session_state.command_history = []
-if 'donnees_capteurs' not in st.session_state:
-    st.session_state.donnees_capteurs = {
-        "distance": "N/A cm",
-        "gaz": "N/A",
-        "temperature": "N/A °C",
-        "humidity": "N/A %",
-        "accX": "N/A m/s²",
-        "accY": "N/A m/s²",
-        "accZ": "N/A m/s²",
-        "gyroX": "N/A °/s",
-        "gyroY": "N/A °/s",
-        "gyroZ": "N/A °/s",
-        "tempMPU": "N/A °C",
-        "latitude": "N/A°",
-        "longitude": "N/A°",
-        "altitude": "N/A m",
-        "satellites": "N/A"
-    }
+if 'telemetrie' not in st.session_state:
+    st.session_state.telemetrie = TelemetryStore()
+if 'figure_historique' not in st.session_state:
+    st.session_state.figure_historique = None
 if 'Vx' not in st.session_state:
     st.session_state.Vx = 0.0
 if 'Vy' not in st.session_state:
@@ -79,6 +82,8 @@ if 'camera_active' not in st.session_state:
     st.session_state.camera_active = False
 if 'capteur_selectionne' not in st.session_state:
     st.session_state.capteur_selectionne = "all"
+if 'debug_lignes' not in st.session_state:
+    st.session_state.debug_lignes = deque(maxlen=DEBUG_LINES)
 
 # Mapping des commandes pour ESP32
 COMMAND_MAPPING = {
@@ -91,18 +96,6 @@ COMMAND_MAPPING = {
     "rot_right": "l"
 }
 
-# Dictionnaire des gestes
-COMMANDS = {
-    "CLOSED": "STOP",
-    "ONE": "AVANCE",
-    "TWO": "RECULE",
-    "THREE": "TOURNER_GAUCHE",
-    "FOUR": "TOURNER_DROITE",
-    "FIVE": "SCAN_GAZ",
-    "LEFT_TILT": "LATERAL_GAUCHE",
-    "RIGHT_TILT": "LATERAL_DROITE"
-}
-
 # Commandes vocales valides
 commandes_valides = [
     "avance", "arrête", "stop", "recule",
@@ -117,10 +110,16 @@ commandes_valides = [
 
 def connect_to_esp32():
     try:
-        st.session_state.esp32_serial = serial.Serial('COM14', 57600, timeout=1)
+        st.session_state.esp32_serial = serial.Serial(ESP32_PORT, ESP32_BAUD, timeout=1)
         time.sleep(2)
+        st.session_state.serial_reader = SerialReader(
+            st.session_state.esp32_serial, parse=parse_line,
+            store=st.session_state.telemetrie,
+            decoder=FrameDecoder() if TELEMETRY_BINARY else None
+        ).start()
+        st.session_state.command_queue = CommandQueue(st.session_state.esp32_serial).start()
         st.session_state.esp32_connected = True
-        add_to_history("✅ Connecté à ESP32 sur COM14", "Système")
+        add_to_history(f"✅ Connecté à ESP32 sur {ESP32_PORT}", "Système")
         return True
     except Exception as e:
         add_to_history(f"❌ Échec de la connexion à l'ESP32: {e}", "Système")
@@ -128,9 +127,15 @@ def connect_to_esp32():
         return False
 
 def disconnect_esp32():
+    if st.session_state.serial_reader:
+        st.session_state.serial_reader.stop()
+        st.session_state.serial_reader = None
+    if st.session_state.command_queue:
+        st.session_state.command_queue.put("s")
+        st.session_state.command_queue.stop(flush=True)
+        st.session_state.command_queue = None
     if st.session_state.esp32_serial:
         try:
-            st.session_state.esp32_serial.write(b"s\n")
             st.session_state.esp32_serial.close()
         except:
             pass
@@ -142,14 +147,15 @@ def send_command_to_esp32(command):
     if not st.session_state.esp32_connected:
         add_to_history("ESP32 non connecté", "Système")
         return None
-    try:
-        st.session_state.esp32_serial.write(f"{command}\n".encode())
-        add_to_history(f"Commande envoyée: {command}", "Système")
-        return True
-    except Exception as e:
-        add_to_history(f"Erreur d'envoi: {e}", "Système")
+    # Écriture asynchrone : le thread de la file fait l'E/S série
+    queue = st.session_state.command_queue
+    if queue.error is not None:
+        add_to_history(f"Erreur d'envoi: {queue.error}", "Système")
         st.session_state.esp32_connected = False
         return None
+    queue.put(command)
+    add_to_history(f"Commande envoyée: {command}", "Système")
+    return True
 
 def add_to_history(message, source="Système"):
     timestamp = datetime.now().strftime("%H:%M:%S")
@@ -162,79 +168,143 @@ def add_to_history(message, source="Système"):
 # ============================================================================
 
 def lire_donnees_capteurs():
-    """Lecture continue des données capteurs"""
-    if st.session_state.esp32_serial and st.session_state.esp32_connected and st.session_state.esp32_serial.in_waiting:
-        try:
-            line = st.session_state.esp32_serial.readline().decode('utf-8', errors='ignore').strip()
-            if line:
-                debug_donnees_capteurs(line)
-                parser_donnees_capteurs(line)
-        except Exception as e:
-            st.error(f"Erreur lecture données capteurs: {e}")
-
-def parser_donnees_capteurs(line):
-    patterns = {
-        "distance": r"\[Distance\] : ([\d.]+) cm",
-        "gaz": r"\[Gaz\] : ([\d.]+)",
-        "temperature": r"\[HTU21D\] Température : ([\d.-]+) °C",
-        "humidity": r"\[HTU21D\] Humidité : ([\d.-]+) %",
-        "accX": r"\[MPU6050\] Accélération X: ([\d.-]+)",
-        "accY": r"\[MPU6050\].*Accélération.*Y: ([\d.-]+)",
-        "accZ": r"\[MPU6050\].*Accélération.*Z: ([\d.-]+)",
-        "gyroX": r"\[MPU6050\] Gyroscope X: ([\d.-]+)",
-        "gyroY": r"\[MPU6050\].*Gyroscope.*Y: ([\d.-]+)",
-        "gyroZ": r"\[MPU6050\].*Gyroscope.*Z: ([\d.-]+)",
-        "tempMPU": r"\[MPU6050\] Température: ([\d.-]+) °C",
-        "latitude": r"\[GPS\].*Latitude: ([\d.-]+)",
-        "longitude": r"\[GPS\].*Longitude: ([\d.-]+)",
-        "altitude": r"\[GPS\].*Altitude: ([\d.-]+)",
-        "satellites": r"\[GPS\].*Satellites: ([\d]+)"
-    }
-   
-    data_updated = False
-    for key, pattern in patterns.items():
-        match = re.search(pattern, line)
-        if match:
-            try:
-                value = float(match.group(1))
-                st.session_state.donnees_capteurs[key] = f"{value:.2f}"
-               
-                # Ajout des unités si nécessaire
-                if key in ["accX", "accY", "accZ"]:
-                    st.session_state.donnees_capteurs[key] += " m/s²"
-                elif key in ["gyroX", "gyroY", "gyroZ"]:
-                    st.session_state.donnees_capteurs[key] += " °/s"
-                elif key in ["latitude", "longitude"]:
-                    st.session_state.donnees_capteurs[key] += "°"
-                elif key == "altitude":
-                    st.session_state.donnees_capteurs[key] += " m"
-                elif key == "tempMPU":
-                    st.session_state.donnees_capteurs[key] += " °C"
-                elif key == "distance":
-                    st.session_state.donnees_capteurs[key] += " cm"
-                elif key == "humidity":
-                    st.session_state.donnees_capteurs[key] += " %"
-                elif key == "temperature":
-                    st.session_state.donnees_capteurs[key] += " °C"
-               
-                data_updated = True
-            except ValueError:
-                st.error(f"Erreur de conversion pour {key}: {match.group(1)}")
+    """Récupère les lignes et le dernier état lus par le thread série"""
+    reader = st.session_state.serial_reader
+    if reader is None or not st.session_state.esp32_connected:
+        return
+    if reader.error is not None:
+        st.error(f"Erreur lecture données capteurs: {reader.error}")
+        add_to_history(f"Erreur lecture série: {reader.error}", "Système")
+        reader.stop()
+        st.session_state.serial_reader = None
+        st.session_state.esp32_connected = False
+        return
+    lines = reader.drain()
+    if st.session_state.get("debug_capteurs"):
+        # Debug : seules les dernières lignes utiles sont gardées, affichées en un seul bloc
+        st.session_state.debug_lignes.extend(
+            f"{label}: {line}" for line in lines if (label := debug_donnees_capteurs(line))
+        )
+
+def capteur(key):
+    """Dernière valeur d'un capteur, formatée avec son unité"""
+    return format_value(key, st.session_state.telemetrie.latest(key))
 
 def debug_donnees_capteurs(line):
-    """Fonction de debug pour voir les données brutes de l'Arduino"""
+    """Catégorie debug d'une ligne brute de l'Arduino (None : ligne non suivie)"""
     if "[MPU6050]" in line and "Accélération" in line:
-        st.write(f"DEBUG ACCEL: {line}")
+        return "DEBUG ACCEL"
     if "[MPU6050]" in line and "Gyroscope" in line:
-        st.write(f"DEBUG GYRO: {line}")
+        return "DEBUG GYRO"
     if "[GPS]" in line:
-        st.write(f"DEBUG GPS: {line}")
+        return "DEBUG GPS"
+    return None
+
+@st.fragment(run_every=TELEMETRY_REFRESH_SEC if st.session_state.esp32_connected else None)
+def afficher_donnees_capteurs(capteur_key, selected_capteur):
+    """Fragment de télémétrie : seul ce bloc est réexécuté périodiquement,
+    le reste de la page ne se recharge que sur interaction utilisateur."""
+    if st.session_state.esp32_connected:
+        lire_donnees_capteurs()
+        if not st.session_state.esp32_connected:
+            # Lien perdu : recharger toute la page pour mettre à jour la sidebar
+            st.rerun()
+
+    st.subheader("Données des Capteurs")
+
+    if st.session_state.get("debug_capteurs"):
+        st.code("\n".join(st.session_state.debug_lignes) or "Aucune trame brute", language=None)
+
+    if capteur_key == "all":
+        col2a, col2b = st.columns(2)
+       
+        with col2a:
+            st.metric("Distance", capteur('distance'))
+            st.metric("Gaz", capteur('gaz'))
+            st.metric("Température", capteur('temperature'))
+            st.metric("Humidité", capteur('humidity'))
+           
+            st.write("**Accéléromètre:**")
+            st.text(f"X: {capteur('accX')}")
+            st.text(f"Y: {capteur('accY')}")
+            st.text(f"Z: {capteur('accZ')}")
+       
+        with col2b:
+            st.write("**Gyroscope:**")
+            st.text(f"X: {capteur('gyroX')}")
+            st.text(f"Y: {capteur('gyroY')}")
+            st.text(f"Z: {capteur('gyroZ')}")
+           
+            st.metric("Température MPU", capteur('tempMPU'))
+           
+            st.write("**GPS:**")
+            st.text(f"Latitude: {capteur('latitude')}")
+            st.text(f"Longitude: {capteur('longitude')}")
+            st.text(f"Altitude: {capteur('altitude')}")
+            st.text(f"Satellites: {capteur('satellites')}")
+
+    elif capteur_key == "acceleration":
+        col2a, col2b, col2c = st.columns(3)
+        with col2a:
+            st.metric("Acc X", capteur('accX'))
+        with col2b:
+            st.metric("Acc Y", capteur('accY'))
+        with col2c:
+            st.metric("Acc Z", capteur('accZ'))
+
+    elif capteur_key == "gyroscope":
+        col2a, col2b, col2c = st.columns(3)
+        with col2a:
+            st.metric("Gyro X", capteur('gyroX'))
+        with col2b:
+            st.metric("Gyro Y", capteur('gyroY'))
+        with col2c:
+            st.metric("Gyro Z", capteur('gyroZ'))
+
+    elif capteur_key == "gps":
+        col2a, col2b = st.columns(2)
+        with col2a:
+            st.metric("Latitude", capteur('latitude'))
+            st.metric("Altitude", capteur('altitude'))
+        with col2b:
+            st.metric("Longitude", capteur('longitude'))
+            st.metric("Satellites", capteur('satellites'))
+
+    else:
+        st.metric(selected_capteur, capteur(capteur_key))
+
+    # Historique des capteurs (séries temporelles)
+    st.subheader("Historique")
+    canaux_historique = {
+        "all": ["accX", "accY", "accZ"],
+        "acceleration": ["accX", "accY", "accZ"],
+        "gyroscope": ["gyroX", "gyroY", "gyroZ"],
+        "gps": ["altitude"]
+    }.get(capteur_key, [capteur_key])
+    fenetre = st.select_slider(
+        "Fenêtre", options=[30, 60, 300, 600], value=60,
+        format_func=lambda sec: f"{sec // 60} min" if sec >= 60 else f"{sec} s"
+    )
+    # La figure n'est reconstruite que si de nouvelles données sont arrivées
+    reader = st.session_state.serial_reader
+    version = (id(reader), reader.lines_read if reader else -1, capteur_key, fenetre)
+    cache = st.session_state.figure_historique
+    if cache is None or cache[0] != version:
+        maintenant = time.monotonic()
+        fig_historique = go.Figure()
+        for key in canaux_historique:
+            t, valeurs = st.session_state.telemetrie.downsampled(key, seconds=fenetre, max_points=500, now=maintenant)
+            fig_historique.add_trace(go.Scatter(x=t - maintenant, y=valeurs, mode="lines", name=key))
+        fig_historique.update_layout(height=300, xaxis_title="Temps (s)", margin=dict(l=10, r=10, t=10, b=10))
+        cache = (version, fig_historique)
+        st.session_state.figure_historique = cache
+    st.plotly_chart(cache[1], use_container_width=True)
 
 def rechercher_sur_maps():
     try:
-        lat = st.session_state.donnees_capteurs['latitude'].replace('°', '')
-        lon = st.session_state.donnees_capteurs['longitude'].replace('°', '')
-        if lat != "N/A" and lon != "N/A":
+        lat = st.session_state.telemetrie.latest('latitude')
+        lon = st.session_state.telemetrie.latest('longitude')
+        if lat is not None and lon is not None:
             url = f"https://www.google.com/maps?q={lat},{lon}"
             webbrowser.open_new_tab(url)
             st.success("Ouverture de Google Maps...")
@@ -254,15 +324,11 @@ def set_movement(vx, vy, om):
     calculate_thetas()
 
 def calculate_thetas():
-    common = (1 / R) / (2 * np.pi)
-    sum_Ll = L + l
-    st.session_state.wheel_thetas = [
-        common * (st.session_state.Vx - st.session_state.Vy - sum_Ll * st.session_state.omega),
-        common * (-st.session_state.Vx - st.session_state.Vy + sum_Ll * st.session_state.omega),
-        common * (st.session_state.Vx - st.session_state.Vy + sum_Ll * st.session_state.omega),
-        common * (-st.session_state.Vx - st.session_state.Vy - sum_Ll * st.session_state.omega)
-    ]
-    st.session_state.active_wheels = [abs(w) > 0.001 for w in st.session_state.wheel_thetas]
+    wheel_thetas = CINEMATIQUE.body_to_wheels(
+        [st.session_state.Vx, st.session_state.Vy, st.session_state.omega]
+    )
+    st.session_state.wheel_thetas = wheel_thetas.tolist()
+    st.session_state.active_wheels = active_wheels(wheel_thetas).tolist()
 
 def get_movement_type(vx, vy, om):
     seuil = 0.1
@@ -354,31 +420,20 @@ def send_bas_droite_command():
 
 def calculate_thetas_manual(vx, vy, omega):
     # Calculer les vitesses des roues
-    common = (1 / R) / (2 * np.pi)
-    sum_Ll = L + l
-   
-    wheel_thetas = [
-        common * (vx - vy - sum_Ll * omega),
-        common * (-vx - vy + sum_Ll * omega),
-        common * (vx - vy + sum_Ll * omega),
-        common * (-vx - vy - sum_Ll * omega)
-    ]
-   
-    active_wheels = [abs(w) > 0.001 for w in wheel_thetas]
+    thetas = CINEMATIQUE.body_to_wheels([vx, vy, omega])
+    wheel_thetas = thetas.tolist()
+    active = active_wheels(thetas).tolist()
    
     # Envoyer la commande à l'ESP32
     if st.session_state.esp32_connected and (abs(vx) > 0.001 or abs(vy) > 0.001 or abs(omega) > 0.001):
         cmd = f"c {vx:.4f} {vy:.4f} {omega:.4f}"
         send_command_to_esp32(cmd)
    
-    return wheel_thetas, active_wheels
+    return wheel_thetas, active
 
 def calculate_velocities(wheel_speeds):
     # Calcul inverse
-    thetas = [speed * 2 * np.pi for speed in wheel_speeds]
-    vx = (R / 4) * (thetas[0] - thetas[1] + thetas[2] - thetas[3])
-    vy = (R / 4) * (-sum(thetas))
-    omega = (R / (4 * (L + l))) * (-thetas[0] + thetas[1] + thetas[2] - thetas[3])
+    vx, vy, omega = CINEMATIQUE.wheels_to_body(wheel_speeds).tolist()
    
     if st.session_state.esp32_connected:
         cmd = f"c {vx:.4f} {vy:.4f} {omega:.4f}"
@@ -395,58 +450,6 @@ def send_position_command(pos_x, pos_y, angle):
     else:
         add_to_history("ESP32 non connecté pour envoi position", "Système")
 
-def create_robot_visualization():
-    fig, ax = plt.subplots(figsize=(6, 6))
-   
-    robot_length, robot_width = 0.4, 0.3
-    wheel_length, wheel_width = 0.1, 0.05
-   
-    # Corps du robot
-    bottom_left_x, bottom_left_y = -robot_width / 2, -robot_length / 2
-    ax.add_patch(patches.Rectangle(
-        (bottom_left_x, bottom_left_y),
-        robot_width, robot_length,
-        edgecolor='black', facecolor='lightgrey'
-    ))
-   
-    # Positions des roues
-    wheel_positions = [
-        (bottom_left_x - wheel_width, bottom_left_y),
-        (bottom_left_x + robot_width, bottom_left_y),
-        (bottom_left_x - wheel_width, bottom_left_y + robot_length - wheel_length),
-        (bottom_left_x + robot_width, bottom_left_y + robot_length - wheel_length)
-    ]
-   
-    # Roues avec couleurs selon l'activité
-    for i, (wx, wy) in enumerate(wheel_positions):
-        color = 'red' if st.session_state.active_wheels[i] else 'grey'
-        wheel = patches.Rectangle((wx, wy), wheel_width, wheel_length,
-                                edgecolor='black', facecolor=color)
-        ax.add_patch(wheel)
-       
-        # Flèches pour indiquer la direction
-        if st.session_state.active_wheels[i]:
-            arrow_x = wx + wheel_width / 2
-            arrow_y = wy + wheel_length / 2
-            dy = 0.1 if st.session_state.wheel_thetas[i] >= 0 else -0.1
-            ax.arrow(arrow_x, arrow_y, 0, dy, head_width=0.02, head_length=0.02, fc='blue', ec='blue')
-   
-    # Texte de mouvement
-    movement_type = get_movement_type(st.session_state.Vx, st.session_state.Vy, st.session_state.omega)
-    ax.text(0, -0.3, f"Mouvement: {movement_type}", ha='center', va='center',
-            fontsize=10, weight='bold', color='blue')
-   
-    # Configuration des axes
-    margin = 0.02
-    ax.set_xlim(bottom_left_x - wheel_width - margin,
-                bottom_left_x + robot_width + wheel_width + margin)
-    ax.set_ylim(bottom_left_y - margin - 0.1,
-                bottom_left_y + robot_length + wheel_length + margin)
-    ax.set_aspect('equal')
-    ax.axis('off')
-   
-    return fig
-
 # ============================================================================
 # INTERFACE STREAMLIT
 # ============================================================================
@@ -461,6 +464,12 @@ with st.sidebar:
     status_color = "🟢" if st.session_state.esp32_connected else "🔴"
     status_text = f"{status_color} ESP32 {'Connecté' if st.session_state.esp32_connected else 'Déconnecté'}"
     st.write(status_text)
+    if st.session_state.command_queue:
+        stats_file = st.session_state.command_queue.stats()
+        st.caption(
+            f"File d'envoi : {stats_file['depth']} en attente · {stats_file['sent']} envoyées · "
+            f"{stats_file['coalesced']} fusionnées · latence moy. {stats_file['latency_mean_ms']:.1f} ms"
+        )
    
     col1, col2 = st.columns(2)
     with col1:
@@ -516,75 +525,16 @@ with tab1:
         selected_capteur = st.selectbox("Choisir un capteur:", list(capteur_options.keys()))
         capteur_key = capteur_options[selected_capteur]
         st.session_state.capteur_selectionne = capteur_key
+        # Désactivé par défaut : rien n'est affiché par ligne reçue dans le fragment
+        st.checkbox("Trames brutes (debug)", key="debug_capteurs")
        
         if capteur_key == "gps":
             if st.button("🗺️ Ouvrir dans Maps"):
                 rechercher_sur_maps()
-       
-        # Lecture automatique des capteurs
-        if st.session_state.esp32_connected:
-            lire_donnees_capteurs()
+
    
     with col2:
-        st.subheader("Données des Capteurs")
-       
-        if capteur_key == "all":
-            col2a, col2b = st.columns(2)
-           
-            with col2a:
-                st.metric("Distance", st.session_state.donnees_capteurs['distance'])
-                st.metric("Gaz", st.session_state.donnees_capteurs['gaz'])
-                st.metric("Température", st.session_state.donnees_capteurs['temperature'])
-                st.metric("Humidité", st.session_state.donnees_capteurs['humidity'])
-               
-                st.write("**Accéléromètre:**")
-                st.text(f"X: {st.session_state.donnees_capteurs['accX']}")
-                st.text(f"Y: {st.session_state.donnees_capteurs['accY']}")
-                st.text(f"Z: {st.session_state.donnees_capteurs['accZ']}")
-           
-            with col2b:
-                st.write("**Gyroscope:**")
-                st.text(f"X: {st.session_state.donnees_capteurs['gyroX']}")
-                st.text(f"Y: {st.session_state.donnees_capteurs['gyroY']}")
-                st.text(f"Z: {st.session_state.donnees_capteurs['gyroZ']}")
-               
-                st.metric("Température MPU", st.session_state.donnees_capteurs['tempMPU'])
-               
-                st.write("**GPS:**")
-                st.text(f"Latitude: {st.session_state.donnees_capteurs['latitude']}")
-                st.text(f"Longitude: {st.session_state.donnees_capteurs['longitude']}")
-                st.text(f"Altitude: {st.session_state.donnees_capteurs['altitude']}")
-                st.text(f"Satellites: {st.session_state.donnees_capteurs['satellites']}")
-       
-        elif capteur_key == "acceleration":
-            col2a, col2b, col2c = st.columns(3)
-            with col2a:
-                st.metric("Acc X", st.session_state.donnees_capteurs['accX'])
-            with col2b:
-                st.metric("Acc Y", st.session_state.donnees_capteurs['accY'])
-            with col2c:
-                st.metric("Acc Z", st.session_state.donnees_capteurs['accZ'])
-       
-        elif capteur_key == "gyroscope":
-            col2a, col2b, col2c = st.columns(3)
-            with col2a:
-                st.metric("Gyro X", st.session_state.donnees_capteurs['gyroX'])
-            with col2b:
-                st.metric("Gyro Y", st.session_state.donnees_capteurs['gyroY'])
-            with col2c:
-                st.metric("Gyro Z", st.session_state.donnees_capteurs['gyroZ'])
-       
-        elif capteur_key == "gps":
-            col2a, col2b = st.columns(2)
-            with col2a:
-                st.metric("Latitude", st.session_state.donnees_capteurs['latitude'])
-                st.metric("Altitude", st.session_state.donnees_capteurs['altitude'])
-            with col2b:
-                st.metric("Longitude", st.session_state.donnees_capteurs['longitude'])
-                st.metric("Satellites", st.session_state.donnees_capteurs['satellites'])
-       
-        else:
-            st.metric(selected_capteur, st.session_state.donnees_capteurs[capteur_key])
+        afficher_donnees_capteurs(capteur_key, selected_capteur)
 
 # ============================================================================
 # ONGLET 2 - CONTRÔLE AUTONOME (INTERFACE RÉORGANISÉE)
@@ -614,15 +564,17 @@ with tab2:
                 from PIL import Image, ImageTk
                 import time
 
+                from display_sink import DisplaySink
+                # get_finger_state : points -> tableau (21, 3), doigts ouverts vectorisés, table de gestes
+                # COMMANDS : dictionnaire des gestes -> commandes
+                from gesture_features import COMMANDS, get_finger_state
+
                 # === Configuration des constantes ===
-                R = 0.05  # Rayon des roues (5 cm)
-                L = 0.20  # Demi-longueur (20 cm)
-                l = 0.125  # Demi-largeur (12.5 cm)
-                MAX_SPEED = 1.0
-                SPEED_STEP = 0.1
+                # R, L, l et CINEMATIQUE sont partagés avec l'interface Streamlit
 
                 # Variables globales
                 video_label = None
+                video_sink = None  # affichage caméra (thread Tk)
                 camera_active = False
                 stop_camera_btn = None
                 command_history = []
@@ -638,17 +590,6 @@ with tab2:
                 mp_hands = mp.solutions.hands
                 mp_drawing = mp.solutions.drawing_utils
 
-                # Dictionnaire des gestes
-                COMMANDS = {
-                    "CLOSED": "STOP",
-                    "ONE": "AVANCE",
-                    "TWO": "RECULE", 
-                    "THREE": "TOURNER_GAUCHE",
-                    "FOUR": "TOURNER_DROITE",
-                    "FIVE": "SCAN_GAZ",
-                    "LEFT_TILT": "LATERAL_GAUCHE",
-                    "RIGHT_TILT": "LATERAL_DROITE"
-                }
 
                 # Commandes vocales valides
                 commandes_valides = [
@@ -665,14 +606,15 @@ with tab2:
                     if not esp32_connected or not st.session_state.esp32_connected:
                         add_to_history("ESP32 non connecté", "Système")
                         return None
-                    try:
-                        st.session_state.esp32_serial.write(command.encode())
-                        add_to_history(f"Commande envoyée: {command}", "Système")
-                        return command
-                    except Exception as e:
-                        add_to_history(f"Erreur d'envoi: {e}", "Système")
+                    # Même file d'envoi que l'interface Streamlit (un seul thread écrit)
+                    queue = st.session_state.command_queue
+                    if queue.error is not None:
+                        add_to_history(f"Erreur d'envoi: {queue.error}", "Système")
                         esp32_connected = False
                         return None
+                    queue.put(command)
+                    add_to_history(f"Commande envoyée: {command}", "Système")
+                    return command
 
                 def add_to_history(message, source="Système"):
                     timestamp = datetime.now().strftime("%H:%M:%S")
@@ -865,36 +807,8 @@ with tab2:
                         cmd_map[commande]()
 
                 # === Fonctions de reconnaissance gestuelle ===
-                def get_finger_state(hand_landmarks):
-                    tips = [4, 8, 12, 16, 20]
-                    dips = [3, 7, 11, 15, 19]
-                    fingers = []
-                    
-                    for tip, dip in zip(tips, dips):
-                        if tip == 4:  # Pouce
-                            fingers.append(hand_landmarks.landmark[tip].x < hand_landmarks.landmark[dip].x)
-                        else:
-                            fingers.append(hand_landmarks.landmark[tip].y < hand_landmarks.landmark[dip].y)
-                    
-                    # Détection d'inclinaison
-                    wrist = hand_landmarks.landmark[0]
-                    middle_mcp = hand_landmarks.landmark[9]
-                    x_diff = wrist.x - middle_mcp.x
-                    
-                    if x_diff > 0.15: return "LEFT_TILT"
-                    if x_diff < -0.15: return "RIGHT_TILT"
-                    
-                    # Comptage des doigts
-                    count = sum(fingers)
-                    if count == 5: return "FIVE"
-                    if count == 4: return "FOUR"
-                    if count == 3: return "THREE"
-                    if count == 2: return "TWO"
-                    if count == 1: return "ONE"
-                    return "CLOSED"
-
                 def start_gesture_thread():
-                    global camera_active, video_label, stop_camera_btn
+                    global camera_active, video_label, video_sink, stop_camera_btn
                     
                     if not camera_active:
                         camera_active = True
@@ -906,6 +820,8 @@ with tab2:
                         
                         video_label = tk.Label(camera_frame)
                         video_label.pack(fill=tk.BOTH, expand=True, pady=10)
+                        # Le thread caméra dépose les images, le thread Tk les affiche
+                        video_sink = DisplaySink(video_label, (480, 360)).start()
                         
                         # ✅ BOUTONS BIEN VISIBLES EN BAS
                         button_frame = tk.Frame(camera_frame)
@@ -937,9 +853,15 @@ with tab2:
                         threading.Thread(target=detect_hand_gesture, daemon=True).start()
 
                 def stop_camera():
-                    global camera_active, video_label, stop_camera_btn
+                    global camera_active, video_label, video_sink, stop_camera_btn
                     if camera_active:
                         camera_active = False
+                        if video_sink:
+                            video_sink.stop()
+                            display = video_sink.stats()
+                            print(f"Affichage caméra: {display['shown']} images, {display['dropped']} abandonnées, "
+                                  f"{display['ui_ms_mean']:.2f} ms/image (thread Tk)")
+                            video_sink = None
                         if video_label:
                             video_label.master.destroy()
                             video_label = None
@@ -1008,17 +930,10 @@ with tab2:
                                 cv2.putText(frame, "Cliquez 'Envoyer Commande'", (10, 110),
                                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
                             
-                            # Mise à jour de l'affichage vidéo
-                            img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                            img = cv2.resize(img, (480, 360))  # ✅ Taille optimisée
-                            img = Image.fromarray(img)
-                            imgtk = ImageTk.PhotoImage(image=img)
-                            
-                            if video_label:
-                                video_label.imgtk = imgtk
-                                video_label.configure(image=imgtk)
-                            
-                            root.update()
+                            # Mise à jour de l'affichage vidéo (redimensionnée et affichée par le thread Tk)
+                            sink = video_sink
+                            if sink:
+                                sink.submit(frame)
                     
                     cap.release()
                     if camera_active:
@@ -1375,19 +1290,17 @@ with tab3:
     with col3:
         st.subheader("Visualisation Robot")
         calculate_thetas()
-        fig = create_robot_visualization()
-        st.pyplot(fig)
+        etats_roues = wheel_states(st.session_state.active_wheels, st.session_state.wheel_thetas)
+        st.image(render_robot_png(etats_roues), use_container_width=True)
+        movement_type = get_movement_type(st.session_state.Vx, st.session_state.Vy, st.session_state.omega)
+        st.markdown(f"<p style='text-align: center; color: blue;'><b>Mouvement: {movement_type}</b></p>",
+                    unsafe_allow_html=True)
        
         st.subheader("État Actuel")
         st.metric("Vx actuel", f"{st.session_state.current_vx:.4f} m/s")
         st.metric("Vy actuel", f"{st.session_state.current_vy:.4f} m/s")
         st.metric("Ω actuel", f"{st.session_state.current_omega:.4f} rad/s")
 
-# Auto-refresh pour la lecture des capteurs
-if st.session_state.esp32_connected:
-    time.sleep(0.1)
-    st.rerun()
-
 # Instructions d'utilisation
 st.markdown("---")
 st.markdown("""
@@ -1412,7 +1325,7 @@ st.markdown("""
 
 **🔌 Connexion ESP32:**
 - **UN SEUL POINT DE CONNEXION** dans la sidebar principale
-- Port: COM14, Baudrate: 57600
+- Port: COM14 (variable ESP32_PORT), Baudrate: 57600
 - L'interface autonome utilise automatiquement cette connexion
 
 ### ✅ **PROBLÈMES RÉSOLUS :**
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Benchmark du temps passé dans le thread Tk par image caméra affichée.
+
+Compare, sur des images 640x480 synthétiques :
+
+- l'ancien chemin de l'interface vocale/gestuelle : cvtColor + resize +
+  ``Image.fromarray`` + nouvel ``ImageTk.PhotoImage`` à chaque image ;
+- l'ancien chemin du Robodog : ``Image.fromarray().resize(LANCZOS)`` + nouvelle
+  image Tk à chaque image ;
+- ``DisplaySink.poll()`` : ``cv2.resize`` dans un tampon fixe + ``paste`` dans
+  un ``PhotoImage`` unique.
+
+Sans affichage (pas de serveur X), seules les étapes hors Tk sont mesurées.
+
+    python bench_display_sink.py --frames 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+SIZE = (480, 360)
+
+
+def frames_640x480(count: int):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    return [np.roll(base, 4 * i, axis=1) for i in range(count)]
+
+
+def measure(step, frames) -> float:
+    """Temps moyen (ms) de `step(frame)`."""
+    start = time.perf_counter()
+    for frame in frames:
+        step(frame)
+    return 1000 * (time.perf_counter() - start) / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps du thread Tk par image affichée (avant / après DisplaySink).")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+    frames = frames_640x480(args.frames)
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:  # pas de serveur d'affichage
+        root = None
+        print(f"Tk indisponible ({e}) : étapes hors Tk seulement.")
+
+    results = {}
+    if root is None:
+        buffer = np.zeros((SIZE[1], SIZE[0], 3), np.uint8)
+        image = Image.new("RGB", SIZE)
+
+        def rover_old(frame):
+            Image.fromarray(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), SIZE))
+
+        def robodog_old(frame):
+            Image.fromarray(frame).resize(SIZE, Image.Resampling.LANCZOS)
+
+        def sink(frame):
+            cv2.resize(frame, SIZE, dst=buffer, interpolation=cv2.INTER_LINEAR)  # facteur 0.75
+            cv2.cvtColor(buffer, cv2.COLOR_BGR2RGB, dst=buffer)
+            image.frombytes(buffer)
+
+        results["rover (avant)"] = measure(rover_old, frames)
+        results["robodog (avant)"] = measure(robodog_old, frames)
+        results["DisplaySink"] = measure(sink, frames)
+    else:
+        from PIL import ImageTk
+
+        from display_sink import DisplaySink
+
+        label = tk.Label(root)
+        label.pack()
+
+        def rover_old(frame):
+            img = Image.fromarray(cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), SIZE))
+            imgtk = ImageTk.PhotoImage(image=img)
+            label.imgtk = imgtk
+            label.configure(image=imgtk)
+            root.update_idletasks()
+
+        def robodog_old(frame):
+            img = ImageTk.PhotoImage(Image.fromarray(frame).resize(SIZE, Image.Resampling.LANCZOS))
+            label.imgtk = img
+            label.configure(image=img)
+            root.update_idletasks()
+
+        display = DisplaySink(label, SIZE)
+
+        def sink(frame):
+            display.submit(frame)
+            display.poll()
+            root.update_idletasks()
+
+        results["rover (avant)"] = measure(rover_old, frames)
+        results["robodog (avant)"] = measure(robodog_old, frames)
+        results["DisplaySink"] = measure(sink, frames)
+        root.destroy()
+
+    reference = results["DisplaySink"]
+    for name, ms in results.items():
+        print(f"{name:<18}: {ms:6.2f} ms/image (x{ms / reference:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Benchmark du décodage des QR en fonction du nombre de QR visibles.
+
+Génère des images 1280x720 contenant 1 à N QR (``cv2.QRCodeEncoder``) dont
+les boîtes sont connues (comme si YOLO les avait trouvées), puis mesure le
+temps de décodage par image pour chaque chemin de ``qr_decoder`` et pour le
+choix automatique.
+
+    python bench_qr_decode.py --max-codes 8 --frames 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import cv2
+import numpy as np
+
+from qr_decoder import DEFAULT_WORKERS, PATHS, QRDecodeStage
+
+COMMANDS = ["a", "s", "r", "d", "g", "l", "t", "c 15 0 0", "p 10 0 0", "v 5 0 0"]
+
+
+def synthetic_frame(count: int, seed: int = 0, size=(720, 1280), qr_size: int = 150):
+    """Image grise avec `count` QR disposés sur une grille ; retourne (image, boîtes, textes)."""
+    rng = random.Random(seed)
+    h, w = size
+    frame = np.full((h, w, 3), 200, dtype=np.uint8)
+    encoder = cv2.QRCodeEncoder.create()
+    cols = 4
+    cell_w, cell_h = w // cols, h // 2
+    boxes, texts = [], []
+    for i in range(count):
+        text = rng.choice(COMMANDS)
+        qr = encoder.encode(text)
+        qr = cv2.resize(qr, (qr_size, qr_size), interpolation=cv2.INTER_NEAREST)
+        qr = cv2.cvtColor(qr, cv2.COLOR_GRAY2BGR)
+        x = (i % cols) * cell_w + rng.randint(10, cell_w - qr_size - 10)
+        y = (i // cols) * cell_h + rng.randint(10, cell_h - qr_size - 10)
+        frame[y:y + qr_size, x:x + qr_size] = qr
+        # Boîte un peu plus large que le QR, comme celles de YOLO
+        boxes.append((x - 12, y - 12, x + qr_size + 12, y + qr_size + 12))
+        texts.append(text)
+    return frame, boxes, texts
+
+
+def bench(stage: QRDecodeStage, frame, boxes, texts, frames: int):
+    stage.decode(frame, boxes)  # mise en route (pool, décodeurs par thread)
+    times = []
+    correct = 0
+    for _ in range(frames):
+        start = time.perf_counter()
+        result = stage.decode(frame, boxes)
+        times.append(time.perf_counter() - start)
+        correct += sum(1 for got, want in zip(result, texts) if got == want)
+    times.sort()
+    return 1000 * times[len(times) // 2], correct / (frames * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du décodage QR (serial / pool / multi / auto).")
+    parser.add_argument("--max-codes", type=int, default=8, help="Nombre maximal de QR par image (défaut: 8)")
+    parser.add_argument("--frames", type=int, default=30, help="Images mesurées par configuration")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Threads du pool de décodage")
+    args = parser.parse_args()
+
+    print(f"OpenCV {cv2.__version__}, {args.workers} threads, médiane par image (ms) [taux de lecture]")
+    print("QR  " + "".join(f"{name:>18}" for name in PATHS + ("auto",)))
+    for count in range(1, args.max_codes + 1):
+        frame, boxes, texts = synthetic_frame(count, seed=count)
+        cells = []
+        for path in PATHS + ("auto",):
+            stage = QRDecodeStage(workers=args.workers, path=path)
+            ms, rate = bench(stage, frame, boxes, texts, args.frames)
+            label = f"{ms:7.1f} [{100 * rate:3.0f}%]"
+            if path == "auto":
+                label += f" {stage.last_path[0]}"
+            cells.append(f"{label:>18}")
+            stage.close()
+        print(f"{count:>2}  " + "".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Benchmark de la planification YOLO (qr_scheduler) contre la détection à chaque image.
+
+Sur une vidéo (``--input``) ou une séquence synthétique (QR qui se déplace,
+accélère, sort du champ puis revient), compare :
+
+- la référence : détection complète sur chaque image ;
+- ``DetectionScheduler`` : détection complète une image sur N + suivi local.
+
+Le taux de réussite est la part des boîtes de la référence retrouvées par le
+planificateur (IoU >= 0.5) ; le gain est le rapport du nombre d'inférences.
+
+    python bench_qr_scheduler.py --input mission.mp4            # qrdet (YOLO)
+    python bench_qr_scheduler.py --detector opencv              # sans qrdet, séquence synthétique
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from qr_pipeline import DETECTORS, make_detector
+from qr_scheduler import DetectionScheduler
+from qr_tracker import iou_matrix
+
+
+def synthetic_sequence(frames: int = 600, size=(480, 640), qr_size: int = 120, seed: int = 0):
+    """QR en mouvement sur fond texturé : lent, rapide, absent, puis de retour."""
+    rng = np.random.default_rng(seed)
+    h, w = size
+    background = cv2.GaussianBlur(rng.integers(60, 200, (h, w), dtype=np.uint8), (0, 0), 3)
+    background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+    qr = cv2.QRCodeEncoder.create().encode("c 15 0 0")
+    qr = cv2.cvtColor(cv2.resize(qr, (qr_size, qr_size), interpolation=cv2.INTER_NEAREST), cv2.COLOR_GRAY2BGR)
+    x, y = 50.0, 100.0
+    for i in range(frames):
+        phase = i * 4 // frames
+        frame = background.copy()
+        speed = (1.5, 8.0, 0.0, 3.0)[phase]
+        if phase != 2:
+            x += speed
+            y = 100 + 80 * np.sin(i / 25)
+            if x > w - qr_size - 10:
+                x = 10
+            xi, yi = int(x), int(y)
+            frame[yi:yi + qr_size, xi:xi + qr_size] = qr
+        yield frame
+
+
+def read_video(path: str):
+    cap = cv2.VideoCapture(path)
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+    cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planification YOLO vs détection à chaque image.")
+    parser.add_argument("--input", help="Vidéo à rejouer (défaut: séquence synthétique)")
+    parser.add_argument("--detector", choices=DETECTORS, default="qrdet")
+    parser.add_argument("--model-size", default="s", choices=["n", "s", "m", "l"])
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--max-skip", type=int, default=8, help="Intervalle maximal entre deux détections complètes")
+    parser.add_argument("--frames", type=int, default=600, help="Images de la séquence synthétique")
+    args = parser.parse_args()
+
+    detect = make_detector(args.detector, args.model_size, args.conf)
+    frames = list(read_video(args.input) if args.input else synthetic_sequence(args.frames))
+
+    start = time.perf_counter()
+    baseline = [detect(frame) for frame in frames]
+    baseline_time = time.perf_counter() - start
+
+    scheduler = DetectionScheduler(detect, max_interval=args.max_skip)
+    start = time.perf_counter()
+    scheduled = [scheduler.step(frame) for frame in frames]
+    scheduled_time = time.perf_counter() - start
+
+    expected = found = extra = 0
+    for ref, got in zip(baseline, scheduled):
+        ref_boxes = [d["bbox_xyxy"] for d in ref]
+        got_boxes = [d["bbox_xyxy"] for d in got]
+        expected += len(ref_boxes)
+        if ref_boxes and got_boxes:
+            matched = (iou_matrix(ref_boxes, got_boxes) >= 0.5).any(axis=1)
+            found += int(matched.sum())
+        extra += max(0, len(got_boxes) - len(ref_boxes))
+
+    stats = scheduler.stats()
+    print(f"Images              : {len(frames)} ({args.input or 'synthétique'}, détecteur {args.detector})")
+    print(f"Référence           : {len(frames)} inférences, {1000 * baseline_time / len(frames):.1f} ms/image")
+    print(f"Planificateur       : {stats['full_detections']} inférences, "
+          f"{1000 * scheduled_time / len(frames):.1f} ms/image, {stats['lost_tracks']} pertes de suivi")
+    print(f"Réduction           : x{len(frames) / max(1, stats['full_detections']):.1f} inférences, "
+          f"x{baseline_time / max(scheduled_time, 1e-9):.1f} temps")
+    print(f"Taux de réussite    : {100 * found / expected:.1f} % des boîtes de référence "
+          f"({found}/{expected}), {extra} boîtes en trop" if expected else "Aucune boîte de référence")
+
+
+if __name__ == "__main__":
+    main()
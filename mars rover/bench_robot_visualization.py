@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Benchmark du rendu du schéma robot.
+
+Simule N reruns Streamlit avec des états de roues aléatoires et mesure la
+latence de rendu et la mémoire résidente :
+
+- « avant » : une figure pyplot reconstruite à chaque rerun et jamais fermée
+  (ancienne ``create_robot_visualization`` + ``st.pyplot``) ;
+- « après » : ``robot_visualization.render_robot_png`` (figure unique + cache).
+
+    python bench_robot_visualization.py --reruns 10000
+    python bench_robot_visualization.py --reruns 10000 --skip-legacy
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import resource
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.patches as patches
+import matplotlib.pyplot as plt
+
+from robot_visualization import WHEEL_STATES, render_robot_png
+
+
+def rss_mb() -> float:
+    """Mémoire résidente courante (Linux), sinon pic de mémoire du processus."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def legacy_render(states) -> bytes:
+    # Reprise de l'ancienne create_robot_visualization (sans plt.close).
+    fig, ax = plt.subplots(figsize=(6, 6))
+    robot_length, robot_width = 0.4, 0.3
+    wheel_length, wheel_width = 0.1, 0.05
+    bottom_left_x, bottom_left_y = -robot_width / 2, -robot_length / 2
+    ax.add_patch(patches.Rectangle((bottom_left_x, bottom_left_y), robot_width, robot_length,
+                                   edgecolor='black', facecolor='lightgrey'))
+    wheel_positions = [
+        (bottom_left_x - wheel_width, bottom_left_y),
+        (bottom_left_x + robot_width, bottom_left_y),
+        (bottom_left_x - wheel_width, bottom_left_y + robot_length - wheel_length),
+        (bottom_left_x + robot_width, bottom_left_y + robot_length - wheel_length),
+    ]
+    for (wx, wy), state in zip(wheel_positions, states):
+        ax.add_patch(patches.Rectangle((wx, wy), wheel_width, wheel_length, edgecolor='black',
+                                       facecolor='red' if state else 'grey'))
+        if state:
+            ax.arrow(wx + wheel_width / 2, wy + wheel_length / 2, 0, 0.1 * state,
+                     head_width=0.02, head_length=0.02, fc='blue', ec='blue')
+    ax.set_aspect('equal')
+    ax.axis('off')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")  # ce que fait st.pyplot
+    return buffer.getvalue()
+
+
+def bench(render, reruns: int, seed: int = 0):
+    rng = random.Random(seed)
+    rss_start = rss_mb()
+    latencies = []
+    for _ in range(reruns):
+        states = tuple(rng.choice(WHEEL_STATES) for _ in range(4))
+        start = time.perf_counter()
+        render(states)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "mean_ms": 1000 * sum(latencies) / len(latencies),
+        "p50_ms": 1000 * latencies[len(latencies) // 2],
+        "p99_ms": 1000 * latencies[int(len(latencies) * 0.99)],
+        "rss_delta_mb": rss_mb() - rss_start,
+    }
+
+
+def report(name, stats):
+    print(f"{name:<8} moyenne {stats['mean_ms']:8.3f} ms | p50 {stats['p50_ms']:8.3f} ms | "
+          f"p99 {stats['p99_ms']:8.3f} ms | RSS +{stats['rss_delta_mb']:.1f} Mo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du rendu du schéma robot.")
+    parser.add_argument("--reruns", type=int, default=10000, help="Nombre de reruns simulés")
+    parser.add_argument("--legacy-reruns", type=int, default=None,
+                        help="Reruns pour l'ancien rendu (défaut: --reruns ; très lent)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne pas mesurer l'ancien rendu")
+    args = parser.parse_args()
+
+    plt.rcParams["figure.max_open_warning"] = 0
+    print(f"RSS initiale : {rss_mb():.1f} Mo")
+    if not args.skip_legacy:
+        report("avant", bench(legacy_render, args.legacy_reruns or args.reruns))
+    report("après", bench(render_robot_png, args.reruns))
+    print(f"Cache : {render_robot_png.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
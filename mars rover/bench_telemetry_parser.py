@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Micro-benchmark du parsing de télémétrie.
+
+Compare l'ancien parser (15 ``re.search`` par ligne) au parser à dispatch par
+tag de ``telemetry_parser``, en lignes par seconde, sur une capture ESP32.
+
+    python bench_telemetry_parser.py --capture capture_esp32.log
+    python bench_telemetry_parser.py --cycles 2000   # capture synthétique
+
+Une capture s'obtient en enregistrant le moniteur série (une ligne par ligne
+reçue). Sans ``--capture``, des cycles au format exact du firmware sont générés.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, List
+
+from telemetry_parser import firmware_lines, parse_line
+
+# Ancienne implémentation de parser_donnees_capteurs (PY_G8_P4_S4.py), conservée
+# telle quelle pour servir de référence.
+_LEGACY_PATTERNS = {
+    "distance": r"\[Distance\] : ([\d.]+) cm",
+    "gaz": r"\[Gaz\] : ([\d.]+)",
+    "temperature": r"\[HTU21D\] Température : ([\d.-]+) °C",
+    "humidity": r"\[HTU21D\] Humidité : ([\d.-]+) %",
+    "accX": r"\[MPU6050\] Accélération X: ([\d.-]+)",
+    "accY": r"\[MPU6050\].*Accélération.*Y: ([\d.-]+)",
+    "accZ": r"\[MPU6050\].*Accélération.*Z: ([\d.-]+)",
+    "gyroX": r"\[MPU6050\] Gyroscope X: ([\d.-]+)",
+    "gyroY": r"\[MPU6050\].*Gyroscope.*Y: ([\d.-]+)",
+    "gyroZ": r"\[MPU6050\].*Gyroscope.*Z: ([\d.-]+)",
+    "tempMPU": r"\[MPU6050\] Température: ([\d.-]+) °C",
+    "latitude": r"\[GPS\].*Latitude: ([\d.-]+)",
+    "longitude": r"\[GPS\].*Longitude: ([\d.-]+)",
+    "altitude": r"\[GPS\].*Altitude: ([\d.-]+)",
+    "satellites": r"\[GPS\].*Satellites: ([\d]+)",
+}
+
+
+def legacy_parse(line: str) -> Dict[str, float]:
+    out = {}
+    for key, pattern in dict(_LEGACY_PATTERNS).items():
+        match = re.search(pattern, line)
+        if match:
+            try:
+                out[key] = float(match.group(1))
+            except ValueError:
+                pass
+    return out
+
+
+def synthetic_capture(cycles: int, seed: int = 0) -> List[str]:
+    """Génère `cycles` cycles de télémétrie au format du firmware."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(cycles):
+        values = {
+            "distance": rng.uniform(2, 400),
+            "gaz": rng.randint(0, 4095),
+            "temperature": rng.uniform(-10, 45),
+            "humidity": rng.uniform(0, 100),
+            "accX": rng.uniform(-20, 20),
+            "accY": rng.uniform(-20, 20),
+            "accZ": rng.uniform(-20, 20),
+            "gyroX": rng.uniform(-250, 250),
+            "gyroY": rng.uniform(-250, 250),
+            "gyroZ": rng.uniform(-250, 250),
+            "tempMPU": rng.uniform(-10, 60),
+            "latitude": rng.uniform(-90, 90),
+            "longitude": rng.uniform(-180, 180),
+            "altitude": rng.uniform(0, 3000),
+            "satellites": rng.randint(0, 12),
+        }
+        lines.extend(firmware_lines(values))
+        lines.append("-----------------------------")
+    return lines
+
+
+def bench(parse, lines: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        best = min(best, time.perf_counter() - start)
+    return len(lines) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du parsing de télémétrie ESP32.")
+    parser.add_argument("--capture", help="Fichier de capture série (une ligne par ligne reçue)")
+    parser.add_argument("--cycles", type=int, default=2000,
+                        help="Cycles synthétiques si pas de capture (défaut: 2000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions, on garde la meilleure")
+    args = parser.parse_args()
+
+    if args.capture:
+        with open(args.capture, encoding="utf-8", errors="ignore") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        source = args.capture
+    else:
+        lines = synthetic_capture(args.cycles)
+        source = f"synthétique ({args.cycles} cycles)"
+
+    # Les deux parsers doivent extraire les mêmes valeurs.
+    mismatches = sum(1 for line in lines if legacy_parse(line) != parse_line(line))
+
+    before = bench(legacy_parse, lines, args.repeat)
+    after = bench(parse_line, lines, args.repeat)
+    print(f"Capture : {source}, {len(lines)} lignes")
+    print(f"Avant (15 re.search)  : {before:12,.0f} lignes/s")
+    print(f"Après (dispatch tag)  : {after:12,.0f} lignes/s")
+    print(f"Gain                  : x{after / before:.1f}")
+    print(f"Lignes divergentes    : {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
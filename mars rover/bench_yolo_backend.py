@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Benchmark des backends CPU du modèle qrdet (PyTorch, ONNX Runtime, OpenVINO).
+
+Pour chaque taille de modèle (``--model-size``, plusieurs possibles) et chaque
+backend disponible (INT8 ONNX Runtime en plus avec ``--int8``), mesure sur les
+mêmes images :
+
+- la latence par image (médiane et 95e centile, après quelques images de chauffe) ;
+- la précision relative à PyTorch : part des boîtes PyTorch retrouvées
+  (IoU >= 0.5) et boîtes en trop ;
+- la part de boîtes dont le contenu se décode (OpenCV).
+
+L'export ONNX (et la version INT8) est fait au premier lancement puis lu dans
+le cache à côté des poids qrdet.
+
+    python bench_yolo_backend.py --input mission.mp4 --model-size n s --threads 4 --int8
+    python bench_yolo_backend.py                                   # séquence synthétique
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from bench_qr_scheduler import read_video, synthetic_sequence
+from qr_decoder import decode_qr_region
+from qr_pipeline import make_detector
+from qr_tracker import iou_matrix
+from yolo_backend import BACKENDS
+
+
+def run(detect, frames, warmup: int = 3):
+    for frame in frames[:warmup]:
+        detect(frame)
+    results, latencies = [], []
+    for frame in frames:
+        start = time.perf_counter()
+        results.append(detect(frame))
+        latencies.append(1000 * (time.perf_counter() - start))
+    return results, np.asarray(latencies)
+
+
+def compare(reference, results):
+    """(boîtes de référence retrouvées, attendues, boîtes en trop)."""
+    expected = found = extra = 0
+    for ref, got in zip(reference, results):
+        ref_boxes = [d["bbox_xyxy"] for d in ref]
+        got_boxes = [d["bbox_xyxy"] for d in got]
+        expected += len(ref_boxes)
+        if ref_boxes and got_boxes:
+            found += int((iou_matrix(ref_boxes, got_boxes) >= 0.5).any(axis=1).sum())
+        extra += max(0, len(got_boxes) - len(ref_boxes))
+    return found, expected, extra
+
+
+def decode_rate(frames, results) -> float:
+    boxes = decoded = 0
+    for frame, dets in zip(frames, results):
+        for det in dets:
+            boxes += 1
+            decoded += decode_qr_region(frame, det["bbox_xyxy"]) is not None
+    return decoded / boxes if boxes else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latence et précision de qrdet par backend CPU.")
+    parser.add_argument("--input", help="Vidéo à rejouer (défaut: séquence synthétique)")
+    parser.add_argument("--model-size", nargs="+", default=["s"], choices=["n", "s", "m", "l"])
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--threads", type=int, default=None, help="Threads CPU de l'inférence")
+    parser.add_argument("--int8", action="store_true", help="Ajouter la variante INT8 d'ONNX Runtime")
+    parser.add_argument("--conf", type=float, default=0.5)
+    parser.add_argument("--frames", type=int, default=100, help="Nombre d'images mesurées")
+    args = parser.parse_args()
+
+    source = read_video(args.input) if args.input else synthetic_sequence(args.frames)
+    frames = [frame for _, frame in zip(range(args.frames), source)]
+    variants = [(backend, False) for backend in args.backends]
+    if args.int8:
+        variants.append(("onnxruntime", True))
+
+    print(f"{len(frames)} images ({args.input or 'synthétique'}), threads={args.threads or 'défaut'}")
+    print(f"{'modèle':<7}{'backend':<18}{'médiane':>10}{'p95':>10}{'retrouvées':>13}{'en trop':>9}{'décodées':>10}")
+    for size in args.model_size:
+        reference = None
+        for backend, int8 in variants:
+            name = backend + (" int8" if int8 else "")
+            try:
+                detect = make_detector("qrdet", size, args.conf, backend=backend, threads=args.threads, int8=int8)
+            except ImportError as e:
+                print(f"{size:<7}{name:<18}indisponible ({e.name} non installé)")
+                continue
+            results, latencies = run(detect, frames)
+            if reference is None:
+                # Le premier backend mesuré (PyTorch par défaut) sert de référence
+                reference = results
+            found, expected, extra = compare(reference, results)
+            recall = f"{100 * found / expected:.1f} %" if expected else "-"
+            print(f"{size:<7}{name:<18}{np.median(latencies):>8.1f}ms{np.percentile(latencies, 95):>8.1f}ms"
+                  f"{recall:>13}{extra:>9}{100 * decode_rate(frames, results):>9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Protocole de télémétrie binaire (optionnel).
+
+Alternative compacte aux lignes texte du firmware (``[MPU6050] Accélération
+X: ... | Y: ... | Z: ...`` = ~60 octets contre 16 ici). Format d'une trame :
+
+    +------+------+---------------------------+-----------------+
+    | 0xA5 | type | charge utile (taille fixe)| CRC-16 (LE)     |
+    +------+------+---------------------------+-----------------+
+
+- ``type`` fixe la taille et le contenu de la charge utile (``FRAME_TYPES``) :
+  flottants little-endian (float32, float64 pour la position GPS) ;
+- le CRC-16/CCITT (init 0xFFFF, ``binascii.crc_hqx``) couvre type + charge.
+
+Côté firmware, une trame s'écrit avec un ``struct`` packé de la même forme
+suivi de ``RadioSerial.write((uint8_t*)&trame, sizeof(trame))``.
+
+``FrameDecoder`` accumule les octets reçus dans un ``bytearray`` et décode les
+trames sur place (``struct.unpack_from``, sans copie) ; il se resynchronise
+seul sur l'octet 0xA5 après un octet parasite ou un CRC faux.
+
+Test en boucle locale, sans matériel :
+
+    python binary_protocol.py
+"""
+
+from __future__ import annotations
+
+import binascii
+import struct
+from typing import Dict, List, Tuple
+
+SYNC = 0xA5
+HEADER_SIZE = 2  # sync + type
+CRC_SIZE = 2
+
+# type -> (format struct de la charge utile, clés de télémétrie)
+FRAME_TYPES: Dict[int, Tuple[str, Tuple[str, ...]]] = {
+    0x01: ("<f", ("distance",)),
+    0x02: ("<f", ("gaz",)),
+    0x03: ("<2f", ("temperature", "humidity")),
+    0x04: ("<3f", ("accX", "accY", "accZ")),
+    0x05: ("<3f", ("gyroX", "gyroY", "gyroZ")),
+    0x06: ("<f", ("tempMPU",)),
+    0x07: ("<2df", ("latitude", "longitude", "altitude")),
+    0x08: ("<f", ("satellites",)),
+    # Trame IMU complète, pour les cadences élevées
+    0x10: ("<7f", ("accX", "accY", "accZ", "gyroX", "gyroY", "gyroZ", "tempMPU")),
+}
+
+_STRUCTS = {t: struct.Struct(fmt) for t, (fmt, _) in FRAME_TYPES.items()}
+_CRC = struct.Struct("<H")
+
+
+def crc16(data) -> int:
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(frame_type: int, values) -> bytes:
+    """Encode une trame de type `frame_type` (valeurs dans l'ordre de FRAME_TYPES)."""
+    body = bytes((frame_type,)) + _STRUCTS[frame_type].pack(*values)
+    return bytes((SYNC,)) + body + _CRC.pack(crc16(body))
+
+
+def encode_updates(updates: Dict[str, float]) -> bytes:
+    """Encode un dictionnaire de télémétrie en trames (types simples complets uniquement)."""
+    out = bytearray()
+    for frame_type, (_, keys) in FRAME_TYPES.items():
+        if frame_type == 0x10:
+            continue
+        if all(key in updates for key in keys):
+            out += encode_frame(frame_type, [updates[key] for key in keys])
+    return bytes(out)
+
+
+class FrameDecoder:
+    """Décodeur incrémental : ``feed(octets)`` -> liste de dictionnaires de valeurs."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data) -> List[Dict[str, float]]:
+        buf = self.buffer
+        buf += data
+        out = []
+        pos = 0
+        n = len(buf)
+        while True:
+            start = buf.find(SYNC, pos)
+            if start < 0:
+                self.skipped_bytes += n - pos
+                pos = n
+                break
+            self.skipped_bytes += start - pos
+            pos = start
+            if n - pos < HEADER_SIZE:
+                break
+            frame_type = buf[pos + 1]
+            unpacker = _STRUCTS.get(frame_type)
+            if unpacker is None:
+                # Faux octet de synchro : on avance d'un octet
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+            end = pos + HEADER_SIZE + unpacker.size
+            if n < end + CRC_SIZE:
+                break
+            (crc,) = _CRC.unpack_from(buf, end)
+            if crc != crc16(memoryview(buf)[pos + 1:end]):
+                self.crc_errors += 1
+                self.skipped_bytes += 1
+                pos += 1
+                continue
+            values = unpacker.unpack_from(buf, pos + HEADER_SIZE)
+            out.append(dict(zip(FRAME_TYPES[frame_type][1], values)))
+            self.frames += 1
+            pos = end + CRC_SIZE
+        if pos:
+            del buf[:pos]
+        return out
+
+
+def _loopback_test(frames: int = 2000, seed: int = 0) -> None:
+    import random
+
+    rng = random.Random(seed)
+    sent = []
+    stream = bytearray()
+    for _ in range(frames):
+        frame_type = rng.choice(list(FRAME_TYPES))
+        fmt, keys = FRAME_TYPES[frame_type]
+        values = [rng.uniform(-100, 100) for _ in keys]
+        frame = encode_frame(frame_type, values)
+        # Valeurs attendues après arrondi au format de la trame
+        sent.append(dict(zip(keys, _STRUCTS[frame_type].unpack(frame[2:-2]))))
+        stream += frame
+        if rng.random() < 0.05:
+            stream += bytes(rng.randrange(256) for _ in range(rng.randint(1, 8)))
+
+    decoder = FrameDecoder()
+    received = []
+    pos = 0
+    while pos < len(stream):
+        size = rng.randint(1, 64)
+        received.extend(decoder.feed(stream[pos:pos + size]))
+        pos += size
+    assert received == sent, f"{len(received)} trames reçues / {len(sent)} envoyées"
+
+    # Même chose à travers un port série virtuel pyserial (loop://), si installé.
+    try:
+        import serial
+    except ImportError:
+        print("pyserial absent : test loop:// ignoré")
+    else:
+        port = serial.serial_for_url("loop://", timeout=0.1)
+        port.write(encode_updates({"accX": 1.0, "accY": -2.0, "accZ": 9.81, "distance": 42.0}))
+        updates = FrameDecoder().feed(port.read(port.in_waiting))
+        assert updates == [{"distance": 42.0}, {"accX": 1.0, "accY": -2.0, "accZ": struct.unpack("<f", struct.pack("<f", 9.81))[0]}], updates
+        port.close()
+
+    print(f"OK : {len(sent)} trames, {decoder.crc_errors} erreurs CRC (octets parasites), "
+          f"{len(stream)} octets ({len(stream) / len(sent):.1f} octets/trame en moyenne)")
+
+
+if __name__ == "__main__":
+    _loopback_test()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — File de commandes asynchrone vers l'ESP32.
+
+Un seul thread écrit sur le port série ; l'interface (boutons Streamlit,
+fenêtre Tk autonome) se contente de déposer des commandes avec ``put()``,
+qui ne bloque jamais.
+
+- L'arrêt ``s`` passe devant toutes les commandes en attente, et les commandes
+  de mouvement déposées avant lui sont abandonnées (elles relanceraient le
+  robot juste après l'arrêt).
+- Les consignes de vitesse consécutives (``c vx vy om``, ``v ...``) sont
+  fusionnées : seule la dernière est envoyée. Une commande identique à la
+  précédente encore en attente est ignorée de la même façon.
+- File bornée (``maxsize``) : quand elle est pleine, la plus ancienne commande
+  de mouvement en attente est abandonnée ; ``max_age`` abandonne aussi une
+  consigne restée trop longtemps en file (liaison lente ou coupée).
+- Avec ``opener`` (fonction qui ouvre le port), une erreur d'écriture ferme le
+  port et le thread le rouvre avec une attente croissante ; les commandes
+  restent en file pendant ce temps. Une écriture qui dépasse le
+  ``write_timeout`` du port est comptée à part : une commande de mouvement est
+  abandonnée (la suivante la remplace, ``max_age`` écarte les périmées), les
+  autres — l'arrêt ``s`` en premier — sont remises en tête de file, au plus
+  ``MAX_WRITE_RETRIES`` fois.
+- ``stats()`` donne la profondeur de la file, les compteurs (déposées,
+  envoyées, abandonnées, écritures expirées, reconnexions) et la latence
+  dépôt -> écriture.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+try:
+    from serial import SerialTimeoutException
+except ImportError:  # file utilisée sans pyserial (fonction `write` fournie)
+    SerialTimeoutException = TimeoutError
+
+STOP_COMMAND = "s"
+# Lettres de mode du firmware (Arduino_G8_P4_S4.ino) qui mettent le robot en mouvement
+MOTION_MODES = frozenset("cpvradgltjnhmyf")
+VELOCITY_MODES = frozenset("cv")
+LATENCY_WINDOW = 200
+RECONNECT_DELAY_SEC = 0.5
+MAX_RECONNECT_DELAY_SEC = 5.0
+MAX_WRITE_RETRIES = 3  # nouvelles tentatives d'une commande hors mouvement après écriture expirée
+
+
+def command_mode(command: str) -> str:
+    """Lettre de mode d'une commande (``"c 0.1 0 0"`` -> ``"c"``)."""
+    return command[:1]
+
+
+class CommandQueue:
+    """File à deux niveaux de priorité vidée par un thread d'écriture unique."""
+
+    def __init__(
+        self,
+        ser=None,
+        write: Optional[Callable[[bytes], object]] = None,
+        encoding: str = "utf-8",
+        maxsize: Optional[int] = None,
+        max_age: Optional[float] = None,
+        opener: Optional[Callable[[], object]] = None,
+    ):
+        if write is None and ser is None and opener is None:
+            raise ValueError("CommandQueue: fournir `ser`, `write` ou `opener`")
+        self._ser = ser
+        self._custom_write = write
+        self._opener = opener
+        self.encoding = encoding
+        self.maxsize = maxsize
+        self.max_age = max_age
+        self._reconnect_delay = RECONNECT_DELAY_SEC
+        self._opened_once = ser is not None or write is not None
+        self._urgent: deque = deque()
+        self._normal: deque = deque()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.queued = 0
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.timed_out = 0
+        self.retried = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.error: Optional[Exception] = None
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._retry_item = None  # commande remise en file après une écriture expirée
+        self._retry_count = 0
+
+    # -- cycle de vie ------------------------------------------------------
+    def start(self) -> "CommandQueue":
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="esp32-command-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush: bool = True, timeout: float = 2.0) -> None:
+        """Arrête le thread ; avec `flush`, envoie d'abord ce qui est en attente."""
+        if flush:
+            deadline = time.monotonic() + timeout
+            with self._cond:
+                while (self._urgent or self._normal) and self._running and self.error is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._opener is not None and self._ser is not None:
+            # Avec `opener`, le port appartient à la file : elle le referme
+            try:
+                self._ser.close()
+            except Exception:
+                pass
+            self._ser = None
+
+    @property
+    def connected(self) -> bool:
+        return self._custom_write is not None or self._ser is not None
+
+    # -- dépôt -------------------------------------------------------------
+    def put(self, command: str) -> bool:
+        """Dépose une commande (sans ``\\n``). Retourne False si le thread est arrêté."""
+        command = command.strip()
+        if not command:
+            return False
+        now = time.monotonic()
+        mode = command_mode(command)
+        with self._cond:
+            if not self._running:
+                return False
+            if command == STOP_COMMAND:
+                kept = deque(item for item in self._normal if command_mode(item[0]) not in MOTION_MODES)
+                self.dropped += len(self._normal) - len(kept)
+                self._normal = kept
+                if self._urgent:
+                    self.coalesced += 1  # un arrêt est déjà en tête
+                else:
+                    self._urgent.append((command, now))
+            elif self._normal and (
+                self._normal[-1][0] == command
+                or (mode in VELOCITY_MODES and command_mode(self._normal[-1][0]) == mode)
+            ):
+                # Remplace la consigne en attente ; la latence part de la plus ancienne.
+                self._normal[-1] = (command, self._normal[-1][1])
+                self.coalesced += 1
+            else:
+                if self.maxsize is not None and self.depth >= self.maxsize:
+                    self._drop_oldest()
+                self._normal.append((command, now))
+            self.queued += 1
+            self._cond.notify_all()
+        return True
+
+    def _drop_oldest(self) -> None:
+        """File pleine : abandonne la plus ancienne commande de mouvement (sinon la plus ancienne)."""
+        for i, (command, _) in enumerate(self._normal):
+            if command_mode(command) in MOTION_MODES:
+                del self._normal[i]
+                break
+        else:
+            if not self._normal:
+                return
+            self._normal.popleft()
+        self.dropped += 1
+
+    # -- mesures -----------------------------------------------------------
+    @property
+    def depth(self) -> int:
+        return len(self._urgent) + len(self._normal)
+
+    def stats(self) -> Dict[str, float]:
+        latencies = list(self.latencies)
+        return {
+            "depth": self.depth,
+            "queued": self.queued,
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "timed_out": self.timed_out,
+            "retried": self.retried,
+            "errors": self.errors,
+            "reconnects": self.reconnects,
+            "connected": self.connected,
+            "latency_last_ms": 1000 * latencies[-1] if latencies else 0.0,
+            "latency_mean_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_max_ms": 1000 * max(latencies) if latencies else 0.0,
+        }
+
+    # -- thread d'écriture -------------------------------------------------
+    def _write(self, data: bytes) -> None:
+        if self._custom_write is not None:
+            self._custom_write(data)
+        else:
+            self._ser.write(data)
+
+    def _reconnect(self) -> bool:
+        """Rouvre le port ; en cas d'échec, attend (délai doublé à chaque essai)."""
+        try:
+            self._ser = self._opener()
+        except Exception as e:
+            self.error = e
+            with self._cond:
+                if self._running:
+                    self._cond.wait(self._reconnect_delay)
+            self._reconnect_delay = min(MAX_RECONNECT_DELAY_SEC, 2 * self._reconnect_delay)
+            return False
+        self.reconnects += self._opened_once
+        self._opened_once = True
+        self.error = None
+        self._reconnect_delay = RECONNECT_DELAY_SEC
+        return True
+
+    def _retry_after_timeout(self, command: str, queued_at: float) -> None:
+        """Écriture expirée : remet en tête une commande hors mouvement (l'arrêt d'abord), sinon l'abandonne."""
+        item = (command, queued_at)
+        if command_mode(command) in MOTION_MODES:
+            return
+        self._retry_count = self._retry_count + 1 if item == self._retry_item else 1
+        if self._retry_count > MAX_WRITE_RETRIES:
+            self.dropped += 1
+            self._retry_item = None
+            return
+        self._retry_item = item
+        self.retried += 1
+        with self._cond:
+            if command == STOP_COMMAND:
+                if not self._urgent:  # sinon un nouvel arrêt est déjà en tête
+                    self._urgent.appendleft(item)
+            else:
+                self._normal.appendleft(item)
+
+    def _run(self) -> None:
+        while True:
+            if not self.connected and not self._reconnect():
+                if not self._running:
+                    return
+                continue
+            with self._cond:
+                while self._running and not (self._urgent or self._normal):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                queue = self._urgent if self._urgent else self._normal
+                command, queued_at = queue.popleft()
+                if (
+                    self.max_age is not None
+                    and command_mode(command) in MOTION_MODES
+                    and time.monotonic() - queued_at > self.max_age
+                ):
+                    # Consigne périmée (liaison coupée ou lente) : ne pas relancer le robot
+                    self.dropped += 1
+                    self._cond.notify_all()
+                    continue
+            try:
+                self._write(f"{command}\n".encode(self.encoding))
+            except SerialTimeoutException:
+                self.timed_out += 1
+                self._retry_after_timeout(command, queued_at)
+            except Exception as e:
+                self.errors += 1
+                self.error = e
+                if self._opener is not None and self._ser is not None:
+                    if command == STOP_COMMAND:
+                        with self._cond:
+                            self._urgent.appendleft((command, queued_at))  # renvoyé après reconnexion
+                    try:
+                        self._ser.close()
+                    except Exception:
+                        pass
+                    self._ser = None
+            else:
+                self.sent += 1
+                self._retry_item = None
+                self.latencies.append(time.monotonic() - queued_at)
+            with self._cond:
+                self._cond.notify_all()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Affichage rapide d'images caméra dans un widget Tk.
+
+``DisplaySink`` remplace le chemin « PIL resize + nouvel ``ImageTk.PhotoImage``
+par image » :
+
+- le thread caméra dépose l'image avec ``submit()`` (jamais bloquant) ; si
+  l'interface n'a pas encore affiché la précédente, celle-ci est abandonnée ;
+- côté Tk (``poll()``, appelé par ``after``), l'image est redimensionnée par
+  ``cv2.resize`` dans un tampon alloué une fois, puis copiée dans un unique
+  ``PhotoImage`` (``paste``) attaché au widget une seule fois.
+
+Interpolation : ``INTER_AREA`` pour une réduction d'un facteur 2 ou plus (sans
+repliement), ``INTER_LINEAR`` sinon ; pour 640x480 -> 480x360, ``INTER_AREA``
+coûte environ 4 fois plus (facteur non entier) pour un rendu équivalent.
+
+``stats()`` donne le temps passé dans le thread Tk par image affichée et le
+nombre d'images abandonnées.
+
+Copie volontaire : ``DisplaySink`` existe aussi dans
+``X-Ibition-2025-Robodog/INTERFACE 2025 EAC/Camera.py``. Les deux projets sont
+livrés séparément (pas de paquet commun), la classe y est donc recopiée avec la
+même API (``label, size, rgb, poll_ms, interpolation`` ; ``attach``, ``submit``,
+``poll``, ``start``, ``stop``, ``stats``) et le même comportement (copie directe
+si la taille est déjà la bonne). Toute modification doit être reportée dans
+les deux fichiers.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+UI_TIMES_WINDOW = 200
+AREA_SCALE = 0.5  # INTER_AREA en dessous de ce facteur de réduction
+
+
+class DisplaySink:
+    """Dernière image déposée par un thread quelconque, affichée par le thread Tk."""
+
+    def __init__(
+        self,
+        label,
+        size: Tuple[int, int] = (480, 360),
+        rgb: bool = False,
+        poll_ms: int = 15,
+        interpolation: Optional[int] = None,
+    ):
+        self.label = label
+        self.size = size  # (largeur, hauteur)
+        self.rgb = rgb  # images déposées déjà en RGB (sinon BGR OpenCV)
+        self.interpolation = interpolation  # None : choix selon le facteur de réduction
+        self.poll_ms = poll_ms
+        width, height = size
+        self._buffer = np.zeros((height, width, 3), dtype=np.uint8)
+        self._image = Image.new("RGB", size)  # rechargée en place depuis le tampon
+        self.photo = ImageTk.PhotoImage(image=self._image)
+        self._pending: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.attach()
+        self._after_id = None
+        self.submitted = 0
+        self.shown = 0
+        self.dropped = 0
+        self.ui_times: deque = deque(maxlen=UI_TIMES_WINDOW)
+
+    def attach(self) -> None:
+        """(Ré)affiche l'image persistante dans le widget, par ex. après une image d'attente (thread Tk).
+
+        Une image déposée avant (par une caméra arrêtée depuis) est abandonnée, pas affichée.
+        """
+        with self._lock:
+            self._pending = None
+        self.label.configure(image=self.photo, text="")
+        self.label.image = self.photo  # garder une référence
+
+    # -- thread producteur ---------------------------------------------------
+    def submit(self, frame: np.ndarray) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1  # l'interface est en retard : on garde la plus récente
+            self._pending = frame
+            self.submitted += 1
+
+    # -- thread Tk -------------------------------------------------------------
+    def poll(self) -> bool:
+        """Affiche l'image en attente s'il y en a une. À appeler depuis le thread Tk."""
+        with self._lock:
+            frame, self._pending = self._pending, None
+        if frame is None:
+            return False
+        start = time.perf_counter()
+        if frame.shape[1::-1] == self.size:
+            np.copyto(self._buffer, frame)
+        else:
+            interpolation = self.interpolation
+            if interpolation is None:
+                scale = self.size[0] / frame.shape[1]
+                interpolation = cv2.INTER_AREA if scale <= AREA_SCALE else cv2.INTER_LINEAR
+            cv2.resize(frame, self.size, dst=self._buffer, interpolation=interpolation)
+        if not self.rgb:
+            cv2.cvtColor(self._buffer, cv2.COLOR_BGR2RGB, dst=self._buffer)
+        self._image.frombytes(self._buffer)
+        self.photo.paste(self._image)
+        self.ui_times.append(time.perf_counter() - start)
+        self.shown += 1
+        return True
+
+    def start(self) -> "DisplaySink":
+        """Affichage périodique avec ``after`` (inutile si l'appelant appelle déjà ``poll``)."""
+        def tick():
+            self.poll()
+            self._after_id = self.label.after(self.poll_ms, tick)
+
+        if self._after_id is None:
+            self._after_id = self.label.after(self.poll_ms, tick)
+        return self
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            try:
+                self.label.after_cancel(self._after_id)
+            except Exception:
+                pass  # widget déjà détruit
+            self._after_id = None
+
+    def stats(self) -> dict:
+        times = list(self.ui_times)
+        return {
+            "submitted": self.submitted,
+            "shown": self.shown,
+            "dropped": self.dropped,
+            "ui_ms_mean": 1000 * sum(times) / len(times) if times else 0.0,
+            "ui_ms_max": 1000 * max(times) if times else 0.0,
+        }
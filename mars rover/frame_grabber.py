@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Acquisition caméra en tâche de fond (dernière image uniquement).
+
+Un thread dédié appelle ``cap.read()`` en continu et écrase une case unique
+« dernière image ». Le thread de détection prend toujours l'image la plus
+récente : si YOLO est plus lent que la caméra, les images intermédiaires sont
+abandonnées au lieu de s'accumuler dans le tampon du pilote, et le rover
+réagit à ce qu'il voit maintenant, pas à ce qu'il voyait il y a une seconde.
+
+Chaque image porte un numéro et l'instant de capture (``time.monotonic``) :
+l'âge de l'image au moment de la décision se calcule directement.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class FpsMeter:
+    """Cadence glissante (événements/s) sur les `window` derniers événements."""
+
+    def __init__(self, window: int = 30):
+        self.times: deque = deque(maxlen=window)
+
+    def tick(self, now: Optional[float] = None) -> None:
+        self.times.append(time.monotonic() if now is None else now)
+
+    @property
+    def fps(self) -> float:
+        if len(self.times) < 2:
+            return 0.0
+        span = self.times[-1] - self.times[0]
+        return (len(self.times) - 1) / span if span > 0 else 0.0
+
+
+class FrameGrabber:
+    """Thread de capture qui garde uniquement la dernière image de `cap`."""
+
+    def __init__(self, cap: cv2.VideoCapture):
+        self.cap = cap
+        # Tampon pilote minimal (ignoré par certains backends)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_id = 0
+        self._frame_time = 0.0
+        self._consumed_id = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.capture_fps = FpsMeter()
+        self.frames_captured = 0
+        self.frames_dropped = 0  # écrasées sans avoir été lues
+        self.read_failures = 0
+
+    def start(self) -> "FrameGrabber":
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="camera-grabber", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def read(self, timeout: float = 1.0) -> Tuple[Optional[np.ndarray], int, float]:
+        """Attend une image plus récente que la dernière lue.
+
+        Retourne ``(image, numéro, instant de capture)`` ou ``(None, 0, 0.0)``
+        si rien n'arrive avant `timeout` secondes. L'image ne doit pas être
+        modifiée sur place (elle peut être relue) : travailler sur une copie.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._running and self._frame_id == self._consumed_id:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None, 0, 0.0
+                self._cond.wait(remaining)
+            if self._frame_id == self._consumed_id:
+                return None, 0, 0.0
+            self._consumed_id = self._frame_id
+            return self._frame, self._frame_id, self._frame_time
+
+    def stats(self) -> dict:
+        return {
+            "capture_fps": self.capture_fps.fps,
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+        }
+
+    def _run(self) -> None:
+        while self._running:
+            ret, frame = self.cap.read()
+            now = time.monotonic()
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            self.capture_fps.tick(now)
+            self.frames_captured += 1
+            with self._cond:
+                if self._frame_id != self._consumed_id:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._frame_id += 1
+                self._frame_time = now
+                self._cond.notify_all()
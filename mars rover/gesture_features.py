@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Classification vectorisée des gestes de la main (points MediaPipe).
+
+Les 21 points d'une main sont convertis une fois en tableau NumPy (21, 3) ;
+les doigts ouverts, l'inclinaison et le geste sont calculés par opérations
+vectorisées, pour une main ou pour toute une session enregistrée (N, 21, 3)
+en un seul appel (``classify_batch``).
+
+Le geste est lu dans une table : masque des doigts ouverts (bits pouce=1,
+index=2, majeur=4, annulaire=8, auriculaire=16) -> libellé. Ajouter un geste
+revient à ajouter une entrée à ``GESTURES``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+TIPS = np.array([4, 8, 12, 16, 20])
+DIPS = np.array([3, 7, 11, 15, 19])
+WRIST, MIDDLE_MCP = 0, 9
+TILT_THRESHOLD = 0.15  # écart horizontal poignet / base du majeur (coordonnées normalisées)
+FINGER_BITS = 1 << np.arange(5)
+
+# Nombre de doigts ouverts -> libellé (comportement d'origine : seul le nombre compte)
+COUNT_LABELS = {5: "FIVE", 4: "FOUR", 3: "THREE", 2: "TWO", 1: "ONE", 0: "CLOSED"}
+# Entrées explicites masque -> libellé, prioritaires sur le comptage (vide par défaut)
+GESTURES: Dict[int, str] = {}
+
+
+def _build_table() -> np.ndarray:
+    table = np.array([COUNT_LABELS[bin(mask).count("1")] for mask in range(32)], dtype=object)
+    for mask, label in GESTURES.items():
+        table[mask] = label
+    return table
+
+
+GESTURE_TABLE = _build_table()
+
+# Geste -> commande du rover (interface gestuelle de PY_G8_P4_S4.py et rejeu gesture_replay.py)
+COMMANDS: Dict[str, str] = {
+    "CLOSED": "STOP",
+    "ONE": "AVANCE",
+    "TWO": "RECULE",
+    "THREE": "TOURNER_GAUCHE",
+    "FOUR": "TOURNER_DROITE",
+    "FIVE": "SCAN_GAZ",
+    "LEFT_TILT": "LATERAL_GAUCHE",
+    "RIGHT_TILT": "LATERAL_DROITE",
+}
+
+
+def landmarks_array(hand_landmarks) -> np.ndarray:
+    """Points d'une main MediaPipe (objet ``hand_landmarks`` ou liste de points) -> (21, 3)."""
+    points = getattr(hand_landmarks, "landmark", hand_landmarks)
+    return np.array([(p.x, p.y, p.z) for p in points], dtype=np.float64)
+
+
+def finger_flags(points: np.ndarray) -> np.ndarray:
+    """Doigts ouverts (..., 5) : pouce par l'axe x, autres doigts par l'axe y (bout au-dessus)."""
+    tips, dips = points[..., TIPS, :], points[..., DIPS, :]
+    flags = tips[..., 1] < dips[..., 1]
+    flags[..., 0] = tips[..., 0, 0] < dips[..., 0, 0]
+    return flags
+
+
+def finger_mask(points: np.ndarray) -> np.ndarray:
+    return finger_flags(points) @ FINGER_BITS
+
+
+def tilt(points: np.ndarray) -> np.ndarray:
+    return points[..., WRIST, 0] - points[..., MIDDLE_MCP, 0]
+
+
+def classify_batch(points: np.ndarray) -> np.ndarray:
+    """Gestes de (N, 21, 3) mains en un appel -> tableau (N,) de libellés."""
+    points = np.asarray(points, dtype=np.float64)
+    labels = GESTURE_TABLE[finger_mask(points)]
+    x_diff = tilt(points)
+    labels = np.where(x_diff > TILT_THRESHOLD, "LEFT_TILT", labels)
+    return np.where(x_diff < -TILT_THRESHOLD, "RIGHT_TILT", labels)
+
+
+def get_finger_state(hand_landmarks) -> str:
+    """Geste d'une main MediaPipe (inclinaison prioritaire, puis table des doigts)."""
+    points = hand_landmarks if isinstance(hand_landmarks, np.ndarray) else landmarks_array(hand_landmarks)
+    # Mêmes règles que classify_batch, sans les np.where sur les libellés (coûteux pour une seule main)
+    x_diff = points[WRIST, 0] - points[MIDDLE_MCP, 0]
+    if x_diff > TILT_THRESHOLD:
+        return "LEFT_TILT"
+    if x_diff < -TILT_THRESHOLD:
+        return "RIGHT_TILT"
+    return GESTURE_TABLE[int(finger_mask(points))]
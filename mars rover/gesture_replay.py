@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Enregistrement et rejeu hors ligne des gestes de la main.
+
+L'enregistrement (caméra + MediaPipe, une seule fois) écrit les 21 points de
+la main et l'horodatage de chaque image dans un ``.npz`` compressé :
+
+- ``t`` (N,) float64 : secondes depuis le début de l'enregistrement ;
+- ``landmarks`` (N, 21, 3) float32 : NaN quand aucune main n'est détectée ;
+- ``labels`` (N,) str : geste attendu, annoté au clavier pendant
+  l'enregistrement ("" : non annoté) ;
+- ``flipped`` : image retournée horizontalement (comme dans l'interface rover).
+
+Le rejeu (sans caméra ni MediaPipe) classe toute la session en un appel
+(``classify_batch``), applique la règle de stabilité de l'interface gestuelle
+(même geste sur ``STABILITY_THRESHOLD`` images consécutives) et donne :
+
+- l'exactitude par image, brute et après stabilité, sur les images annotées ;
+- le délai avant geste stable : début d'un segment annoté -> première image
+  où le geste stable est le bon ;
+- les commandes qui auraient été proposées (``COMMANDS``), horodatées.
+
+    python gesture_replay.py record session.npz --labels FIVE CLOSED ONE TWO
+    python gesture_replay.py replay session.npz autre.npz --threshold 5
+    python gesture_replay.py demo                   # session synthétique
+
+``X-Ibition-2025-Robodog/INTERFACE 2025 EAC/GestureReplay.py`` est l'outil
+équivalent du robot chien. Seuls le format de session et la mesure du délai
+avant geste stable sont communs : les gestes, la règle de stabilité et les
+commandes sont ceux de chaque interface (ici ``gesture_features``, là-bas
+``Hand_Detection``). Les deux projets étant livrés séparément, chacun garde sa
+copie de ces quelques fonctions ; un changement du format ``.npz`` doit être
+reporté dans les deux.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from gesture_features import COMMANDS, classify_batch
+
+UNKNOWN = "INCONNU"
+STABILITY_THRESHOLD = 5  # comme detect_hand_gesture (PY_G8_P4_S4.py)
+
+
+# -- format de session ----------------------------------------------------------
+def save_session(path: str, t, landmarks, labels=None, flipped: bool = True) -> None:
+    t = np.asarray(t, dtype=np.float64)
+    labels = np.full(len(t), "") if labels is None else np.asarray(labels, dtype=str)
+    np.savez_compressed(path, t=t, landmarks=np.asarray(landmarks, dtype=np.float32),
+                        labels=labels, flipped=flipped)
+
+
+def load_session(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        session = {key: data[key] for key in data.files}
+    session.setdefault("labels", np.full(len(session["t"]), ""))
+    return session
+
+
+def record(path: str, labels: Sequence[str] = (), camera: int = 0, flip: bool = True,
+           max_seconds: Optional[float] = None) -> int:
+    """Enregistre une session depuis la caméra. Touches : 1..9 geste attendu (``labels``), 0 aucun, q fin."""
+    import cv2
+    import mediapipe as mp
+
+    cap = cv2.VideoCapture(camera)
+    times: List[float] = []
+    points: List[np.ndarray] = []
+    expected: List[str] = []
+    current = ""
+    no_hand = np.full((21, 3), np.nan, dtype=np.float32)
+    start = time.monotonic()
+    with mp.solutions.hands.Hands(max_num_hands=1, min_detection_confidence=0.8,
+                                  min_tracking_confidence=0.8) as hands:
+        while cap.isOpened():
+            ok, frame = cap.read()
+            if not ok:
+                continue
+            now = time.monotonic() - start
+            if flip:
+                frame = cv2.flip(frame, 1)
+            results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                marks = results.multi_hand_landmarks[0].landmark
+                points.append(np.array([(p.x, p.y, p.z) for p in marks], dtype=np.float32))
+            else:
+                points.append(no_hand)
+            times.append(now)
+            expected.append(current)
+
+            cv2.putText(frame, f"{len(times)} images  attendu: {current or '-'}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+            cv2.imshow("Enregistrement gestes", frame)
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord("q") or (max_seconds is not None and now >= max_seconds):
+                break
+            if key == ord("0"):
+                current = ""
+            elif ord("1") <= key <= ord("9") and key - ord("1") < len(labels):
+                current = labels[key - ord("1")]
+    cap.release()
+    cv2.destroyAllWindows()
+    save_session(path, times, points, expected, flipped=flip)
+    return len(times)
+
+
+# -- rejeu ----------------------------------------------------------------------
+def raw_gestures(landmarks: np.ndarray) -> np.ndarray:
+    """Geste brut de chaque image (``UNKNOWN`` sans main), toute la session en un appel."""
+    present = ~np.isnan(landmarks).any(axis=(1, 2))
+    raw = np.full(len(landmarks), UNKNOWN, dtype=object)
+    if present.any():
+        raw[present] = classify_batch(landmarks[present])
+    return raw
+
+
+def stable_gestures(raw: np.ndarray, threshold: int = STABILITY_THRESHOLD) -> np.ndarray:
+    """Règle de l'interface : le geste est stable à partir de sa ``threshold``+1-ième image consécutive."""
+    n = len(raw)
+    if n == 0:
+        return raw.copy()
+    run_start = np.ones(n, dtype=bool)
+    run_start[1:] = raw[1:] != raw[:-1]
+    index = np.arange(n)
+    position = index - np.maximum.accumulate(np.where(run_start, index, 0))
+    return np.where(position >= threshold, raw, UNKNOWN)
+
+
+def emitted_commands(t: np.ndarray, stable: np.ndarray) -> List[tuple]:
+    """(instant, geste, commande) à chaque nouveau geste stable associé à une commande."""
+    changes = np.flatnonzero(np.r_[True, stable[1:] != stable[:-1]])
+    return [(float(t[i]), stable[i], COMMANDS[stable[i]]) for i in changes if stable[i] in COMMANDS]
+
+
+def time_to_stable(t: np.ndarray, labels: np.ndarray, stable: np.ndarray) -> List[Optional[float]]:
+    """Par segment annoté : délai (s) jusqu'au premier geste stable correct (None : jamais atteint)."""
+    delays: List[Optional[float]] = []
+    bounds = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1], True])
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        if not labels[begin]:
+            continue
+        hits = np.flatnonzero(stable[begin:end] == labels[begin])
+        delays.append(float(t[begin + hits[0]] - t[begin]) if len(hits) else None)
+    return delays
+
+
+def evaluate(session: Dict[str, np.ndarray], threshold: int = STABILITY_THRESHOLD) -> dict:
+    t, labels = session["t"], session["labels"].astype(object)
+    raw = raw_gestures(session["landmarks"])
+    stable = stable_gestures(raw, threshold)
+    annotated = labels != ""
+    delays = time_to_stable(t, labels, stable)
+    reached = [d for d in delays if d is not None]
+    return {
+        "frames": len(t),
+        "duration": float(t[-1] - t[0]) if len(t) else 0.0,
+        "annotated": int(annotated.sum()),
+        "raw_accuracy": float((raw[annotated] == labels[annotated]).mean()) if annotated.any() else None,
+        "stable_accuracy": float((stable[annotated] == labels[annotated]).mean()) if annotated.any() else None,
+        "segments": len(delays),
+        "segments_reached": len(reached),
+        "time_to_stable_mean": float(np.mean(reached)) if reached else None,
+        "time_to_stable_max": float(np.max(reached)) if reached else None,
+        "commands": emitted_commands(t, stable),
+    }
+
+
+def synthetic_session(seconds: float = 60.0, fps: float = 30.0, seed: int = 0) -> Dict[str, np.ndarray]:
+    """Session artificielle : gestes tenus 2 s, bruit sur les points, images sans main."""
+    rng = np.random.default_rng(seed)
+    hand = np.zeros((21, 3))
+    hand[:, 0] = 0.5
+    hand[:, 1] = np.linspace(0.8, 0.3, 21)  # base -> bouts, vers le haut
+    n = int(seconds * fps)
+    names = ["CLOSED", "ONE", "TWO", "THREE", "FOUR", "FIVE"]
+    t = np.arange(n) / fps
+    landmarks = np.repeat(hand[None], n, axis=0)
+    open_count = (t // 2).astype(int) % len(names)
+    labels = np.array(names)[open_count]
+    for finger in range(5):
+        tip, dip = 4 + 4 * finger, 3 + 4 * finger
+        axis = 0 if finger == 0 else 1  # pouce : axe x, autres doigts : axe y
+        # Doigt ouvert : bout avant son DIP sur l'axe (au-dessus, ou à gauche pour le pouce)
+        landmarks[:, tip, axis] = landmarks[:, dip, axis] + np.where(finger < open_count, -0.05, 0.05)
+    landmarks += rng.normal(0, 0.012, landmarks.shape)  # gigue : fausses transitions brutes
+    missing = rng.random(n) < 0.03
+    landmarks[missing] = np.nan
+    return {"t": t, "landmarks": landmarks.astype(np.float32), "labels": labels}
+
+
+def report(name: str, session: Dict[str, np.ndarray], threshold: int) -> None:
+    start = time.perf_counter()
+    result = evaluate(session, threshold)
+    elapsed = time.perf_counter() - start
+
+    def pct(value):
+        return "-" if value is None else f"{100 * value:.1f} %"
+
+    def sec(value):
+        return "-" if value is None else f"{value:.2f} s"
+
+    print(f"{name}: {result['frames']} images, {result['duration']:.1f} s, {result['annotated']} annotées")
+    print(f"  exactitude brute {pct(result['raw_accuracy'])}, stable {pct(result['stable_accuracy'])}")
+    print(f"  délai avant geste stable : moyen {sec(result['time_to_stable_mean'])}, "
+          f"max {sec(result['time_to_stable_max'])} ({result['segments_reached']}/{result['segments']} segments)")
+    print(f"  {len(result['commands'])} commandes : "
+          + ", ".join(f"{t:.1f}s {command}" for t, _, command in result["commands"][:12])
+          + (" ..." if len(result["commands"]) > 12 else ""))
+    speed = result["duration"] / elapsed if elapsed > 0 else float("inf")
+    print(f"  rejeu en {1000 * elapsed:.1f} ms (x{speed:.0f} temps réel)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enregistrement / rejeu hors ligne des gestes de la main.")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    rec = sub.add_parser("record", help="Enregistrer une session depuis la caméra")
+    rec.add_argument("output")
+    rec.add_argument("--labels", nargs="*", default=list(COMMANDS), help="Gestes associés aux touches 1..9")
+    rec.add_argument("--camera", type=int, default=0)
+    rec.add_argument("--no-flip", action="store_true", help="Ne pas retourner l'image (l'interface la retourne)")
+    rec.add_argument("--seconds", type=float, default=None)
+    rep = sub.add_parser("replay", help="Rejouer des sessions enregistrées")
+    rep.add_argument("sessions", nargs="+")
+    rep.add_argument("--threshold", type=int, default=STABILITY_THRESHOLD)
+    demo = sub.add_parser("demo", help="Rejouer une session synthétique")
+    demo.add_argument("--seconds", type=float, default=600.0)
+    demo.add_argument("--threshold", type=int, default=STABILITY_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        count = record(args.output, args.labels, args.camera, not args.no_flip, args.seconds)
+        print(f"{count} images -> {args.output}")
+    elif args.mode == "replay":
+        for path in args.sessions:
+            report(path, load_session(path), args.threshold)
+    else:
+        report("synthétique", synthetic_session(args.seconds), args.threshold)
+
+
+if __name__ == "__main__":
+    main()
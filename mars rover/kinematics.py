@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Cinématique du robot omnidirectionnel (4 roues mecanum).
+
+La matrice jacobienne 4x3 qui relie les vitesses du châssis (Vx, Vy, Ω) aux
+vitesses des roues (en tours/s, comme dans l'interface et le firmware) est
+construite une seule fois à partir de R, L et l. Les transformations directe
+et inverse sont de simples produits matriciels NumPy et acceptent aussi bien
+une consigne unique que des lots de N consignes (trajectoires, rejeu).
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+# Géométrie par défaut (identique à PY_G8_P4_S4.py)
+R = 0.05  # Rayon des roues (5 cm)
+L = 0.20  # Demi-longueur (20 cm)
+l = 0.125  # Demi-largeur (12.5 cm)
+
+ACTIVE_THRESHOLD = 0.001  # En dessous, une roue est considérée à l'arrêt
+
+
+class MecanumKinematics:
+    """Transformations châssis <-> roues pour une géométrie (R, L, l) donnée."""
+
+    def __init__(self, R: float = R, L: float = L, l: float = l,
+                 max_wheel_speed: Optional[float] = None):
+        self.R, self.L, self.l = R, L, l
+        self.max_wheel_speed = max_wheel_speed
+        k = L + l
+        # Lignes : roues 1 à 4 ; colonnes : Vx, Vy, Ω. Résultat en tours/s.
+        self.jacobian = np.array([
+            [1.0, -1.0, -k],
+            [-1.0, -1.0, k],
+            [1.0, -1.0, k],
+            [-1.0, -1.0, -k],
+        ]) / (2 * np.pi * R)
+        # Pseudo-inverse (moindres carrés) : roues -> châssis, 3x4.
+        self.inverse = np.linalg.pinv(self.jacobian)
+        self._jacobian_t = self.jacobian.T.copy()
+        self._inverse_t = self.inverse.T.copy()
+
+    def body_to_wheels(self, V, max_wheel_speed: Optional[float] = None) -> np.ndarray:
+        """Vitesses châssis V[..., 3] (m/s, m/s, rad/s) -> vitesses roues [..., 4] (tours/s).
+
+        Si une vitesse limite de roue est donnée (ou fixée à la construction),
+        chaque consigne qui la dépasse est réduite proportionnellement : la
+        direction du mouvement est conservée.
+        """
+        W = np.asarray(V, dtype=np.float64) @ self._jacobian_t
+        limit = self.max_wheel_speed if max_wheel_speed is None else max_wheel_speed
+        if limit is not None:
+            W = saturate(W, limit)
+        return W
+
+    def wheels_to_body(self, W) -> np.ndarray:
+        """Vitesses roues W[..., 4] (tours/s) -> vitesses châssis [..., 3]."""
+        return np.asarray(W, dtype=np.float64) @ self._inverse_t
+
+
+def saturate(W: np.ndarray, limit: float) -> np.ndarray:
+    """Réduit chaque ligne de W pour que max(|W|) <= limit, sans changer ses ratios."""
+    peak = np.max(np.abs(W), axis=-1, keepdims=True)
+    scale = np.maximum(peak / limit, 1.0)
+    return W / scale
+
+
+def active_wheels(W) -> np.ndarray:
+    """Masque des roues en mouvement (|vitesse| > ACTIVE_THRESHOLD)."""
+    return np.abs(np.asarray(W)) > ACTIVE_THRESHOLD
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Mode batch (sans interface) de la détection QR.
+
+Traite des vidéos enregistrées, des images (motifs glob) ou des dossiers avec
+la même chaîne que le mode caméra (``qr_pipeline.QRPipeline``) et écrit une
+ligne JSON par image :
+
+    {"source": "mission.mp4", "frame": 42, "full_detection": true,
+     "detections": [{"bbox": [x1, y1, x2, y2], "confidence": 0.91,
+                     "text": "c 15 0 0", "track": 3, "tracked": false}],
+     "timings_ms": {"detect_ms": 31.2, "decode_ms": 4.8, "total_ms": 36.0}}
+
+Le travail est découpé en tranches (groupes d'images, plages d'images d'une
+vidéo) réparties sur plusieurs processus ; les résultats sont réécrits dans
+l'ordre des sources. Le suivi et le cache de décodage ne sont enchaînés
+qu'entre images successives d'une même tranche vidéo (``VIDEO_SHARD_FRAMES``
+images, découpage indépendant du nombre de processus) : la sortie JSONL est la
+même avec ``-j 1`` ou ``-j 8``. Chaque fichier image est traité seul (détection
+complète, aucun texte repris d'une autre image).
+"""
+
+from __future__ import annotations
+
+import glob
+import json
+import math
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from qr_pipeline import QRPipeline, make_detector
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".webp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg"}
+# Images par tranche vidéo (une ouverture + un seek par tranche). Fixe, indépendant de --workers :
+# le suivi repart d'une détection complète au début de chaque tranche, la sortie ne dépend donc
+# que de ce découpage
+VIDEO_SHARD_FRAMES = 200
+
+# (type, chemins, première image, fin exclue ou -1) ; pour "images", les bornes indexent les chemins
+Shard = Tuple[str, Tuple[str, ...], int, int]
+
+
+def expand_inputs(inputs: Sequence[str]) -> List[str]:
+    """Fichiers désignés par des chemins, dossiers ou motifs glob, dans l'ordre donné."""
+    paths: List[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = sorted(os.path.join(item, name) for name in os.listdir(item))
+        elif os.path.isfile(item):
+            candidates = [item]
+        else:
+            candidates = sorted(glob.glob(item, recursive=True))
+        for path in candidates:
+            ext = os.path.splitext(path)[1].lower()
+            if os.path.isfile(path) and (ext in IMAGE_EXTENSIONS or ext in VIDEO_EXTENSIONS):
+                paths.append(path)
+    return paths
+
+
+def plan_shards(paths: Sequence[str], workers: int) -> List[Shard]:
+    """Découpe les sources en tranches pour `workers` processus, dans l'ordre des sources.
+
+    Seuls les groupes d'images dépendent de `workers` (chaque image est traitée seule) ; les
+    vidéos sont coupées toutes les ``VIDEO_SHARD_FRAMES`` images, quel que soit `workers`.
+    """
+    shards: List[Shard] = []
+    images: List[str] = []
+
+    def flush_images():
+        if images:
+            size = max(1, math.ceil(len(images) / (workers * 4)))
+            for start in range(0, len(images), size):
+                chunk = tuple(images[start:start + size])
+                shards.append(("images", chunk, 0, len(chunk)))
+            images.clear()
+
+    for path in paths:
+        if os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS:
+            images.append(path)
+            continue
+        flush_images()
+        cap = cv2.VideoCapture(path)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if total <= 0:
+            # Nombre d'images inconnu : la vidéo entière dans une seule tranche
+            shards.append(("video", (path,), 0, -1))
+            continue
+        for start in range(0, total, VIDEO_SHARD_FRAMES):
+            shards.append(("video", (path,), start, min(total, start + VIDEO_SHARD_FRAMES)))
+    flush_images()
+    return shards
+
+
+def _frames(shard: Shard) -> Iterator[Tuple[str, int, Optional[np.ndarray]]]:
+    kind, paths, start, end = shard
+    if kind == "images":
+        for path in paths[start:end]:
+            yield path, 0, cv2.imread(path, cv2.IMREAD_COLOR)
+        return
+    path = paths[0]
+    cap = cv2.VideoCapture(path)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    while end < 0 or index < end:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield path, index, frame
+        index += 1
+    cap.release()
+
+
+# -- processus de travail -------------------------------------------------------
+_worker = {}  # options et détecteur du processus (chargé une seule fois)
+
+
+def _init_worker(options: Dict) -> None:
+    # Un processus par cœur : pas de threads OpenCV en plus
+    cv2.setNumThreads(1)
+    _worker.clear()
+    _worker["options"] = options
+
+
+def process_shard(shard: Shard) -> List[str]:
+    """Traite une tranche et retourne ses lignes JSON (une par image)."""
+    options = _worker["options"]
+    if "detect" not in _worker:
+        _worker["detect"] = make_detector(
+            options["detector"], options["model_size"], options["conf"],
+            backend=options.get("backend", "torch"), threads=options.get("threads"), int8=options.get("int8", False),
+        )
+    detect = _worker["detect"]
+    pipeline = QRPipeline(detect, max_skip=options["max_skip"], decode_path="serial")
+    independent = shard[0] == "images"
+    lines = []
+    try:
+        for source, index, frame in _frames(shard):
+            if independent:
+                pipeline.reset()  # images sans lien entre elles : pas de suivi d'une image à l'autre
+            record = {"source": source, "frame": index}
+            if frame is None:
+                record["error"] = "lecture impossible"
+                lines.append(json.dumps(record, ensure_ascii=False))
+                continue
+            tracks, timings = pipeline.process(frame)
+            record["full_detection"] = pipeline.last_full
+            record["detections"] = [
+                {
+                    "bbox": [round(float(v), 1) for v in track.bbox],
+                    "confidence": round(track.confidence, 4),
+                    "text": track.text,
+                    "track": track.track_id,
+                    "tracked": not pipeline.last_full,
+                }
+                for track in tracks
+            ]
+            record["timings_ms"] = {key: round(value, 3) for key, value in timings.items()}
+            lines.append(json.dumps(record, ensure_ascii=False))
+    finally:
+        pipeline.close()
+    return lines
+
+
+def run_batch(inputs: Sequence[str], output: str, workers: int, options: Dict) -> int:
+    """Traite toutes les sources et écrit `output` (JSONL). Retourne le nombre d'images."""
+    paths = expand_inputs(inputs)
+    if not paths:
+        print(f"Aucune image ni vidéo trouvée pour: {' '.join(inputs)}")
+        return 0
+    workers = max(1, workers)
+    shards = plan_shards(paths, workers)
+    print(f"{len(paths)} source(s), {len(shards)} tranche(s), {workers} processus -> {output}")
+
+    start = time.perf_counter()
+    frames = decoded = 0
+    with open(output, "w", encoding="utf-8") as out:
+        if workers == 1:
+            _init_worker(options)
+            results = map(process_shard, shards)
+            pool = None
+        else:
+            pool = Pool(workers, initializer=_init_worker, initargs=(options,))
+            results = pool.imap(process_shard, shards)
+        try:
+            for lines in results:
+                for line in lines:
+                    out.write(line + "\n")
+                frames += len(lines)
+                decoded += sum(1 for line in lines if '"text": "' in line)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+    elapsed = time.perf_counter() - start
+    print(f"{frames} images en {elapsed:.1f} s ({frames / max(elapsed, 1e-9):.1f} images/s), "
+          f"{decoded} image(s) avec au moins un QR décodé")
+    return frames
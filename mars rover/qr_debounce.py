@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Anti-rebond des commandes lues sur les QR, avant l'envoi série.
+
+``CommandDebouncer`` tient une table par commande (texte complet du QR) et
+décide, image par image, quelles commandes partent vers l'ESP32 :
+
+- confirmation : une commande doit être vue sur ``confirm_frames`` des
+  ``confirm_window`` dernières images avant d'être envoyée ; une image manquée
+  par le détecteur ne remet pas le compte à zéro, mais un QR aperçu une image,
+  ou deux QR vus en alternance, ne déclenchent rien ;
+- front montant : une commande qui reste dans le champ n'est envoyée qu'une
+  fois (le firmware garde la consigne jusqu'à la suivante) ; elle n'est
+  considérée comme sortie du champ qu'après ``max_miss`` images manquées de
+  suite ; ``repeat`` permet de la renvoyer périodiquement si besoin ;
+- temps mort par commande : après un envoi, la même commande est ignorée
+  pendant un délai qui dépend de sa lettre de mode (``cooldowns``), même si
+  le QR sort puis revient dans le champ ;
+- sécurité : l'arrêt ``s`` part dès la première image, sans temps mort, et
+  remet à zéro les temps morts des autres commandes (un mouvement montré
+  juste après l'arrêt est pris en compte).
+
+Les compteurs (``stats()``) séparent les commandes envoyées des observations
+supprimées (non confirmées, déjà envoyées, en temps mort) pour mesurer
+l'occupation de la liaison.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from command_queue import STOP_COMMAND, command_mode
+
+DEFAULT_CONFIRM_FRAMES = 3
+DEFAULT_CONFIRM_WINDOW = 4  # 3 sur 4 : tolère une image manquée, pas une alternance 1 sur 2
+DEFAULT_MAX_MISS = 2
+DEFAULT_COOLDOWN_SEC = 1.5
+# Temps mort par lettre de mode ; les autres commandes utilisent DEFAULT_COOLDOWN_SEC
+DEFAULT_COOLDOWNS = {STOP_COMMAND: 0.0, "p": 3.0}
+IMMEDIATE_COMMANDS = frozenset({STOP_COMMAND})
+
+
+@dataclass
+class _Entry:
+    history: int = 0  # bit i : commande visible il y a i images
+    missed: int = 0  # images consécutives où la commande manque
+    held: bool = False  # déjà envoyée depuis son apparition
+    last_sent: Optional[float] = None
+
+
+class CommandDebouncer:
+    """Table d'anti-rebond : confirmation sur k des n dernières images, temps mort par commande."""
+
+    def __init__(
+        self,
+        confirm_frames: int = DEFAULT_CONFIRM_FRAMES,
+        confirm_window: int = DEFAULT_CONFIRM_WINDOW,
+        max_miss: int = DEFAULT_MAX_MISS,
+        default_cooldown: float = DEFAULT_COOLDOWN_SEC,
+        cooldowns: Optional[Dict[str, float]] = None,
+        immediate: Iterable[str] = IMMEDIATE_COMMANDS,
+        repeat: Optional[float] = None,
+    ):
+        self.confirm_frames = max(1, confirm_frames)
+        self.confirm_window = max(self.confirm_frames, confirm_window)
+        self.max_miss = max(0, max_miss)
+        self._window_mask = (1 << self.confirm_window) - 1
+        self.default_cooldown = default_cooldown
+        self.cooldowns = dict(DEFAULT_COOLDOWNS if cooldowns is None else cooldowns)
+        self.immediate = frozenset(immediate)
+        self.repeat = repeat
+        self._entries: Dict[str, _Entry] = {}
+        self.frames = 0
+        self.sent = 0
+        self.sent_bytes = 0
+        self.suppressed_unconfirmed = 0
+        self.suppressed_held = 0
+        self.suppressed_cooldown = 0
+
+    def cooldown(self, command: str) -> float:
+        return self.cooldowns.get(command_mode(command), self.default_cooldown)
+
+    def update(self, commands: Iterable[str], now: float) -> List[str]:
+        """Commandes visibles sur cette image -> commandes à envoyer maintenant."""
+        self.frames += 1
+        seen = {command.strip() for command in commands if command and command.strip()}
+        for command, entry in list(self._entries.items()):
+            visible = command in seen
+            entry.history = ((entry.history << 1) | visible) & self._window_mask
+            if visible:
+                entry.missed = 0
+                continue
+            entry.missed += 1
+            if entry.missed > self.max_miss:
+                entry.held = False  # sorti du champ : un retour sera un nouvel envoi
+                if not entry.history and (entry.last_sent is None or now - entry.last_sent >= self.cooldown(command)):
+                    del self._entries[command]  # plus rien à retenir
+
+        out = []
+        for command in sorted(seen, key=lambda c: (c not in self.immediate, c)):  # arrêt en premier
+            entry = self._entries.get(command)
+            if entry is None:
+                entry = self._entries[command] = _Entry(history=1)
+            needed = 1 if command in self.immediate else self.confirm_frames
+            if bin(entry.history).count("1") < needed:
+                self.suppressed_unconfirmed += 1
+            elif entry.held and (self.repeat is None or now - entry.last_sent < self.repeat):
+                self.suppressed_held += 1
+            elif not entry.held and entry.last_sent is not None and now - entry.last_sent < self.cooldown(command):
+                self.suppressed_cooldown += 1
+            else:
+                entry.held = True
+                entry.last_sent = now
+                self.sent += 1
+                self.sent_bytes += len(command) + 1  # + "\n"
+                out.append(command)
+                if command in self.immediate:
+                    self._clear_cooldowns(command)
+        return out
+
+    def _clear_cooldowns(self, keep: str) -> None:
+        for command, entry in self._entries.items():
+            if command != keep:
+                entry.last_sent = None
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        suppressed = self.suppressed_unconfirmed + self.suppressed_held + self.suppressed_cooldown
+        observed = suppressed + self.sent
+        return {
+            "frames": self.frames,
+            "sent": self.sent,
+            "sent_bytes": self.sent_bytes,
+            "suppressed": suppressed,
+            "suppressed_unconfirmed": self.suppressed_unconfirmed,
+            "suppressed_held": self.suppressed_held,
+            "suppressed_cooldown": self.suppressed_cooldown,
+            "suppression_rate": suppressed / observed if observed else 0.0,
+        }
+
+
+def _legacy_sends(frames: List[List[str]], fps: float, cooldown: float = DEFAULT_COOLDOWN_SEC) -> int:
+    """Envois de l'ancienne logique (dernière commande + temps mort global)."""
+    last, last_time, sent = None, float("-inf"), 0
+    for i, commands in enumerate(frames):
+        now = i / fps
+        for command in commands:
+            if last != command or now - last_time >= cooldown:
+                last, last_time, sent = command, now, sent + 1
+    return sent
+
+
+if __name__ == "__main__":
+    # Comparaison ancienne / nouvelle logique sur des scénarios à 30 images/s (avec les envois attendus)
+    fps = 30.0
+    scenarios = {
+        "QR 'a' tenu 10 s": ([["a"]] * 300, ["a"]),
+        "deux QR en alternance 10 s": ([["a"] if i % 2 else ["c 15 0 0"] for i in range(300)], []),
+        "deux QR visibles 10 s": ([["a", "l"]] * 300, ["a", "l"]),
+        "QR qui clignote (1 image sur 3 manquée)": ([["a"] if i % 3 else [] for i in range(300)], ["a"]),
+        "'a' puis arrêt 's' puis 'a'": ([["a"]] * 60 + [["s"]] * 5 + [["a"]] * 60, ["a", "s", "a"]),
+    }
+    print(f"{'scénario':<42}{'avant':>7}{'après':>7}  supprimées")
+    failures = 0
+    for name, (frames, expected) in scenarios.items():
+        debouncer = CommandDebouncer()
+        sent = [c for i, commands in enumerate(frames) for c in debouncer.update(commands, i / fps)]
+        stats = debouncer.stats()
+        status = "" if sent == expected else f"  ÉCHEC (attendu: {' | '.join(expected) or 'aucun envoi'})"
+        failures += sent != expected
+        print(f"{name:<42}{_legacy_sends(frames, fps):>7}{stats['sent']:>7}  "
+              f"{stats['suppressed']} ({100 * stats['suppression_rate']:.0f} %) -> {' | '.join(sent)}{status}")
+    raise SystemExit(1 if failures else 0)
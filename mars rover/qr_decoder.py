@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Étape de décodage des QR détectés par YOLO.
+
+Trois façons de décoder les boîtes d'une image :
+
+- ``serial`` : chaque région découpée, l'une après l'autre (cas d'un seul QR) ;
+- ``pool``   : les régions réparties sur un pool de threads (OpenCV relâche le
+  GIL pendant le décodage ; chaque thread a son propre ``QRCodeDetector``) ;
+- ``multi``  : toute l'image en un seul appel ``detectAndDecodeMulti``, les
+  textes étant ensuite rattachés aux boîtes YOLO par position. Les boîtes
+  que ce passage n'a pas su lire sont re-décodées par région.
+
+``QRDecodeStage`` choisit le chemin le plus rapide en fonction du nombre de
+boîtes, d'après les temps mesurés (moyenne glissante par chemin et par nombre
+de boîtes) : chaque chemin est d'abord essayé, puis re-mesuré de temps en temps.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+PATHS = ("serial", "pool", "multi")
+MAX_BUCKET = 8  # au-delà, même statistiques que pour 8 boîtes
+EMA_ALPHA = 0.2
+EXPLORE_EVERY = 50  # re-mesure d'un autre chemin toutes les N images
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_local = threading.local()
+
+
+def get_qr_decoder() -> cv2.QRCodeDetector:
+    """Décodeur OpenCV du thread courant, créé une seule fois (non partageable entre threads)."""
+    det = getattr(_local, "qr_decoder", None)
+    if det is None:
+        det = _local.qr_decoder = cv2.QRCodeDetector()
+    return det
+
+
+def decode_qr_opencv(image: np.ndarray) -> Optional[str]:
+    """Décode un QR dans une image (BGR) avec OpenCV. Retourne le texte ou None."""
+    data, _, _ = get_qr_decoder().detectAndDecode(image)
+    if data and data.strip():
+        return data.strip()
+    return None
+
+
+def decode_qr_region(frame: np.ndarray, bbox_xyxy) -> Optional[str]:
+    """Extrait la région délimitée par bbox_xyxy (x1,y1,x2,y2) et tente de décoder un QR."""
+    x1, y1, x2, y2 = map(int, bbox_xyxy)
+    h, w = frame.shape[:2]
+    x1, x2 = max(0, x1), min(w, x2)
+    y1, y2 = max(0, y1), min(h, y2)
+    if x2 <= x1 or y2 <= y1:
+        return None
+    crop = frame[y1:y2, x1:x2]
+    return decode_qr_opencv(crop)
+
+
+def decode_frame_multi(frame: np.ndarray, boxes: Sequence) -> List[Optional[str]]:
+    """Décode toute l'image en un appel et attribue chaque texte à la boîte qui contient son centre."""
+    texts: List[Optional[str]] = [None] * len(boxes)
+    ok, decoded, points, _ = get_qr_decoder().detectAndDecodeMulti(frame)
+    if not ok or points is None:
+        return texts
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    centers = np.asarray(points, dtype=np.float64).reshape(-1, 4, 2).mean(axis=1)
+    for text, (cx, cy) in zip(decoded, centers):
+        if not text or not text.strip():
+            continue
+        inside = (boxes[:, 0] <= cx) & (cx <= boxes[:, 2]) & (boxes[:, 1] <= cy) & (cy <= boxes[:, 3])
+        for i in np.flatnonzero(inside):
+            if texts[i] is None:
+                texts[i] = text.strip()
+                break
+    return texts
+
+
+class QRDecodeStage:
+    """Décode les régions d'une image en choisissant le chemin le plus rapide."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, path: str = "auto"):
+        if path != "auto" and path not in PATHS:
+            raise ValueError(f"Chemin de décodage inconnu: {path}")
+        self.path = path
+        self.workers = max(1, workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._timings: Dict[tuple, float] = {}
+        self.calls = 0
+        self.path_counts: Dict[str, int] = defaultdict(int)
+        self.last_path = ""
+        self.last_ms = 0.0
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def decode(self, frame: np.ndarray, boxes: Sequence) -> List[Optional[str]]:
+        """Textes décodés (ou None) pour chaque boîte xyxy de `boxes`, dans l'ordre."""
+        if len(boxes) == 0:
+            return []
+        path = self._choose(len(boxes))
+        start = time.perf_counter()
+        if path == "multi":
+            texts = decode_frame_multi(frame, boxes)
+            missing = [i for i, text in enumerate(texts) if text is None]
+            if missing:
+                for i, text in zip(missing, self._decode_regions(frame, [boxes[i] for i in missing])):
+                    texts[i] = text
+        elif path == "pool":
+            texts = self._decode_regions(frame, boxes)
+        else:
+            texts = [decode_qr_region(frame, box) for box in boxes]
+        elapsed = time.perf_counter() - start
+        self._record(path, len(boxes), elapsed)
+        return texts
+
+    def _decode_regions(self, frame: np.ndarray, boxes: Sequence) -> List[Optional[str]]:
+        if len(boxes) == 1 or self.workers == 1:
+            return [decode_qr_region(frame, box) for box in boxes]
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="qr-decode")
+        return list(self._pool.map(lambda box: decode_qr_region(frame, box), boxes))
+
+    def _choose(self, count: int) -> str:
+        if self.path != "auto":
+            return self.path
+        if count == 1:
+            return "serial"
+        bucket = min(count, MAX_BUCKET)
+        candidates = PATHS if self.workers > 1 else ("serial", "multi")
+        # Chemin jamais mesuré pour ce nombre de boîtes : on l'essaie
+        for path in candidates:
+            if (path, bucket) not in self._timings:
+                return path
+        ranked = sorted(candidates, key=lambda p: self._timings[(p, bucket)])
+        if self.calls % EXPLORE_EVERY == EXPLORE_EVERY - 1:
+            # Re-mesure à tour de rôle des chemins non retenus
+            return ranked[1 + (self.calls // EXPLORE_EVERY) % (len(ranked) - 1)]
+        return ranked[0]
+
+    def _record(self, path: str, count: int, elapsed: float) -> None:
+        key = (path, min(count, MAX_BUCKET))
+        previous = self._timings.get(key)
+        self._timings[key] = elapsed if previous is None else previous + EMA_ALPHA * (elapsed - previous)
+        self.calls += 1
+        self.path_counts[path] += 1
+        self.last_path = path
+        self.last_ms = 1000 * elapsed
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "last_path": self.last_path,
+            "last_ms": self.last_ms,
+            "paths": dict(self.path_counts),
+            "timings_ms": {f"{p}/{n}": 1000 * t for (p, n), t in sorted(self._timings.items())},
+        }
@@ -7,24 +7,40 @@ Utilise YOLO (qrdet, basé YOLOv8) pour détecter les QR dans le flux caméra,
 décode le contenu avec OpenCV, et envoie la commande à l'Arduino/ESP32
 via le port série (même protocole que l'interface Streamlit).
 
+La caméra est lue par un thread dédié (``frame_grabber.FrameGrabber``) : la
+détection traite toujours l'image la plus récente et les images arrivées
+pendant l'inférence sont abandonnées.
+
+Les QR sont suivis d'une image à l'autre (``qr_tracker.QRTracker``) : le texte
+décodé est gardé en cache par piste et le décodage n'est relancé que pour une
+nouvelle piste ou une boîte qui a beaucoup bougé. Les régions à décoder
+d'une même image passent par ``qr_decoder.QRDecodeStage``, qui choisit entre
+décodage région par région, pool de threads ou ``detectAndDecodeMulti``.
+
+YOLO ne tourne pas sur chaque image : ``qr_scheduler.DetectionScheduler`` lance
+une détection complète une image sur N (N adaptatif, ``--max-skip``) et suit
+les boîtes connues par corrélation locale entre deux.
+
+Sur CPU, le modèle qrdet peut être exporté en ONNX (une fois, mis en cache) et
+exécuté par ONNX Runtime ou OpenVINO : ``--backend onnxruntime --threads 4``,
+``--int8`` pour la version quantifiée (voir yolo_backend.py).
+
+Mode batch sans interface (vidéos, images, dossiers -> JSONL, plusieurs
+processus) : ``--input mission.mp4 --output resultats.jsonl`` (voir qr_batch.py).
+Mode caméra sans fenêtre : ``--headless``.
+
 Exemple de contenu QR : "a", "s", "c 15 0 0", "p 10 0 0", etc.
 """
 
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 import time
 from typing import Optional
 
 import cv2
-import numpy as np
-
-try:
-    from qrdet import QRDetector
-except ImportError:
-    print("Installez qrdet : pip install qrdet")
-    sys.exit(1)
 
 try:
     import serial
@@ -33,6 +49,14 @@ except ImportError:
     print("Installez pyserial : pip install pyserial")
     sys.exit(1)
 
+from command_queue import CommandQueue
+from frame_grabber import FpsMeter, FrameGrabber
+from qr_batch import run_batch
+from qr_debounce import DEFAULT_CONFIRM_FRAMES, DEFAULT_CONFIRM_WINDOW, CommandDebouncer
+from qr_decoder import DEFAULT_WORKERS, PATHS
+from qr_pipeline import DETECTORS, QRPipeline, make_detector
+from yolo_backend import BACKENDS
+
 
 # -----------------------------------------------------------------------------
 # Configuration par défaut (alignée avec PY_G8_P4_S4 et Arduino)
@@ -40,41 +64,22 @@ except ImportError:
 DEFAULT_PORT = "COM14"
 DEFAULT_BAUD = 57600
 DEFAULT_CAMERA_INDEX = 0
-COOLDOWN_SEC = 1.5  # Délai entre deux envois de commande pour le même QR
-
-
-def decode_qr_opencv(image: np.ndarray) -> Optional[str]:
-    """Décode un QR dans une image (BGR) avec OpenCV. Retourne le texte ou None."""
-    det = cv2.QRCodeDetector()
-    data, _, _ = det.detectAndDecode(image)
-    if data and data.strip():
-        return data.strip()
-    return None
-
-
-def decode_qr_region(frame: np.ndarray, bbox_xyxy) -> Optional[str]:
-    """Extrait la région délimitée par bbox_xyxy (x1,y1,x2,y2) et tente de décoder un QR."""
-    x1, y1, x2, y2 = map(int, bbox_xyxy)
-    h, w = frame.shape[:2]
-    x1, x2 = max(0, x1), min(w, x2)
-    y1, y2 = max(0, y1), min(h, y2)
-    if x2 <= x1 or y2 <= y1:
-        return None
-    crop = frame[y1:y2, x1:x2]
-    return decode_qr_opencv(crop)
-
-
-def send_command_arduino(ser: Optional[serial.Serial], command: str) -> bool:
-    """Envoie une ligne de commande à l'Arduino (commande + \\n)."""
-    if ser is None or not ser.is_open:
-        return False
-    try:
-        line = command.strip() + "\n"
-        ser.write(line.encode("utf-8"))
-        ser.flush()
-        return True
-    except Exception:
-        return False
+COOLDOWN_SEC = 1.5  # Délai minimal avant de renvoyer la même commande (hors arrêt 's')
+STATS_PERIOD_SEC = 5.0  # Affichage console des cadences
+WRITE_TIMEOUT_SEC = 0.2  # Écriture série abandonnée au-delà (liaison radio instable)
+QUEUE_SIZE = 8  # Commandes en attente au maximum (les plus anciennes de mouvement sont abandonnées)
+MAX_COMMAND_AGE_SEC = 1.0  # Consigne de mouvement plus ancienne : non envoyée
+
+
+def open_command_queue(port: str, baud: int) -> CommandQueue:
+    """File d'envoi asynchrone vers l'Arduino : la boucle vision ne bloque jamais sur le port série.
+
+    Le port est ouvert (et rouvert après une coupure) par le thread d'écriture.
+    """
+    def opener():
+        return serial.Serial(port=port, baudrate=baud, timeout=0.5, write_timeout=WRITE_TIMEOUT_SEC)
+
+    return CommandQueue(opener=opener, maxsize=QUEUE_SIZE, max_age=MAX_COMMAND_AGE_SEC).start()
 
 
 def main():
@@ -115,83 +120,253 @@ def main():
         default=0.5,
         help="Seuil de confiance pour la détection QR (défaut: 0.5)",
     )
+    parser.add_argument(
+        "--decode-path",
+        default="auto",
+        choices=("auto",) + PATHS,
+        help="Décodage des QR : auto (le plus rapide mesuré), serial, pool ou multi (défaut: auto)",
+    )
+    parser.add_argument(
+        "--decode-workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Threads du pool de décodage (défaut: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-skip",
+        type=int,
+        default=8,
+        help="Intervalle maximal (images) entre deux détections YOLO complètes ; 1 = YOLO sur chaque image (défaut: 8)",
+    )
+    parser.add_argument(
+        "--confirm-frames",
+        type=int,
+        default=DEFAULT_CONFIRM_FRAMES,
+        help=f"Images (sur les --confirm-window dernières) où le QR doit être vu avant d'envoyer sa commande "
+        f"('s' : immédiat) (défaut: {DEFAULT_CONFIRM_FRAMES})",
+    )
+    parser.add_argument(
+        "--confirm-window",
+        type=int,
+        default=None,
+        help="Nombre d'images récentes examinées pour --confirm-frames (au moins --confirm-frames) ; égal à "
+        "--confirm-frames : N images consécutives "
+        f"(défaut: max({DEFAULT_CONFIRM_WINDOW}, --confirm-frames + 1), une image manquée tolérée)",
+    )
+    parser.add_argument(
+        "--cooldown",
+        type=float,
+        default=COOLDOWN_SEC,
+        help=f"Délai (s) avant de renvoyer la même commande (défaut: {COOLDOWN_SEC})",
+    )
+    parser.add_argument(
+        "--detector",
+        default="qrdet",
+        choices=DETECTORS,
+        help="Détecteur : qrdet (YOLO) ou opencv (sans PyTorch, moins robuste) (défaut: qrdet)",
+    )
+    parser.add_argument(
+        "--backend",
+        default="torch",
+        choices=BACKENDS,
+        help="Exécution de qrdet : torch, onnxruntime ou openvino (export ONNX mis en cache) (défaut: torch)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Threads CPU de l'inférence YOLO (défaut: choix du backend)",
+    )
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Modèle quantifié INT8 (backend onnxruntime uniquement)",
+    )
+    parser.add_argument(
+        "--input", "-i",
+        nargs="+",
+        help="Mode batch : vidéos, images, motifs glob ou dossiers à traiter (pas de caméra ni d'Arduino)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default="qr_resultats.jsonl",
+        help="Mode batch : fichier JSONL des résultats (défaut: qr_resultats.jsonl)",
+    )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Mode batch : nombre de processus (défaut: nombre de cœurs)",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Mode caméra sans fenêtre (arrêt avec Ctrl+C)",
+    )
     args = parser.parse_args()
 
-    # Connexion série (optionnel)
-    ser = None
-    if not args.no_arduino:
+    if args.input:
+        options = {
+            "detector": args.detector,
+            "model_size": args.model_size,
+            "conf": args.conf,
+            "max_skip": args.max_skip,
+            "backend": args.backend,
+            "threads": args.threads,
+            "int8": args.int8,
+        }
         try:
-            ser = serial.Serial(port=args.port, baudrate=args.baud, timeout=0.5)
-            print(f"Arduino connecté sur {args.port} @ {args.baud} baud.")
-        except Exception as e:
-            print(f"Impossible d'ouvrir {args.port}: {e}")
-            print("Lancement en mode --no-arduino (détection seule).")
-            ser = None
+            run_batch(args.input, args.output, args.workers, options)
+        except ImportError as e:
+            print(f"Dépendance manquante ({e.name}) : pip install qrdet [onnxruntime|openvino] "
+                  "(ou utilisez --detector opencv)")
+            sys.exit(1)
+        return
+
+    # Connexion série (optionnel) : le port est ouvert, et rouvert après une coupure,
+    # par le thread d'écriture ; la détection tourne même si l'Arduino est absent.
+    commands: Optional[CommandQueue] = None
+    if not args.no_arduino:
+        commands = open_command_queue(args.port, args.baud)
+        print(f"Envoi des commandes vers {args.port} @ {args.baud} baud (reconnexion automatique).")
 
     # Détecteur QR (YOLO)
-    detector = QRDetector(model_size=args.model_size, conf_th=args.conf)
+    try:
+        detect = make_detector(args.detector, args.model_size, args.conf,
+                               backend=args.backend, threads=args.threads, int8=args.int8)
+    except ImportError as e:
+        print(f"Dépendance manquante ({e.name}) : pip install qrdet [onnxruntime|openvino] "
+              "(ou utilisez --detector opencv)")
+        if commands is not None:
+            commands.stop(flush=False)
+        sys.exit(1)
     cap = cv2.VideoCapture(args.camera)
     if not cap.isOpened():
         print(f"Impossible d'ouvrir la caméra {args.camera}.")
-        if ser and ser.is_open:
-            ser.close()
+        if commands is not None:
+            commands.stop(flush=False)
         sys.exit(1)
 
-    last_sent_command: Optional[str] = None
-    last_sent_time = 0.0
+    grabber = FrameGrabber(cap).start()
+    pipeline = QRPipeline(
+        detect, max_skip=args.max_skip, decode_path=args.decode_path, decode_workers=args.decode_workers
+    )
+    scheduler, tracker, decoder = pipeline.scheduler, pipeline.tracker, pipeline.decoder
+    inference_fps = FpsMeter()  # détections YOLO complètes
+    processed_fps = FpsMeter()  # images traitées (YOLO ou suivi local)
+    decision_ages = []  # âge de l'image (s) à chaque commande envoyée
+    last_stats_time = time.monotonic()
+
+    debouncer = CommandDebouncer(
+        confirm_frames=args.confirm_frames,
+        confirm_window=(
+            max(DEFAULT_CONFIRM_WINDOW, args.confirm_frames + 1) if args.confirm_window is None else args.confirm_window
+        ),
+        default_cooldown=args.cooldown,
+    )
 
     print("Détection QR active. Montrez un QR contenant une commande (ex: a, s, c 15 0 0).")
-    print("Quitter : touche 'q' dans la fenêtre vidéo.")
+    print("Quitter : Ctrl+C." if args.headless else "Quitter : touche 'q' dans la fenêtre vidéo.")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
+    try:
+        while True:
+            frame, _, frame_time = grabber.read()
+            if frame is None:
+                if not args.headless and cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+                continue
 
-        frame_bgr = cv2.flip(frame, 1)
-        detections = detector.detect(image=frame_bgr, is_bgr=True)
+            # flip crée une copie : l'image partagée avec le thread de capture n'est pas modifiée
+            frame_bgr = cv2.flip(frame, 1)
+            # Détection (planifiée), suivi et décodage, avant de dessiner sur l'image
+            tracks, _ = pipeline.process(frame_bgr)
+            if pipeline.last_full:
+                inference_fps.tick()
+            processed_fps.tick()
 
-        for det in detections:
-            bbox = det["bbox_xyxy"]
-            conf = det.get("confidence", 0.0)
-            x1, y1, x2, y2 = map(int, bbox)
+            for track in tracks:
+                bbox = track.bbox
+                conf = track.confidence
+                x1, y1, x2, y2 = map(int, bbox)
+
+                # Dessiner la boîte
+                cv2.rectangle(frame_bgr, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(
+                    frame_bgr, f"QR {conf:.2f}",
+                    (x1, y1 - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2,
+                )
+
+                command = track.text
+                if command:
+                    cv2.putText(
+                        frame_bgr, command[:30],
+                        (x1, y2 + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2,
+                    )
+
+            # Anti-rebond : seules les commandes confirmées et hors temps mort partent
+            for command in debouncer.update([track.text for track in tracks], time.monotonic()):
+                if commands is not None and commands.put(command):
+                    age = time.monotonic() - frame_time
+                    decision_ages.append(age)
+                    print(f"Commande transmise: {command} (image de {1000 * age:.0f} ms)")
 
-            # Dessiner la boîte
-            cv2.rectangle(frame_bgr, (x1, y1), (x2, y2), (0, 255, 0), 2)
             cv2.putText(
-                frame_bgr, f"QR {conf:.2f}",
-                (x1, y1 - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2,
+                frame_bgr, "Mars Rover - QR -> Arduino | [q] quitter",
+                (10, frame_bgr.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1,
             )
+            frame_age_ms = 1000 * (time.monotonic() - frame_time)
+            cv2.putText(
+                frame_bgr,
+                f"Camera {grabber.capture_fps.fps:.1f} FPS | Traitement {processed_fps.fps:.1f} FPS | "
+                f"YOLO {inference_fps.fps:.1f} FPS | age {frame_age_ms:.0f} ms",
+                (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1,
+            )
+            now = time.monotonic()
+            if now - last_stats_time >= STATS_PERIOD_SEC:
+                last_stats_time = now
+                print(f"[Stats] caméra {grabber.capture_fps.fps:.1f} FPS | traitement {processed_fps.fps:.1f} FPS | "
+                      f"inférence {inference_fps.fps:.1f} FPS (1 image sur {scheduler.interval}) | "
+                      f"âge image {frame_age_ms:.0f} ms | images abandonnées {grabber.frames_dropped} | "
+                      f"décodages en cache {100 * tracker.stats()['cache_hit_rate']:.0f} % | "
+                      f"décodage {decoder.last_path or '-'} {decoder.last_ms:.1f} ms | "
+                      f"commandes retenues {debouncer.sent}, supprimées {debouncer.stats()['suppressed']}")
+                if commands is not None:
+                    link = commands.stats()
+                    print(f"[Série] {'connecté' if link['connected'] else 'déconnecté'} | en file {link['depth']} | "
+                          f"déposées {link['queued']}, envoyées {link['sent']}, abandonnées {link['dropped']}, "
+                          f"expirées {link['timed_out']}, erreurs {link['errors']}, reconnexions {link['reconnects']} | "
+                          f"latence moy. {link['latency_mean_ms']:.0f} ms")
+            if args.headless:
+                continue
+            cv2.imshow("Mars Rover - Detection QR", frame_bgr)
 
-            # Décoder le contenu du QR dans la région
-            command = decode_qr_region(frame_bgr, bbox)
-            if command:
-                cv2.putText(
-                    frame_bgr, command[:30],
-                    (x1, y2 + 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2,
-                )
-                now = time.time()
-                if (
-                    (last_sent_command != command or (now - last_sent_time) >= COOLDOWN_SEC)
-                    and send_command_arduino(ser, command)
-                ):
-                    last_sent_command = command
-                    last_sent_time = now
-                    print(f"Commande envoyée: {command}")
-
-        cv2.putText(
-            frame_bgr, "Mars Rover - QR -> Arduino | [q] quitter",
-            (10, frame_bgr.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1,
-        )
-        cv2.imshow("Mars Rover - Detection QR", frame_bgr)
-
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
+            if cv2.waitKey(1) & 0xFF == ord("q"):
+                break
+    except KeyboardInterrupt:
+        pass
 
+    grabber.stop()
+    pipeline.close()
     cap.release()
-    cv2.destroyAllWindows()
-    if ser and ser.is_open:
-        ser.close()
+    if not args.headless:
+        cv2.destroyAllWindows()
+    stats = grabber.stats()
+    print(f"Images capturées: {stats['frames_captured']}, abandonnées: {stats['frames_dropped']}")
+    sched = scheduler.stats()
+    print(f"Détections YOLO complètes: {sched['full_detections']} sur {sched['frames']} images traitées "
+          f"({100 * sched['inference_ratio']:.0f} %), pertes de suivi: {sched['lost_tracks']}")
+    sent = debouncer.stats()
+    print(f"Commandes retenues: {sent['sent']} ({sent['sent_bytes']} octets), supprimées: {sent['suppressed']} "
+          f"(non confirmées {sent['suppressed_unconfirmed']}, déjà envoyées {sent['suppressed_held']}, "
+          f"temps mort {sent['suppressed_cooldown']})")
+    if decision_ages:
+        print(f"Âge moyen de l'image à la décision: {1000 * sum(decision_ages) / len(decision_ages):.0f} ms "
+              f"(max {1000 * max(decision_ages):.0f} ms)")
+    if commands is not None:
+        commands.stop(flush=True, timeout=1.0)
+        link = commands.stats()
+        print(f"Série: {link['sent']} envoyées sur {link['queued']} déposées, {link['dropped']} abandonnées, "
+              f"{link['timed_out']} écritures expirées, {link['reconnects']} reconnexion(s)")
     print("Arrêt.")
 
 
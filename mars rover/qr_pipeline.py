@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Chaîne de traitement QR d'une image : détection, suivi, décodage.
+
+``QRPipeline`` regroupe les étapes utilisées par le mode caméra et par le mode
+batch de ``qr_detection_arduino.py`` :
+
+1. ``DetectionScheduler`` : YOLO une image sur N, suivi local entre deux ;
+2. ``QRTracker`` : pistes par IoU, texte décodé gardé en cache ;
+3. ``QRDecodeStage`` : décodage des seules pistes qui en ont besoin.
+
+``make_detector`` construit la fonction de détection : qrdet (YOLO) ou, sans
+qrdet installé, le détecteur classique d'OpenCV (moins robuste, utile pour les
+tests et les mesures sur une machine sans PyTorch). Le modèle qrdet peut
+tourner sur PyTorch (défaut) ou, exporté en ONNX, sur ONNX Runtime ou
+OpenVINO (``yolo_backend``).
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from qr_decoder import QRDecodeStage, get_qr_decoder
+from qr_scheduler import DetectionScheduler
+from qr_tracker import QRTracker, Track
+
+DETECTORS = ("qrdet", "opencv")
+QRDET_NMS_IOU = 0.3  # valeurs de QRDetector.detect (NMS toutes classes confondues)
+
+
+def make_detector(
+    kind: str = "qrdet",
+    model_size: str = "s",
+    conf: float = 0.5,
+    backend: str = "torch",
+    threads: Optional[int] = None,
+    int8: bool = False,
+) -> Callable[[np.ndarray], List[Dict]]:
+    """Fonction image BGR -> liste de ``{"bbox_xyxy", "confidence"}``.
+
+    `backend`, `threads` et `int8` ne concernent que qrdet (voir ``yolo_backend``).
+    """
+    if kind == "opencv":
+        def detect(frame):
+            ok, points = get_qr_decoder().detectMulti(frame)
+            if not ok or points is None:
+                return []
+            out = []
+            for quad in np.asarray(points).reshape(-1, 4, 2):
+                # Marge de 10 % (zone blanche autour du QR), comme les boîtes YOLO
+                margin = 0.1 * (quad.max(axis=0) - quad.min(axis=0))
+                x1, y1 = quad.min(axis=0) - margin
+                x2, y2 = quad.max(axis=0) + margin
+                out.append({"bbox_xyxy": (float(x1), float(y1), float(x2), float(y2)), "confidence": 1.0})
+            return out
+        return detect
+
+    from qrdet import QRDetector
+
+    detector = QRDetector(model_size=model_size, conf_th=conf, nms_iou=QRDET_NMS_IOU)
+    if backend == "torch":
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        return lambda frame: detector.detect(image=frame, is_bgr=True)
+
+    from yolo_backend import YoloRunner
+
+    # Le .pt téléchargé par qrdet sert de source à l'export ONNX (fait une seule fois)
+    weights = os.path.join(detector.weights_folder, f"qrdet-{model_size}.pt")
+    runner = YoloRunner(weights, backend=backend, threads=threads, int8=int8,
+                        conf=conf, iou=QRDET_NMS_IOU, agnostic=True)
+
+    def detect(frame):
+        boxes, scores, _ = runner(frame)
+        return [{"bbox_xyxy": tuple(map(float, box)), "confidence": float(score)}
+                for box, score in zip(boxes, scores)]
+    return detect
+
+
+class QRPipeline:
+    """Détection planifiée + suivi + décodage pour une suite d'images."""
+
+    def __init__(
+        self,
+        detect: Callable[[np.ndarray], List[Dict]],
+        max_skip: int = 8,
+        decode_path: str = "auto",
+        decode_workers: int = 1,
+    ):
+        self.scheduler = DetectionScheduler(detect, max_interval=max_skip)
+        self.tracker = QRTracker()
+        self.decoder = QRDecodeStage(workers=decode_workers, path=decode_path)
+
+    def process(self, frame_bgr: np.ndarray) -> Tuple[List[Track], Dict[str, float]]:
+        """Pistes visibles dans l'image (texte décodé inclus) et durées des étapes (ms)."""
+        start = time.perf_counter()
+        detections = self.scheduler.step(frame_bgr)
+        detected = time.perf_counter()
+        tracks = self.tracker.update(
+            [det["bbox_xyxy"] for det in detections],
+            [det.get("confidence", 0.0) for det in detections],
+        )
+        to_decode = [track for track in tracks if track.needs_decode]
+        for track, text in zip(to_decode, self.decoder.decode(frame_bgr, [t.bbox for t in to_decode])):
+            self.tracker.set_text(track, text)
+        end = time.perf_counter()
+        timings = {
+            "detect_ms": 1000 * (detected - start),
+            "decode_ms": 1000 * (end - detected),
+            "total_ms": 1000 * (end - start),
+        }
+        return tracks, timings
+
+    @property
+    def last_full(self) -> bool:
+        """True si la dernière image est passée par une détection complète."""
+        return self.scheduler.last_full
+
+    def reset(self) -> None:
+        """Nouvelle séquence : plus de suivi ni de texte repris des images précédentes."""
+        self.scheduler.reset()
+        self.tracker.reset()
+
+    def close(self) -> None:
+        self.decoder.close()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Planification de l'inférence YOLO (détection complète une image sur N).
+
+YOLO sur l'image entière est l'étape la plus chère sur le PC portable sans GPU
+qui pilote le rover. ``DetectionScheduler`` ne la lance qu'une image sur N ;
+entre deux, les boîtes connues sont suivies par corrélation de modèle
+(``cv2.matchTemplate``) dans une zone élargie autour de leur dernière position,
+sur une image réduite en niveaux de gris (quelques centaines de µs par QR).
+
+N s'adapte :
+
+- QR présent et suivi stable -> N double jusqu'à ``max_interval``, seulement
+  après une détection complète atteinte par le suivi (pas après une détection
+  forcée par une perte de suivi ou un changement de scène) ;
+- QR qui bouge vite (déplacement par image grand devant sa taille) -> N diminue ;
+- suivi perdu (corrélation trop faible, QR sorti de l'image) -> N repasse à 1
+  et détection complète tout de suite ;
+- aucun QR -> détection toutes les ``idle_interval`` images, ou tout de suite
+  si l'image a nettement changé depuis la dernière détection.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from qr_tracker import iou_matrix
+
+Detection = Dict  # {"bbox_xyxy": (x1, y1, x2, y2), "confidence": float, ...}
+
+
+class DetectionScheduler:
+    """Alterne détection complète et suivi local des dernières boîtes."""
+
+    def __init__(
+        self,
+        detect: Callable[[np.ndarray], List[Detection]],
+        max_interval: int = 8,
+        idle_interval: int = 3,
+        scale: float = 0.5,
+        pad: float = 0.5,
+        match_threshold: float = 0.6,
+        fast_motion: float = 0.15,
+        scene_change: float = 12.0,
+    ):
+        self.detect = detect
+        self.max_interval = max(1, max_interval)
+        self.idle_interval = max(1, min(idle_interval, self.max_interval))
+        self.scale = scale
+        self.pad = pad  # marge de recherche, en fraction de la taille de la boîte
+        self.match_threshold = match_threshold
+        self.fast_motion = fast_motion  # déplacement / taille de boîte au-delà duquel N diminue
+        self.scene_change = scene_change  # écart moyen de niveaux de gris (0-255) sans QR
+        self.interval = 1
+        self._since_full = 0
+        self._tracked_since_full = 0
+        self._force_full = True
+        self._detections: List[Detection] = []
+        self._templates: List[np.ndarray] = []
+        self._boxes_small: List[np.ndarray] = []
+        self._reference: Optional[np.ndarray] = None
+        self.frames = 0
+        self.full_detections = 0
+        self.tracked_frames = 0
+        self.lost_tracks = 0
+        self.last_full = False
+
+    # -- API ---------------------------------------------------------------
+    def step(self, frame_bgr: np.ndarray) -> List[Detection]:
+        """Détections pour cette image (complètes ou suivies)."""
+        self.frames += 1
+        small = self._prepare(frame_bgr)
+        self._since_full += 1
+        if self._force_full or self._scene_changed(small):
+            return self._full(frame_bgr, small, scheduled=False)
+        if self._since_full >= self.interval:
+            return self._full(frame_bgr, small, scheduled=True)
+        tracked = self._track(small)
+        if tracked is None:
+            self.interval = 1  # suivi perdu : on repart d'une détection par image
+            return self._full(frame_bgr, small, scheduled=False)
+        self.tracked_frames += 1
+        self._tracked_since_full += bool(tracked)
+        self.last_full = False
+        return tracked
+
+    def reset(self) -> None:
+        """Oublie les boîtes suivies : la prochaine image passe par une détection complète."""
+        self.interval = 1
+        self._since_full = 0
+        self._tracked_since_full = 0
+        self._force_full = True
+        self._detections, self._templates, self._boxes_small = [], [], []
+        self._reference = None
+        self.last_full = False
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "full_detections": self.full_detections,
+            "tracked_frames": self.tracked_frames,
+            "lost_tracks": self.lost_tracks,
+            "interval": self.interval,
+            "inference_ratio": self.full_detections / self.frames if self.frames else 0.0,
+        }
+
+    # -- étapes ------------------------------------------------------------
+    def _prepare(self, frame_bgr: np.ndarray) -> np.ndarray:
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _scene_changed(self, small: np.ndarray) -> bool:
+        if self._detections or self._reference is None:
+            return False
+        return float(cv2.absdiff(small, self._reference).mean()) > self.scene_change
+
+    def _full(self, frame_bgr: np.ndarray, small: np.ndarray, scheduled: bool) -> List[Detection]:
+        """Détection complète ; `scheduled` : atteinte par l'intervalle, le suivi ayant tenu jusque-là."""
+        detections = list(self.detect(frame_bgr))
+        # N = 1 (aucune image suivie entre deux détections) : on n'essaie N = 2 que si les boîtes n'ont pas sauté
+        tracking_held = scheduled and (
+            self._tracked_since_full > 0 or (self.interval == 1 and self._stable(self._detections, detections))
+        )
+        self.full_detections += 1
+        self.last_full = True
+        self._since_full = 0
+        self._tracked_since_full = 0
+        self._force_full = False
+        self._reference = small
+        self._detections = detections
+        self._templates, self._boxes_small = [], []
+        h, w = small.shape[:2]
+        for det in detections:
+            box = np.asarray(det["bbox_xyxy"], dtype=np.float64) * self.scale
+            x1, y1 = max(0, int(box[0])), max(0, int(box[1]))
+            x2, y2 = min(w, int(np.ceil(box[2]))), min(h, int(np.ceil(box[3])))
+            self._templates.append(small[y1:y2, x1:x2].copy())
+            self._boxes_small.append(np.array([x1, y1, x2, y2], dtype=np.float64))
+        if not detections:
+            self.interval = self.idle_interval
+        elif tracking_held and self.interval < self.max_interval:
+            # Le suivi a tenu jusqu'ici : on espace les détections complètes
+            self.interval = min(self.max_interval, max(2, self.interval * 2))
+        return detections
+
+    @staticmethod
+    def _stable(previous: List[Detection], current: List[Detection], min_iou: float = 0.5) -> bool:
+        """Chaque boîte actuelle recouvre une boîte de la détection précédente."""
+        if not previous or not current:
+            return False
+        scores = iou_matrix([d["bbox_xyxy"] for d in current], [d["bbox_xyxy"] for d in previous])
+        return bool((scores.max(axis=1) >= min_iou).all())
+
+    def _track(self, small: np.ndarray) -> Optional[List[Detection]]:
+        """Suivi local de chaque boîte ; None si une boîte est perdue."""
+        if not self._detections:
+            return []
+        h, w = small.shape[:2]
+        out = []
+        max_motion = 0.0
+        for i, (det, template, box) in enumerate(zip(self._detections, self._templates, self._boxes_small)):
+            th, tw = template.shape[:2]
+            if th < 4 or tw < 4:
+                self.lost_tracks += 1
+                self._force_full = True
+                return None
+            pad_x, pad_y = int(tw * self.pad) + 2, int(th * self.pad) + 2
+            rx1, ry1 = max(0, int(box[0]) - pad_x), max(0, int(box[1]) - pad_y)
+            rx2, ry2 = min(w, int(box[0]) + tw + pad_x), min(h, int(box[1]) + th + pad_y)
+            region = small[ry1:ry2, rx1:rx2]
+            if region.shape[0] < th or region.shape[1] < tw:
+                self.lost_tracks += 1
+                self._force_full = True
+                return None
+            scores = cv2.matchTemplate(region, template, cv2.TM_CCOEFF_NORMED)
+            _, best, _, (mx, my) = cv2.minMaxLoc(scores)
+            if best < self.match_threshold:
+                self.lost_tracks += 1
+                self._force_full = True
+                return None
+            new_x, new_y = rx1 + mx, ry1 + my
+            motion = max(abs(new_x - box[0]) / tw, abs(new_y - box[1]) / th)
+            max_motion = max(max_motion, motion)
+            self._boxes_small[i] = np.array([new_x, new_y, new_x + tw, new_y + th], dtype=np.float64)
+            tracked = dict(det)
+            tracked["bbox_xyxy"] = tuple(self._boxes_small[i] / self.scale)
+            tracked["tracked"] = True
+            tracked["match"] = float(best)
+            out.append(tracked)
+        self._detections = out
+        if max_motion > self.fast_motion:
+            # QR en mouvement rapide : détections complètes plus fréquentes
+            self.interval = max(1, self.interval // 2)
+        return out
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Suivi des QR détectés d'une image à l'autre (IoU) + cache de décodage.
+
+Un QR qui reste dans le champ garde la même piste : les boîtes de l'image
+courante sont associées aux pistes existantes par recouvrement (IoU). Le texte
+décodé est mémorisé dans la piste ; le décodage OpenCV, plus coûteux que la
+détection YOLO sur le rover, n'est relancé que si la piste est nouvelle, n'a
+pas encore été décodée, ou si sa boîte a beaucoup changé depuis le dernier
+décodage (QR qui s'approche, qui tourne...).
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """IoU de chaque boîte de `a` (N, 4) avec chaque boîte de `b` (M, 4), format xyxy."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 4)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.where(union > 0, union, 1), 0.0)
+
+
+@dataclass
+class Track:
+    """Un QR suivi : boîte courante, texte décodé et boîte au moment du décodage."""
+
+    track_id: int
+    bbox: np.ndarray
+    confidence: float = 0.0
+    text: Optional[str] = None
+    decoded_bbox: Optional[np.ndarray] = None
+    hits: int = 1
+    missed: int = 0
+    decode_attempts: int = 0
+    needs_decode: bool = field(default=True, repr=False)
+
+
+class QRTracker:
+    """Associe les détections aux pistes par IoU et décide quand re-décoder."""
+
+    def __init__(self, match_iou: float = 0.3, redecode_iou: float = 0.6, max_missed: int = 5):
+        self.match_iou = match_iou
+        self.redecode_iou = redecode_iou
+        self.max_missed = max_missed
+        self.tracks: List[Track] = []
+        self._ids = itertools.count(1)
+        self.decodes_requested = 0
+        self.decodes_cached = 0
+
+    def reset(self) -> None:
+        """Supprime toutes les pistes (et donc les textes décodés en cache)."""
+        self.tracks = []
+
+    def update(self, boxes: Sequence, confidences: Optional[Sequence[float]] = None) -> List[Track]:
+        """Met à jour les pistes avec les boîtes de l'image ; retourne les pistes vues.
+
+        L'ordre du résultat suit celui de `boxes`. ``track.needs_decode`` indique
+        s'il faut décoder la région (puis appeler ``set_text``).
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        if confidences is None:
+            confidences = [0.0] * len(boxes)
+        assigned: List[Optional[Track]] = [None] * len(boxes)
+        free = list(self.tracks)
+
+        if free and len(boxes):
+            scores = iou_matrix(boxes, np.array([t.bbox for t in free]))
+            # Association gloutonne, meilleurs recouvrements d'abord
+            for flat in np.argsort(scores, axis=None)[::-1]:
+                i, j = divmod(int(flat), scores.shape[1])
+                if scores[i, j] < self.match_iou:
+                    break
+                if assigned[i] is not None or free[j] is None:
+                    continue
+                assigned[i] = free[j]
+                free[j] = None
+
+        for i, box in enumerate(boxes):
+            track = assigned[i]
+            if track is None:
+                track = Track(next(self._ids), box)
+                self.tracks.append(track)
+            else:
+                track.bbox = box
+                track.hits += 1
+                track.missed = 0
+            track.confidence = float(confidences[i])
+            track.needs_decode = track.text is None or bool(
+                iou_matrix(box, track.decoded_bbox)[0, 0] < self.redecode_iou
+            )
+            if track.needs_decode:
+                self.decodes_requested += 1
+            else:
+                self.decodes_cached += 1
+            assigned[i] = track
+
+        for track in free:
+            if track is not None:
+                track.missed += 1
+        self.tracks = [t for t in self.tracks if t.missed <= self.max_missed]
+        return assigned  # type: ignore[return-value]
+
+    @staticmethod
+    def set_text(track: Track, text: Optional[str]) -> None:
+        """Enregistre le résultat d'un décodage ; un échec garde l'ancien texte."""
+        track.decode_attempts += 1
+        if text:
+            track.text = text
+            track.decoded_bbox = track.bbox.copy()
+
+    def stats(self) -> dict:
+        total = self.decodes_requested + self.decodes_cached
+        return {
+            "tracks": len(self.tracks),
+            "decodes": self.decodes_requested,
+            "cached": self.decodes_cached,
+            "cache_hit_rate": self.decodes_cached / total if total else 0.0,
+        }
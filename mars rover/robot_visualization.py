@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Schéma du robot (châssis + 4 roues) pour l'interface Streamlit.
+
+Le seul élément qui change d'une image à l'autre est l'état de chaque roue :
+arrêtée (grise), active en marche avant ou active en marche arrière (rouge,
+flèche vers le haut ou vers le bas). Il n'y a donc que 3^4 = 81 images
+possibles : la figure matplotlib est construite une seule fois, ses artistes
+sont mis à jour (couleur et flèche des roues) et chaque combinaison est
+convertie une fois en PNG puis servie depuis un cache LRU.
+"""
+
+from __future__ import annotations
+
+import io
+import itertools
+import threading
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.patches as patches
+from matplotlib.figure import Figure
+
+WHEEL_STOPPED, WHEEL_FORWARD, WHEEL_BACKWARD = 0, 1, -1
+WHEEL_STATES = (WHEEL_STOPPED, WHEEL_FORWARD, WHEEL_BACKWARD)
+
+ROBOT_LENGTH, ROBOT_WIDTH = 0.4, 0.3
+WHEEL_LENGTH, WHEEL_WIDTH = 0.1, 0.05
+FIGSIZE = (6, 6)
+DPI = 100
+
+
+def wheel_states(active_wheels: Sequence[bool], wheel_thetas: Sequence[float]) -> Tuple[int, ...]:
+    """Convertit (roues actives, vitesses des roues) en états 0 / +1 / -1."""
+    return tuple(
+        (WHEEL_FORWARD if theta >= 0 else WHEEL_BACKWARD) if active else WHEEL_STOPPED
+        for active, theta in zip(active_wheels, wheel_thetas)
+    )
+
+
+class _RobotFigure:
+    """Figure construite une fois ; seules les roues et flèches sont modifiées."""
+
+    def __init__(self):
+        # Figure sans pyplot : rien n'est enregistré globalement, pas de fuite.
+        self.fig = Figure(figsize=FIGSIZE, dpi=DPI)
+        ax = self.fig.add_subplot(1, 1, 1)
+        self.fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
+
+        # Corps du robot
+        bottom_left_x, bottom_left_y = -ROBOT_WIDTH / 2, -ROBOT_LENGTH / 2
+        ax.add_patch(patches.Rectangle(
+            (bottom_left_x, bottom_left_y), ROBOT_WIDTH, ROBOT_LENGTH,
+            edgecolor='black', facecolor='lightgrey'
+        ))
+
+        # Positions des roues
+        wheel_positions = [
+            (bottom_left_x - WHEEL_WIDTH, bottom_left_y),
+            (bottom_left_x + ROBOT_WIDTH, bottom_left_y),
+            (bottom_left_x - WHEEL_WIDTH, bottom_left_y + ROBOT_LENGTH - WHEEL_LENGTH),
+            (bottom_left_x + ROBOT_WIDTH, bottom_left_y + ROBOT_LENGTH - WHEEL_LENGTH),
+        ]
+
+        self.wheels = []
+        self.arrows = []  # (flèche avant, flèche arrière) par roue
+        for wx, wy in wheel_positions:
+            wheel = patches.Rectangle((wx, wy), WHEEL_WIDTH, WHEEL_LENGTH,
+                                      edgecolor='black', facecolor='grey')
+            ax.add_patch(wheel)
+            self.wheels.append(wheel)
+
+            arrow_x = wx + WHEEL_WIDTH / 2
+            arrow_y = wy + WHEEL_LENGTH / 2
+            pair = tuple(
+                ax.arrow(arrow_x, arrow_y, 0, dy, head_width=0.02, head_length=0.02,
+                         fc='blue', ec='blue', visible=False)
+                for dy in (0.1, -0.1)
+            )
+            self.arrows.append(pair)
+
+        # Configuration des axes
+        margin = 0.02
+        ax.set_xlim(bottom_left_x - WHEEL_WIDTH - margin,
+                    bottom_left_x + ROBOT_WIDTH + WHEEL_WIDTH + margin)
+        ax.set_ylim(bottom_left_y - margin - 0.1,
+                    bottom_left_y + ROBOT_LENGTH + WHEEL_LENGTH + margin)
+        ax.set_aspect('equal')
+        ax.axis('off')
+
+    def render(self, states: Tuple[int, ...]) -> bytes:
+        for wheel, (forward, backward), state in zip(self.wheels, self.arrows, states):
+            wheel.set_facecolor('grey' if state == WHEEL_STOPPED else 'red')
+            forward.set_visible(state == WHEEL_FORWARD)
+            backward.set_visible(state == WHEEL_BACKWARD)
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format="png")
+        return buffer.getvalue()
+
+
+_figure = None
+_figure_lock = threading.Lock()  # une session Streamlit = un thread
+
+
+@lru_cache(maxsize=len(WHEEL_STATES) ** 4)
+def render_robot_png(states: Tuple[int, ...]) -> bytes:
+    """PNG du robot pour un tuple de 4 états de roue (mis en cache)."""
+    global _figure
+    with _figure_lock:
+        if _figure is None:
+            _figure = _RobotFigure()
+        return _figure.render(states)
+
+
+def prerender_all() -> None:
+    """Remplit le cache avec les 81 combinaisons (à appeler au démarrage)."""
+    for states in itertools.product(WHEEL_STATES, repeat=4):
+        render_robot_png(states)
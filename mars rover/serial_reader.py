@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Lecture série en tâche de fond.
+
+Un thread dédié vide en continu le port série de l'ESP32 dans un tampon
+circulaire borné (``collections.deque`` avec ``maxlen``, dont ``append`` et
+``popleft`` sont atomiques : aucun verrou n'est nécessaire entre le thread
+lecteur et la boucle Streamlit). Chaque ligne est aussi passée à une fonction
+de parsing optionnelle et le dernier état connu des capteurs est tenu à jour
+dans ``snapshot`` (et ajouté à un ``TelemetryStore`` si fourni).
+
+Avec un ``decoder`` (ex. ``binary_protocol.FrameDecoder``), les octets reçus
+sont passés tels quels au décodeur de trames binaires au lieu d'être découpés
+en lignes texte ; chaque trame décodée met à jour ``snapshot`` de la même façon.
+
+La boucle Streamlit ne fait donc plus jamais d'E/S série : elle récupère les
+lignes reçues depuis le dernier rerun avec ``drain()`` et lit ``snapshot``.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+# Une rafale ESP32 fait ~15 lignes : 4096 lignes couvrent plusieurs minutes
+# sans consommateur avant de perdre la moindre donnée.
+DEFAULT_MAXLEN = 4096
+READ_CHUNK = 4096
+
+
+class SerialReader:
+    """Thread lecteur qui vide ``ser`` dans un tampon circulaire de lignes."""
+
+    def __init__(
+        self,
+        ser,
+        parse: Optional[Callable[[str], Dict]] = None,
+        store=None,
+        decoder=None,
+        maxlen: int = DEFAULT_MAXLEN,
+        encoding: str = "utf-8",
+    ):
+        self.ser = ser
+        self.parse = parse
+        self.store = store
+        self.decoder = decoder
+        self.encoding = encoding
+        self.lines: deque = deque(maxlen=maxlen)
+        self.snapshot: Dict = {}
+        self.lines_read = 0
+        self.lines_dropped = 0
+        self.error: Optional[Exception] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "SerialReader":
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="esp32-serial-reader", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def drain(self) -> List[str]:
+        """Retire et retourne toutes les lignes reçues depuis le dernier appel."""
+        lines = []
+        while True:
+            try:
+                lines.append(self.lines.popleft())
+            except IndexError:
+                return lines
+
+    def latest(self) -> Dict:
+        """Copie du dernier état parsé (sûre à lire depuis un autre thread)."""
+        return dict(self.snapshot)
+
+    def _push(self, raw: bytes) -> None:
+        line = raw.decode(self.encoding, errors="ignore").strip()
+        if not line:
+            return
+        if len(self.lines) == self.lines.maxlen:
+            self.lines_dropped += 1
+        self.lines.append(line)
+        self.lines_read += 1
+        if self.parse is not None:
+            try:
+                updates = self.parse(line)
+            except Exception:
+                updates = None
+            self._apply(updates)
+
+    def _apply(self, updates: Optional[Dict]) -> None:
+        if updates:
+            self.snapshot.update(updates)
+            if self.store is not None:
+                self.store.append(updates)
+
+    def _run(self) -> None:
+        buffer = bytearray()
+        while not self._stop.is_set():
+            try:
+                # Bloque au plus `ser.timeout` quand rien n'arrive, puis lit
+                # d'un coup tout ce qui attend dans le tampon de l'OS.
+                chunk = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                self.error = e
+                break
+            if not chunk:
+                continue
+            if self.decoder is not None:
+                for updates in self.decoder.feed(chunk):
+                    self.lines_read += 1
+                    self._apply(updates)
+                continue
+            buffer += chunk
+            start = 0
+            while True:
+                end = buffer.find(b"\n", start)
+                if end < 0:
+                    break
+                self._push(bytes(buffer[start:end]))
+                start = end + 1
+            if start:
+                del buffer[:start]
+            if len(buffer) > READ_CHUNK * 4:
+                # Pas de fin de ligne depuis longtemps : flux corrompu.
+                buffer.clear()
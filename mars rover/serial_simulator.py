@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover / Robodog — Simulateur de liaison série (ESP32 ou Arduino factice).
+
+Ouvre un pseudo-terminal (pty, Linux/macOS) qui se comporte comme la carte :
+
+- profil ``rover`` : rejoue de la télémétrie (capture enregistrée ou cycles
+  synthétiques au format exact du firmware) et acquitte chaque commande comme
+  ``Arduino_G8_P4_S4.ino`` (« Commande cinématique reçue », « Robot arrêté »,
+  « Déplacement position démarré. Durée: N ms »...) ;
+- profil ``robodog`` : lit les commandes caractère par caractère comme
+  ``RobotDog.ino`` et répond exactement comme lui : « Commande: x » dès la
+  lecture du caractère (avant les arguments de ``s`` et ``i``), puis
+  « Hauteur augmentée à: N »... pour ``h`` et ``l`` ; ``s`` n'a pas d'autre
+  accusé.
+
+Le côté esclave du pty (``/dev/pts/N``) s'ouvre avec pyserial comme un vrai
+port : il suffit de le donner à l'interface.
+
+    python serial_simulator.py                      # rover, cadence de la liaison 57600 bauds
+    python serial_simulator.py --rate 0             # télémétrie aussi vite que possible
+    python serial_simulator.py --capture capture_esp32.log --rate 5000
+    python serial_simulator.py --profile robodog
+
+    ESP32_PORT=/dev/pts/5 streamlit run PY_G8_P4_S4.py
+    Serial.OPEN_SERIAL("/dev/pts/6", 9600)          # Robodog (INTERFACE 2025 EAC)
+
+Mesure de bout en bout, sans interface (lecteur + file de commandes réels) :
+
+    python serial_simulator.py --bench --rate 0 --duration 10
+    python serial_simulator.py --profile robodog --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import select
+import threading
+import time
+import tty
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+EOL = b"\r\n"  # println() du firmware
+
+# --- Profil rover (Arduino_G8_P4_S4.ino) ------------------------------------
+ROVER_BAUD = 57600
+ROVER_ACKS = {
+    "c": "Commande cinématique reçue",
+    "v": "Commande vitesse reçue",
+    "s": "Robot arrêté",
+    "f": "Commande cinématique reçue position",
+}
+# Commandes de déplacement prédéfinies : même accusé que "c".
+for _mode in "radgjnhmy":
+    ROVER_ACKS[_mode] = "Commande cinématique reçue"
+ROVER_BASE_SPEED = 15.0  # baseSpeed du firmware
+
+# --- Profil Robodog (RobotDog.ino) -------------------------------------------
+ROBODOG_BAUD = 9600
+HAUTEUR_MIN, HAUTEUR_MAX = -40, 30
+_SERVO_ARGS = re.compile(rb"\D*?(-?\d+)\D*?(-?\d+(?:\.\d*)?)")
+_INT_ARG = re.compile(rb"\D*?(-?\d+)")
+
+
+def position_duration_ms(x: float, y: float, theta: float) -> float:
+    """Durée annoncée par le firmware pour ``p x y theta``."""
+    vx = (ROVER_BASE_SPEED if x > 0 else -ROVER_BASE_SPEED) if x else 0.0
+    vy = (ROVER_BASE_SPEED if y > 0 else -ROVER_BASE_SPEED) if y else 0.0
+    wz = (ROVER_BASE_SPEED if theta > 0 else -ROVER_BASE_SPEED) if theta else 0.0
+    distance = (x * x + y * y + theta * theta) ** 0.5
+    speed = (vx * vx + vy * vy + wz * wz) ** 0.5
+    if speed <= 0:
+        return 0.0
+    duration = distance / speed * 1000
+    return duration * 60 if x == 0 and y == 0 else duration
+
+
+def rover_responses(line: str) -> List[str]:
+    """Réponses du firmware rover à une ligne de commande."""
+    mode = line[:1]
+    if mode == "p":
+        parts = (line.split() + ["0", "0", "0"])[1:4]
+        try:
+            x, y, theta = (float(part) for part in parts)
+        except ValueError:
+            x = y = theta = 0.0
+        return [f"Déplacement position démarré. Durée: {position_duration_ms(x, y, theta):.2f} ms"]
+    ack = ROVER_ACKS.get(mode)
+    return [ack] if ack else []
+
+
+class _RobodogState:
+    """Interprète le flux caractère par caractère comme ``loop()`` de RobotDog.ino."""
+
+    def __init__(self):
+        self.hauteur = 0
+        self.pending = bytearray()
+        self.awaiting: Optional[str] = None  # "s" ou "i" déjà lu, arguments pas encore complets
+
+    def feed(self, data: bytes) -> List[str]:
+        buf = self.pending
+        buf += data
+        out = []
+        pos = 0
+        while pos < len(buf) or self.awaiting:
+            if self.awaiting:
+                # parseInt/parseFloat : la commande est déjà acquittée, on attend ses chiffres
+                match = (_SERVO_ARGS if self.awaiting == "s" else _INT_ARG).match(buf, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                self.awaiting = None
+                continue
+            ch = chr(buf[pos])
+            pos += 1
+            out.append(f"Commande: {ch}")
+            if ch in "si":
+                self.awaiting = ch
+            elif ch == "h":
+                if self.hauteur < HAUTEUR_MAX:
+                    self.hauteur += 1
+                    out.append(f"Hauteur augmentée à: {self.hauteur}")
+                else:
+                    out.append("Hauteur maximale atteinte")
+            elif ch == "l":
+                if self.hauteur > HAUTEUR_MIN:
+                    self.hauteur -= 1
+                    out.append(f"Hauteur diminuée à: {self.hauteur}")
+                else:
+                    out.append("Hauteur minimale atteinte")
+        del buf[:pos]
+        return out
+
+
+class SerialSimulator:
+    """Carte factice derrière un pty : télémétrie rejouée + accusés de commande.
+
+    ``rate`` : lignes de télémétrie par seconde (0 = sans limite) ; par défaut
+    la cadence est celle de la liaison (``baud`` / 10 octets par seconde), ce
+    qui permet aussi de tester au-delà du débit réel en donnant un ``rate``.
+    Une ligne qui ne tient pas dans le tampon du pty (interface qui ne lit
+    pas assez vite) est perdue, comme sur un UART, et comptée dans ``tx_dropped``.
+    """
+
+    def __init__(
+        self,
+        profile: str = "rover",
+        lines: Optional[Iterable[str]] = None,
+        rate: Optional[float] = None,
+        baud: Optional[int] = None,
+        loop: bool = True,
+        on_command: Optional[Callable[[str, float], None]] = None,
+    ):
+        if profile not in ("rover", "robodog"):
+            raise ValueError(f"Profil inconnu: {profile}")
+        self.profile = profile
+        self.lines = [line.encode("utf-8") + EOL for line in (lines or [])]
+        self.rate = rate
+        self.baud = baud or (ROVER_BAUD if profile == "rover" else ROBODOG_BAUD)
+        self.loop = loop
+        self.on_command = on_command
+        self.lines_sent = 0
+        self.tx_dropped = 0
+        self.commands_received = 0
+        self.acks_sent = 0
+        self.commands: deque = deque(maxlen=10000)  # (instant de réception, commande)
+        self._robodog = _RobodogState()
+        self._write_lock = threading.Lock()
+        self._pending = bytearray()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.master, self._slave = os.openpty()
+        tty.setraw(self._slave)  # pas d'écho ni de conversion \n -> \r\n
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self._slave)
+
+    # -- cycle de vie ------------------------------------------------------
+    def start(self) -> "SerialSimulator":
+        self._stop.clear()
+        targets = [self._command_loop]
+        if self.lines:
+            targets.append(self._telemetry_loop)
+        for target in targets:
+            thread = threading.Thread(target=target, name=f"sim-{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(2.0)
+        self._threads = []
+
+    def close(self) -> None:
+        self.stop()
+        for fd in (self.master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "lines_sent": self.lines_sent,
+            "tx_dropped": self.tx_dropped,
+            "commands_received": self.commands_received,
+            "acks_sent": self.acks_sent,
+        }
+
+    # -- écriture ----------------------------------------------------------
+    def _flush_pending(self) -> None:
+        if self._pending:
+            try:
+                written = os.write(self.master, self._pending)
+            except (BlockingIOError, OSError):
+                return
+            del self._pending[:written]
+
+    def _write(self, data: bytes) -> bool:
+        """Écrit `data` ; False (ligne perdue) si le tampon de sortie est déjà plein."""
+        with self._write_lock:
+            self._flush_pending()
+            if self._pending:
+                return False
+            self._pending += data
+            self._flush_pending()
+            return True
+
+    def send_line(self, text: str) -> bool:
+        return self._write(text.encode("utf-8") + EOL)
+
+    # -- threads -----------------------------------------------------------
+    def _telemetry_loop(self) -> None:
+        byte_time = 10.0 / self.baud  # 8N1 : 10 bits par octet
+        next_time = time.perf_counter()
+        index = 0
+        while not self._stop.is_set():
+            if index == len(self.lines):
+                if not self.loop:
+                    return
+                index = 0
+            line = self.lines[index]
+            index += 1
+            if self._write(line):
+                self.lines_sent += 1
+            else:
+                self.tx_dropped += 1
+            if self.rate is None:
+                next_time += len(line) * byte_time
+            elif self.rate > 0:
+                next_time += 1.0 / self.rate
+            else:
+                continue
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -1.0:
+                next_time = time.perf_counter()  # retard trop grand : on ne rattrape pas
+
+    def _command_loop(self) -> None:
+        buffer = bytearray()
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self.master], [], [], 0.05)
+            with self._write_lock:
+                self._flush_pending()
+            if not ready:
+                continue
+            try:
+                chunk = os.read(self.master, 4096)
+            except (BlockingIOError, OSError):
+                continue
+            now = time.monotonic()
+            if self.profile == "robodog":
+                responses = self._robodog.feed(chunk)
+                self.commands_received += sum(1 for r in responses if r.startswith("Commande: "))
+                self.commands.append((now, chunk.decode("utf-8", errors="ignore")))
+                if self.on_command is not None:
+                    self.on_command(chunk.decode("utf-8", errors="ignore"), now)
+                self._reply(responses)
+                continue
+            buffer += chunk
+            while True:
+                end = buffer.find(b"\n")
+                if end < 0:
+                    break
+                command = buffer[:end].decode("utf-8", errors="ignore").strip()
+                del buffer[:end + 1]
+                if not command:
+                    continue
+                self.commands_received += 1
+                self.commands.append((now, command))
+                if self.on_command is not None:
+                    self.on_command(command, now)
+                self._reply(rover_responses(command))
+
+    def _reply(self, responses: List[str]) -> None:
+        for response in responses:
+            if self.send_line(response):
+                self.acks_sent += 1
+
+
+# ============================================================================
+# MESURES
+# ============================================================================
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def bench_rover(sim: SerialSimulator, duration: float, commands_per_sec: float) -> None:
+    """Lecteur série + file de commandes de l'interface, branchés sur le simulateur."""
+    import serial
+
+    from command_queue import CommandQueue
+    from serial_reader import SerialReader
+    from telemetry_parser import parse_line
+    from telemetry_store import TelemetryStore
+
+    put_times = {}
+    latencies = []
+    sim.on_command = lambda command, t: (
+        latencies.append(t - put_times.pop(command)) if command in put_times else None
+    )
+
+    ser = serial.Serial(sim.port, sim.baud, timeout=0.1)
+    store = TelemetryStore()
+    reader = SerialReader(ser, parse=parse_line, store=store).start()
+    queue = CommandQueue(ser).start()
+
+    start = time.monotonic()
+    parse_time = 0.0
+    parsed = 0
+    drained = 0
+    i = 0
+    while time.monotonic() - start < duration:
+        # Commandes de position toutes différentes : aucune n'est fusionnée.
+        command = f"p {i} 0 0"
+        put_times[command] = time.monotonic()
+        queue.put(command)
+        i += 1
+        time.sleep(1.0 / commands_per_sec)
+        lines = reader.drain()
+        drained += len(lines)
+        t0 = time.perf_counter()
+        for line in lines:
+            parse_line(line)
+        parse_time += time.perf_counter() - t0
+        parsed += len(lines)
+    elapsed = time.monotonic() - start
+    queue.stop(flush=True)
+    time.sleep(0.2)
+    reader.stop()
+    drained += len(reader.drain())
+    ser.close()
+
+    stats = sim.stats()
+    received = reader.lines_read
+    expected = stats["lines_sent"] + stats["acks_sent"]
+    print(f"Durée               : {elapsed:.1f} s")
+    print(f"Lignes émises       : {stats['lines_sent']} télémétrie + {stats['acks_sent']} accusés "
+          f"({expected / elapsed:,.0f} lignes/s)")
+    print(f"Lignes reçues       : {received} ({received / elapsed:,.0f} lignes/s)")
+    print(f"Lignes perdues      : {stats['tx_dropped']} côté carte (tampon plein), "
+          f"{expected - received} en transit, {reader.lines_dropped} côté tampon circulaire")
+    if parse_time > 0:
+        print(f"Parsing             : {parsed / parse_time:,.0f} lignes/s ({parsed} lignes)")
+    print(f"Commandes           : {i} déposées, {stats['commands_received']} reçues, "
+          f"{queue.coalesced} fusionnées, {queue.errors} erreurs")
+    if latencies:
+        print(f"Latence commande    : moyenne {1000 * sum(latencies) / len(latencies):.2f} ms | "
+              f"p50 {1000 * _percentile(latencies, 0.5):.2f} ms | "
+              f"p99 {1000 * _percentile(latencies, 0.99):.2f} ms | max {1000 * max(latencies):.2f} ms")
+
+
+def bench_robodog(sim: SerialSimulator, count: int) -> None:
+    """Aller-retour commande -> accusé, comme ``Serial.SEND(msg, Confirmation=...)``."""
+    import serial
+
+    ser = serial.Serial(sim.port, sim.baud, timeout=1, write_timeout=1.0)
+    round_trips = []
+    failures = 0
+    for i in range(count):
+        servo, angle = i % 8, (i * 7) % 181
+        expected = "Commande: s"  # seul accusé du firmware pour "s" (envoyé dès la lecture du caractère)
+        start = time.perf_counter()
+        ser.write(f"s{servo} {angle}".encode())
+        while True:
+            line = ser.readline().decode(errors="ignore").strip()
+            if not line:
+                failures += 1
+                break
+            if line == expected:
+                round_trips.append(time.perf_counter() - start)
+                break
+    ser.close()
+    print(f"Commandes           : {count} envoyées, {len(round_trips)} acquittées, {failures} sans réponse")
+    if round_trips:
+        print(f"Aller-retour        : moyenne {1000 * sum(round_trips) / len(round_trips):.2f} ms | "
+              f"p50 {1000 * _percentile(round_trips, 0.5):.2f} ms | "
+              f"p99 {1000 * _percentile(round_trips, 0.99):.2f} ms")
+
+
+def load_lines(capture: Optional[str], cycles: int) -> List[str]:
+    if capture:
+        with open(capture, encoding="utf-8", errors="ignore") as f:
+            return [line.strip() for line in f if line.strip()]
+    from bench_telemetry_parser import synthetic_capture
+    return synthetic_capture(cycles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur de carte ESP32 / Arduino sur pty.")
+    parser.add_argument("--profile", choices=("rover", "robodog"), default="rover")
+    parser.add_argument("--capture", help="Capture série à rejouer (une ligne par ligne reçue)")
+    parser.add_argument("--cycles", type=int, default=200,
+                        help="Cycles de télémétrie synthétiques si pas de capture (défaut: 200)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Lignes de télémétrie par seconde (0 = sans limite ; défaut: débit de la liaison)")
+    parser.add_argument("--baud", type=int, default=None, help="Débit simulé (défaut: 57600 rover, 9600 Robodog)")
+    parser.add_argument("--no-telemetry", action="store_true", help="Accusés de commande uniquement")
+    parser.add_argument("--bench", action="store_true", help="Mesure de bout en bout puis sortie")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de la mesure rover (s)")
+    parser.add_argument("--commands-per-sec", type=float, default=50.0, help="Cadence des commandes (mesure rover)")
+    parser.add_argument("--count", type=int, default=500, help="Nombre de commandes (mesure Robodog)")
+    args = parser.parse_args()
+
+    lines = []
+    if args.profile == "rover" and not args.no_telemetry:
+        lines = load_lines(args.capture, args.cycles)
+    elif args.capture:
+        lines = load_lines(args.capture, 0)
+
+    sim = SerialSimulator(args.profile, lines, rate=args.rate, baud=args.baud).start()
+    cadence = "sans limite" if args.rate == 0 else (
+        f"{args.rate:g} lignes/s" if args.rate else f"débit de la liaison ({sim.baud} bauds)")
+    print(f"Simulateur {args.profile} sur {sim.port} — {len(lines)} lignes rejouées, {cadence}")
+    try:
+        if args.bench:
+            if args.profile == "rover":
+                bench_rover(sim, args.duration, args.commands_per_sec)
+            else:
+                bench_robodog(sim, args.count)
+            return
+        print("Ctrl+C pour arrêter.")
+        while True:
+            time.sleep(5)
+            print(sim.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.close()
+
+
+if __name__ == "__main__":
+    main()
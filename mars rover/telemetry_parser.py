@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Parsing des lignes de télémétrie texte de l'ESP32.
+
+Le firmware (``Task_Affichage`` dans Arduino_G8_P4_S4.ino) envoie un cycle de
+lignes préfixées par un tag : ``[Distance]``, ``[Gaz]``, ``[HTU21D]``,
+``[MPU6050]`` et ``[GPS]``. Le tag est lu une seule fois, puis un seul motif
+précompilé par type de ligne extrait tous les champs d'un coup (X/Y/Z ou
+latitude/longitude/altitude). Les valeurs sont retournées en nombres, sans
+unité : le formatage est à la charge de l'affichage.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Tuple
+
+_NUM = r"(-?[\d.]+)"
+
+# tag -> liste de (motif appliqué après le tag, clés extraites dans l'ordre)
+_LINE_PATTERNS: Dict[str, List[Tuple[re.Pattern, Tuple[str, ...]]]] = {
+    "[Distance]": [
+        (re.compile(rf" : {_NUM} cm"), ("distance",)),
+    ],
+    "[Gaz]": [
+        (re.compile(rf" : {_NUM}"), ("gaz",)),
+    ],
+    "[HTU21D]": [
+        (re.compile(rf" Température : {_NUM}"), ("temperature",)),
+        (re.compile(rf" Humidité : {_NUM}"), ("humidity",)),
+    ],
+    "[MPU6050]": [
+        (re.compile(rf" Accélération X: {_NUM} \| Y: {_NUM} \| Z: {_NUM}"),
+         ("accX", "accY", "accZ")),
+        (re.compile(rf" Gyroscope X: {_NUM} \| Y: {_NUM} \| Z: {_NUM}"),
+         ("gyroX", "gyroY", "gyroZ")),
+        (re.compile(rf" Température: {_NUM}"), ("tempMPU",)),
+    ],
+    "[GPS]": [
+        (re.compile(rf" Latitude: {_NUM} \| Longitude: {_NUM} \| Altitude: {_NUM}"),
+         ("latitude", "longitude", "altitude")),
+        (re.compile(r" Satellites: (\d+)"), ("satellites",)),
+    ],
+}
+
+TELEMETRY_KEYS: Tuple[str, ...] = tuple(
+    key
+    for patterns in _LINE_PATTERNS.values()
+    for _, keys in patterns
+    for key in keys
+)
+
+UNITS: Dict[str, str] = {
+    "distance": " cm",
+    "gaz": "",
+    "temperature": " °C",
+    "humidity": " %",
+    "accX": " m/s²", "accY": " m/s²", "accZ": " m/s²",
+    "gyroX": " °/s", "gyroY": " °/s", "gyroZ": " °/s",
+    "tempMPU": " °C",
+    "latitude": "°", "longitude": "°",
+    "altitude": " m",
+    "satellites": "",
+}
+
+
+def parse_line(line: str) -> Dict[str, float]:
+    """Parse une ligne de télémétrie. Retourne {clé: valeur} ou {} si inconnue."""
+    if not line.startswith("["):
+        return {}
+    end = line.find("]")
+    patterns = _LINE_PATTERNS.get(line[:end + 1])
+    if patterns is None:
+        return {}
+    for pattern, keys in patterns:
+        match = pattern.match(line, end + 1)
+        if match is None:
+            continue
+        try:
+            values = [float(v) for v in match.groups()]
+        except ValueError:
+            return {}
+        return dict(zip(keys, values))
+    return {}
+
+
+def format_value(key: str, value) -> str:
+    """Formate une valeur pour l'affichage (``12.34 m/s²``), ``N/A`` si absente."""
+    unit = UNITS.get(key, "")
+    if value is None or value != value:  # None ou NaN
+        return f"N/A{unit}"
+    if key == "satellites":
+        return f"{int(value)}"
+    return f"{value:.2f}{unit}"
+
+
+def firmware_lines(values: Dict[str, float]) -> List[str]:
+    """Produit le cycle de lignes texte tel que l'imprime le firmware ESP32."""
+    v = values
+    return [
+        f"[Distance] : {v['distance']:.2f} cm",
+        f"[Gaz] : {int(v['gaz'])}",
+        f"[HTU21D] Température : {v['temperature']:.2f} °C",
+        f"[HTU21D] Humidité : {v['humidity']:.2f} %",
+        f"[MPU6050] Accélération X: {v['accX']:.2f} | Y: {v['accY']:.2f} | Z: {v['accZ']:.2f}",
+        f"[MPU6050] Gyroscope X: {v['gyroX']:.2f} | Y: {v['gyroY']:.2f} | Z: {v['gyroZ']:.2f}",
+        f"[MPU6050] Température: {v['tempMPU']:.2f} °C",
+        f"[GPS] Latitude: {v['latitude']:.6f} | Longitude: {v['longitude']:.6f} | Altitude: {v['altitude']:.2f} m",
+        f"[GPS] Satellites: {int(v['satellites'])}",
+    ]
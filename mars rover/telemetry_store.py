@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Historique numérique de la télémétrie.
+
+Stockage en colonnes : chaque canal (accX, gyroZ, gaz, ...) possède un tampon
+circulaire NumPy préalloué de valeurs et d'horodatages ``time.monotonic()``.
+L'ajout d'un échantillon est en O(1) et n'alloue rien ; les lectures
+(fenêtre temporelle, N derniers points, lecture sous-échantillonnée pour les
+graphiques) copient uniquement la portion demandée.
+
+Le thread lecteur série écrit, la boucle Streamlit lit : un verrou protège
+les index de tête pendant les copies.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from telemetry_parser import TELEMETRY_KEYS
+
+# ~30 min d'historique à 10 Hz par canal (~4 Mo pour les 15 canaux).
+DEFAULT_CAPACITY = 18000
+
+
+class TelemetryStore:
+    """Tampons circulaires (valeur, horodatage) préalloués, un par canal."""
+
+    def __init__(self, channels: Iterable[str] = TELEMETRY_KEYS, capacity: int = DEFAULT_CAPACITY):
+        self.channels: Tuple[str, ...] = tuple(channels)
+        self.capacity = int(capacity)
+        self._index = {name: i for i, name in enumerate(self.channels)}
+        n = len(self.channels)
+        self._values = np.full((n, self.capacity), np.nan, dtype=np.float64)
+        self._times = np.full((n, self.capacity), np.nan, dtype=np.float64)
+        self._heads = [0] * n
+        self._counts = [0] * n
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return max(self._counts, default=0)
+
+    def append(self, updates: Dict[str, float], t: Optional[float] = None) -> None:
+        """Ajoute un échantillon par canal présent dans `updates` (O(1))."""
+        if not updates:
+            return
+        if t is None:
+            t = time.monotonic()
+        with self._lock:
+            for key, value in updates.items():
+                i = self._index.get(key)
+                if i is None:
+                    continue
+                pos = self._heads[i]
+                self._values[i, pos] = value
+                self._times[i, pos] = t
+                self._heads[i] = (pos + 1) % self.capacity
+                if self._counts[i] < self.capacity:
+                    self._counts[i] += 1
+
+    def latest(self, key: str) -> Optional[float]:
+        """Dernière valeur reçue pour `key`, ou None."""
+        i = self._index[key]
+        with self._lock:
+            if self._counts[i] == 0:
+                return None
+            return float(self._values[i, self._heads[i] - 1])
+
+    def latest_values(self) -> Dict[str, Optional[float]]:
+        return {key: self.latest(key) for key in self.channels}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.fill(np.nan)
+            self._times.fill(np.nan)
+            self._heads = [0] * len(self.channels)
+            self._counts = [0] * len(self.channels)
+
+    def _ordered(self, i: int, last_n: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Copie les `last_n` derniers points dans l'ordre chronologique
+        # (au plus deux tranches contiguës du tampon circulaire).
+        head, count = self._heads[i], self._counts[i]
+        n = min(last_n, count)
+        start = (head - n) % self.capacity
+        if start + n <= self.capacity:
+            sl = slice(start, start + n)
+            return self._times[i, sl].copy(), self._values[i, sl].copy()
+        first = self.capacity - start
+        times = np.concatenate((self._times[i, start:], self._times[i, :n - first]))
+        values = np.concatenate((self._values[i, start:], self._values[i, :n - first]))
+        return times, values
+
+    def window(
+        self,
+        key: str,
+        seconds: Optional[float] = None,
+        last_n: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(horodatages, valeurs) des `seconds` dernières secondes ou `last_n` derniers points."""
+        i = self._index[key]
+        with self._lock:
+            times, values = self._ordered(i, self.capacity if last_n is None else last_n)
+        if seconds is not None and len(times):
+            if now is None:
+                now = time.monotonic()
+            first = np.searchsorted(times, now - seconds, side="left")
+            times, values = times[first:], values[first:]
+        return times, values
+
+    def downsampled(
+        self,
+        key: str,
+        seconds: Optional[float] = None,
+        max_points: int = 500,
+        now: Optional[float] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Comme `window`, moyenné par paquets pour ne pas dépasser `max_points`."""
+        times, values = self.window(key, seconds=seconds, now=now)
+        n = len(times)
+        if n <= max_points:
+            return times, values
+        step = -(-n // max_points)  # arrondi supérieur
+        # Les points les plus anciens en trop sont écartés pour garder des
+        # paquets pleins alignés sur le dernier échantillon.
+        keep = (n // step) * step
+        times = times[n - keep:].reshape(-1, step).mean(axis=1)
+        values = values[n - keep:].reshape(-1, step).mean(axis=1)
+        return times, values
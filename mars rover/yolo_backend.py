@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mars Rover — Inférence YOLOv8 sur CPU via ONNX Runtime ou OpenVINO.
+
+Le modèle PyTorch (``.pt`` ultralytics, détection ou segmentation comme
+qrdet) est exporté une fois en ONNX ; le fichier est gardé en cache à côté
+du ``.pt`` (``<nom>-<imgsz>.onnx``) et réutilisé tant que le ``.pt`` n'a pas
+changé. L'inférence passe ensuite par :
+
+- ``onnxruntime`` : nombre de threads intra-op réglable, quantification INT8
+  dynamique optionnelle (``<nom>-<imgsz>-int8.onnx``, poids en 8 bits) ;
+- ``openvino``    : le même fichier ONNX compilé pour le CPU, nombre de
+  threads réglable.
+
+Le pré-traitement (letterbox, RGB, [0, 1]) et le post-traitement (seuil de
+confiance, NMS OpenCV, retour aux coordonnées de l'image) reproduisent ceux
+d'ultralytics. Pour un modèle de segmentation, seules les boîtes sont lues
+(les coefficients de masque sont ignorés).
+
+Copie volontaire : ``X-Ibition-2025-Robodog/INTERFACE 2025 EAC/YoloBackend.py``
+reprend ce module (mêmes noms de backends, même cache, même pré/post-traitement)
+car les deux projets sont livrés séparément. Toute modification doit être
+reportée dans les deux fichiers.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+BACKENDS = ("torch", "onnxruntime", "openvino")
+DEFAULT_IMGSZ = 640
+
+
+def _is_fresh(path: str, source: str) -> bool:
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source)
+
+
+def export_onnx(pt_path: str, imgsz: int = DEFAULT_IMGSZ) -> str:
+    """Exporte `pt_path` en ONNX (une seule fois) et retourne le chemin du fichier en cache."""
+    stem, _ = os.path.splitext(pt_path)
+    onnx_path = f"{stem}-{imgsz}.onnx"
+    if _is_fresh(onnx_path, pt_path):
+        return onnx_path
+    from ultralytics import YOLO
+
+    # ultralytics écrit <nom>.onnx à côté du .pt : exporter une copie dans un dossier temporaire
+    # pour ne pas écraser un <nom>.onnx existant
+    with tempfile.TemporaryDirectory() as tmp:
+        exported = YOLO(shutil.copy(pt_path, tmp)).export(format="onnx", imgsz=imgsz, dynamic=False, simplify=True)
+        shutil.move(exported, onnx_path)
+    return onnx_path
+
+
+def quantize_int8(onnx_path: str) -> str:
+    """Version INT8 (quantification dynamique des poids) de `onnx_path`, en cache."""
+    stem, _ = os.path.splitext(onnx_path)
+    int8_path = f"{stem}-int8.onnx"
+    if _is_fresh(int8_path, onnx_path):
+        return int8_path
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Redimensionne en gardant les proportions et complète en gris (114) jusqu'à size x size."""
+    h, w = image.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = round(w * ratio), round(h * ratio)
+    if (new_w, new_h) != (w, h):
+        image = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    out = np.full((size, size, 3), 114, dtype=np.uint8)
+    out[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = image
+    return out, ratio, (pad_x, pad_y)
+
+
+class YoloRunner:
+    """Modèle YOLOv8 exporté en ONNX, exécuté par ONNX Runtime ou OpenVINO.
+
+    Appel : ``runner(image_bgr)`` -> ``(boîtes xyxy (N, 4), scores (N,), classes (N,))``
+    en coordonnées de l'image d'origine.
+    """
+
+    def __init__(
+        self,
+        pt_path: str,
+        backend: str = "onnxruntime",
+        threads: Optional[int] = None,
+        int8: bool = False,
+        imgsz: int = DEFAULT_IMGSZ,
+        conf: float = 0.5,
+        iou: float = 0.45,
+        agnostic: bool = False,
+    ):
+        if backend not in ("onnxruntime", "openvino"):
+            raise ValueError(f"Backend inconnu: {backend}")
+        if int8 and backend != "onnxruntime":
+            raise ValueError("INT8 disponible uniquement avec onnxruntime")
+        self.backend = backend
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.agnostic = agnostic
+        self.model_path = export_onnx(pt_path, imgsz)
+        if int8:
+            self.model_path = quantize_int8(self.model_path)
+
+        if backend == "onnxruntime":
+            import onnxruntime as ort
+
+            options = ort.SessionOptions()
+            if threads:
+                options.intra_op_num_threads = threads
+                options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self._session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+            self._input = self._session.get_inputs()[0].name
+            self._infer = lambda blob: self._session.run(None, {self._input: blob})
+        else:
+            import openvino as ov
+
+            core = ov.Core()
+            config = {"PERFORMANCE_HINT": "LATENCY"}
+            if threads:
+                config["INFERENCE_NUM_THREADS"] = threads
+            compiled = core.compile_model(core.read_model(self.model_path), "CPU", config)
+            request = compiled.create_infer_request()
+            outputs = compiled.outputs
+
+            def infer(blob):
+                result = request.infer({0: blob})
+                return [result[output] for output in outputs]
+
+            self._infer = infer
+
+    def __call__(self, image_bgr: np.ndarray):
+        padded, ratio, (pad_x, pad_y) = letterbox(image_bgr, self.imgsz)
+        blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)  # NCHW float32 RGB
+        outputs = self._infer(blob)
+        pred = np.asarray(outputs[0])[0]  # (4 + nc + nm, N)
+        nm = np.asarray(outputs[1]).shape[1] if len(outputs) > 1 else 0  # segmentation : coefficients de masque
+        class_scores = pred[4:pred.shape[0] - nm]
+        classes = class_scores.argmax(axis=0)
+        scores = class_scores[classes, np.arange(class_scores.shape[1])]
+        keep = scores >= self.conf
+        if not keep.any():
+            return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+        cx, cy, w, h = pred[:4, keep]
+        scores, classes = scores[keep], classes[keep]
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+        # NMS par classe (décalage des boîtes selon la classe) ou toutes classes confondues
+        offset = 0 if self.agnostic else classes[:, None] * (self.imgsz + 1)
+        shifted = boxes + offset
+        xywh = np.concatenate([shifted[:, :2], shifted[:, 2:] - shifted[:, :2]], axis=1)
+        kept = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), self.conf, self.iou)
+        kept = np.asarray(kept, dtype=np.int64).reshape(-1)
+
+        boxes = boxes[kept]
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad_x) / ratio
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad_y) / ratio
+        h0, w0 = image_bgr.shape[:2]
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w0)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h0)
+        return boxes.astype(np.float32), scores[kept].astype(np.float32), classes[kept]